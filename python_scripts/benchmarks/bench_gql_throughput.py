@@ -0,0 +1,219 @@
+#!env python3
+"""
+End to end throughput benchmark of import_activities.py and export_activities.py against the local Hasura stand-in
+of hasura_stand_in.py, reporting activities/s and peak memory of each flow.
+
+For every size, Station Allocation and View Period files of about that many activities are generated, imported into
+a fresh stand-in plan and exported back. Each flow runs in its own interpreter, so the peak resident memory reported is
+that of the script alone, the largest of its own and of its worker processes.
+
+Usage: python3 benchmarks/bench_gql_throughput.py --sizes 10000 100000 1000000 --import_args="-b 5000 -n 4" --latency 0.005
+"""
+import argparse
+import datetime
+import os
+import resource
+import runpy
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+from libaerie.products.product_parser import DsnStationAllocationFileEncoder, DsnViewPeriodPredLegacyEncoder
+
+SCRIPT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+PLAN_ID = 1
+PLAN_START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+RESULT_MARKER = "BENCH_RESULT "
+
+ANTENNAS = ("DSS-14", "DSS-24", "DSS-34", "DSS-54")
+STATIONS = 20
+PASS_MINUTES = 10
+
+
+def peak_memory() -> int:
+  """
+  Peak resident memory in bytes of this process, read from VmHWM where available as ru_maxrss keeps the peak of the
+  parent process across fork and exec
+  """
+
+  try:
+    with open("/proc/self/status") as status:
+      for line in status:
+        if line.startswith("VmHWM:"):
+          return int(line.split()[1]) * 1024
+  except OSError:
+    pass
+  # ru_maxrss is in kilobytes on Linux
+  return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_child(argv: list) -> None:
+  """
+  Run a script as __main__ with argv, then print its wall time and peak resident memory after RESULT_MARKER
+  """
+
+  sys.argv = argv
+  sys.path.insert(0, os.path.dirname(argv[0]))
+  start = time.perf_counter()
+  try:
+    runpy.run_path(argv[0], run_name="__main__")
+  finally:
+    seconds = time.perf_counter() - start
+    peak = max(peak_memory(), resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024)
+    print("%s%f %d" % (RESULT_MARKER, seconds, peak), flush=True)
+
+
+def header(filename: str, end: datetime.datetime) -> dict:
+  """
+  Header of the generated products, with both the SAF PRODUCT_VERSION_ID and the VP USER_PRODUCT_ID
+  """
+
+  return {
+    "MISSION_NAME": "BENCH",
+    "SPACECRAFT_NAME": "BENCH",
+    "DSN_SPACECRAFT_NUM": 1,
+    "DATA_SET_ID": "BENCH",
+    "FILE_NAME": os.path.basename(filename),
+    "PRODUCT_VERSION_ID": 1.0,
+    "USER_PRODUCT_ID": 1.0,
+    "APPLICABLE_START_TIME": PLAN_START,
+    "APPLICABLE_STOP_TIME": end,
+    "PRODUCT_CREATION_TIME": PLAN_START
+  }
+
+
+def saf_events(tracks: int):
+  """
+  Station Allocation events, one DSN_Track activity each, starting every minute on each of ANTENNAS
+  """
+
+  for i in range(tracks):
+    soa = PLAN_START + datetime.timedelta(minutes=1 + i // len(ANTENNAS))
+    yield {
+      "CHANGE_INDICATOR": "",
+      "YY": soa.strftime(DsnStationAllocationFileEncoder.YY_FORMAT),
+      "DOY": soa.strftime(DsnStationAllocationFileEncoder.DOY_FORMAT),
+      "SOA": soa,
+      "BOT": soa + datetime.timedelta(minutes=1),
+      "EOT": soa + datetime.timedelta(minutes=30),
+      "EOA": soa + datetime.timedelta(minutes=31),
+      "ANTENNA_ID": ANTENNAS[i % len(ANTENNAS)],
+      "PROJECT_ID": "BENCH",
+      "DESCRIPTION": "TKG PASS",
+      "PASS": i % 10000,
+      "CONFIG_CODE": "N001",
+      "SOE_FLAG": "",
+      "WORK_CODE_CAT": "1A1",
+      "RELATE": ""
+    }
+
+
+def vp_events(passes: int):
+  """
+  View Period events in time order, a RISE, 180 DEG AZIMUTH and SET event per pass, passes rising every minute on
+  STATIONS stations, each pass giving 3 event and 1 duration activities
+  """
+
+  def event(minute: int, name: str, pass_number: int) -> dict:
+    return {
+      "TIME": PLAN_START + datetime.timedelta(minutes=1 + minute),
+      "EVENT": name,
+      "SPACECRAFT_IDENTIFIER": 1,
+      "STATION_IDENTIFIER": pass_number % STATIONS + 1,
+      "PASS": pass_number % 10000,
+      "AZIMUTH": 180.0,
+      "ELEVATION": 45.0,
+      "AZ_LHA_X": 180.0,
+      "EL_DEC_Y": 45.0,
+      "RTLT": datetime.timedelta(seconds=50)
+    }
+
+  for minute in range(passes + PASS_MINUTES):
+    if 0 <= minute - PASS_MINUTES < passes:
+      yield event(minute, "SET", minute - PASS_MINUTES)
+    if 0 <= minute - PASS_MINUTES // 2 < passes:
+      yield event(minute, "180 DEG AZIMUTH", minute - PASS_MINUTES // 2)
+    if minute < passes:
+      yield event(minute, "RISE", minute)
+
+
+def write_products(directory: str, size: int) -> tuple:
+  """
+  Write Station Allocation and View Period files of about size activities, half of them DSN_Track activities
+
+  :return: Paths of the SAF and VP files and the hours of a plan holding all of their events
+  :rtype: tuple
+  """
+
+  tracks = size // 2
+  passes = (size - tracks) // 4
+  minutes = max(tracks // len(ANTENNAS), passes + PASS_MINUTES) + 60
+  end = PLAN_START + datetime.timedelta(minutes=minutes)
+
+  saf = os.path.join(directory, "bench_%s.SAF" % size)
+  vp = os.path.join(directory, "bench_%s.VP" % size)
+  DsnStationAllocationFileEncoder(saf, header(saf, end)).cast(saf_events(tracks))
+  DsnViewPeriodPredLegacyEncoder(vp, header(vp, end)).cast(vp_events(passes))
+  return saf, vp, minutes / 60
+
+
+def run_flow(script: str, args: list) -> tuple:
+  """
+  Run a script of SCRIPT_DIR in a child interpreter
+
+  :return: Wall time in seconds and peak resident memory in bytes of the script
+  :rtype: tuple
+  """
+
+  argv = [sys.executable, os.path.abspath(__file__), "--child", os.path.join(SCRIPT_DIR, script)] + args
+  completed = subprocess.run(argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+  if completed.returncode != 0:
+    sys.stderr.write(completed.stderr)
+    raise RuntimeError("%s failed with exit status %s" % (script, completed.returncode))
+  result = [line for line in completed.stdout.splitlines() if line.startswith(RESULT_MARKER)][-1]
+  seconds, peak = result[len(RESULT_MARKER):].split()
+  return float(seconds), int(peak)
+
+
+if __name__ == "__main__":
+  if len(sys.argv) > 2 and sys.argv[1] == "--child":
+    run_child(sys.argv[2:])
+    sys.exit(0)
+
+  from hasura_stand_in import HasuraStandIn, plan_record
+
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--sizes', nargs='+', default=[10000, 100000, 1000000], type=int, help="Numbers of activities imported and exported")
+  parser.add_argument('--import_args', default="-b 5000", type=str, help="Options of import_activities.py")
+  parser.add_argument('--export_args', default="", type=str, help="Options of export_activities.py")
+  parser.add_argument('--latency', default=0.0, type=float, help="Seconds the stand-in adds to every response")
+  parser.add_argument('--failure_rate', default=0.0, type=float, help="Fraction of requests the stand-in answers with a 503 status")
+  parser.add_argument('--seed', default=0, type=int, help="Seed of the failure injection")
+  parser.add_argument('-d', '--directory', default=None, type=str, help="Directory of the generated and exported files, a temporary one by default")
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+    print("%-8s %-7s %9s %9s %12s %10s %9s %9s" % ("size", "flow", "activities", "seconds", "activities/s", "peak MB", "requests", "failures"))
+    for size in args.sizes:
+      saf, vp, hours = write_products(directory, size)
+
+      stand_in = HasuraStandIn({PLAN_ID: plan_record(PLAN_ID, PLAN_START, hours)}, latency=args.latency,
+                               failure_rate=args.failure_rate, seed=args.seed)
+      with stand_in:
+        flows = (
+          ("import", "import_activities.py", ["-s", saf, "-p", vp] + shlex.split(args.import_args)),
+          ("export", "export_activities.py", ["-s", saf + ".out", "-p", vp + ".out"] + shlex.split(args.export_args)),
+        )
+        for name, script, options in flows:
+          requests, failures = stand_in.requests, stand_in.failures
+          seconds, peak = run_flow(script, [str(PLAN_ID), "-a", stand_in.url] + options)
+          print("%-8s %-7s %9s %9.2f %12.0f %10.1f %9s %9s" % (size, name, len(stand_in), seconds, len(stand_in) / seconds,
+                                                              peak / 2 ** 20, stand_in.requests - requests,
+                                                              stand_in.failures - failures), flush=True)
+
+      for filename in (saf, vp, saf + ".out", vp + ".out"):
+        if os.path.exists(filename):
+          os.remove(filename)
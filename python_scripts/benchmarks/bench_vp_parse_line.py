@@ -0,0 +1,58 @@
+#!env python3
+"""
+Benchmark of DsnViewPeriodPredLegacyDecoder.parse_line, comparing the fixed-width slice parser against the regex
+search it replaced.
+
+Usage: python3 benchmarks/bench_vp_parse_line.py -n 1000000
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+from libaerie.products.product_parser import DsnViewPeriodPredLegacyDecoder
+
+EVENT_LINES = [
+  "20 001/00:00:00 RISE             001 00 0001 180.0  45.0 180.0  45.0 00:00:50.0\n",
+  "20 001/03:53:52 180 DEG AZIMUTH  001 02 0001 180.0  45.0 180.0  45.0 00:00:50.0\n",
+  "20 001/04:30:32 TRX ON LIM LOW   001 04 0001 180.0  45.0 180.0  45.0 00:00:50.0\n",
+  "20 001/11:21:17 LOS SL/RT AXIS 1 001 04 0001 180.0  45.0 180.0  45.0 00:00:50.0\n",
+  "20 001/10:48:36 SET              001 02 0001 180.0  45.0 180.0  45.0 00:00:50.0\n",
+]
+
+
+def regex_parse_line(line: str) -> dict:
+  """
+  The previous parse_line implementation, kept here as the benchmark baseline
+  """
+  return re.search(DsnViewPeriodPredLegacyDecoder.EVENT_RECORD_REGEX, line).groupdict()
+
+
+def run(func, lines: list, repeat: int) -> float:
+  """
+  Return the best wall time, in seconds, of parsing every line with func
+  """
+  def loop():
+    for line in lines:
+      func(line)
+  return min(timeit.repeat(loop, number=1, repeat=repeat))
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument('-n', '--lines', default=200000, type=int, help="Number of event lines to parse per run")
+parser.add_argument('-r', '--repeat', default=5, type=int, help="Number of runs, the best run is reported")
+args = parser.parse_args()
+
+lines = (EVENT_LINES * (args.lines // len(EVENT_LINES) + 1))[:args.lines]
+
+for line in EVENT_LINES:
+  assert DsnViewPeriodPredLegacyDecoder.parse_line(line) == regex_parse_line(line)
+
+results = (("regex", run(regex_parse_line, lines, args.repeat)),
+           ("fixed-width", run(DsnViewPeriodPredLegacyDecoder.parse_line, lines, args.repeat)))
+
+baseline = results[0][1]
+for name, seconds in results:
+  print("%-12s %8.3f s %12.0f lines/s %6.2fx" % (name, seconds, len(lines) / seconds, baseline / seconds))
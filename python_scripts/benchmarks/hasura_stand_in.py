@@ -0,0 +1,361 @@
+#!env python3
+"""
+Local stand-in for the Hasura GraphQL endpoint of AERIE, answering the queries sent by GqlInterface from activity
+directives held in memory, with configurable latency and failure injection.
+
+Only the query shapes GqlInterface sends are understood: READ_PLAN_QUERY, READ_ACTIVITY_QUERY, the getActivities
+queries of build_activity_query, and the insert, update and delete activity mutations. Like Hasura, queries using
+variables they do not declare are answered with an error.
+
+Usage: python3 benchmarks/hasura_stand_in.py --port 8080 --plan_duration 8760 --latency 0.01 --failure_rate 0.001
+"""
+import argparse
+import bisect
+import datetime
+import gzip
+import heapq
+import http.server
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir)))
+from libaerie.products.product_parser import GqlInterface
+
+
+def like_pattern(pattern: str) -> re.Pattern:
+  """
+  Compile a SQL LIKE pattern, % matching any characters and _ a single one, into a regular expression
+
+  :param pattern: LIKE pattern
+  :type pattern: str
+  :return: Regular expression matching the same strings
+  :rtype: re.Pattern
+  """
+
+  return re.compile("".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern), re.DOTALL)
+
+
+class HasuraStandIn(object):
+  """
+  In-memory stand-in for the Hasura GraphQL endpoint, served over HTTP by start()
+
+  Directives are kept JSON encoded, with per plan and type indexes of their ids and start offsets, so pages of a
+  keyset paginated read cost the same at any depth of a plan of millions of activities.
+
+  :ivar plans: Plan records answered to READ_PLAN_QUERY, by plan id
+  :vartype plans: dict
+  :ivar latency: Seconds added to every response
+  :vartype latency: float
+  :ivar failure_rate: Fraction of requests answered with a 503 status before being applied
+  :vartype failure_rate: float
+  :ivar requests: Number of requests received, failed ones included
+  :vartype requests: int
+  :ivar failures: Number of requests answered with an injected failure
+  :vartype failures: int
+  """
+
+  def __init__(self, plans: dict = None, latency: float = 0.0, failure_rate: float = 0.0, seed: int = None):
+    """
+    :param plans: Plan records, with the id, name, model_id, start_time and duration fields of AERIE plans, by plan id
+    :type plans: dict
+    :param latency: Seconds added to every response
+    :type latency: float
+    :param failure_rate: Fraction of requests answered with a 503 status before being applied
+    :type failure_rate: float
+    :param seed: Seed of the failure injection, None for a random one
+    :type seed: int
+    """
+
+    self.plans = dict(plans or {})
+    self.latency = latency
+    self.failure_rate = failure_rate
+    self.requests = 0
+    self.failures = 0
+    self.server = None
+
+    self._random = random.Random(seed)
+    self._lock = threading.Lock()
+    self._directives = {}
+    self._ids = {}
+    self._offsets = {}
+    self._next_id = 1
+
+  def __len__(self) -> int:
+    return len(self._directives)
+
+  @property
+  def url(self) -> str:
+    """
+    Connection string of the running server, to pass to GqlInterface
+    """
+
+    host, port = self.server.server_address[:2]
+    return "http://%s:%s/v1/graphql" % (host, port)
+
+  def start(self, host: str = "127.0.0.1", port: int = 0) -> "HasuraStandIn":
+    """
+    Serve the stand-in from a background thread
+
+    :param host: Address to listen on
+    :type host: str
+    :param port: Port to listen on, 0 for any free port
+    :type port: int
+    :return: The started stand-in
+    :rtype: HasuraStandIn
+    """
+
+    self.server = StandInServer((host, port), StandInRequestHandler)
+    self.server.stand_in = self
+    threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    return self
+
+  def stop(self) -> None:
+    """
+    Stop serving and close the listening socket
+    """
+
+    if self.server is not None:
+      self.server.shutdown()
+      self.server.server_close()
+      self.server = None
+
+  def __enter__(self):
+    return self.start() if self.server is None else self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def post(self, body: bytes) -> tuple:
+    """
+    Answer the body of a GraphQL request
+
+    :param body: JSON encoded request, with query and variables
+    :type body: bytes
+    :return: HTTP status and the response to encode
+    :rtype: tuple
+    """
+
+    with self._lock:
+      self.requests += 1
+      failed = self.failure_rate > 0 and self._random.random() < self.failure_rate
+      if failed:
+        self.failures += 1
+    if self.latency:
+      time.sleep(self.latency)
+    if failed:
+      return 503, {"errors": [{"message": "injected failure"}]}
+
+    request = json.loads(body)
+    query, variables = request["query"], request.get("variables") or {}
+
+    # Like Hasura, reject variables the query does not declare and declared variables that are missing
+    if set(re.findall(r"\$(\w+):", query)) != set(variables):
+      return 200, {"errors": [{"message": "unexpected variables %s" % sorted(variables)}]}
+
+    operation = re.match(r"(?:query|mutation) (\w+)", query)
+    handler = getattr(self, "_%s" % operation.group(1), None) if operation else None
+    if handler is None:
+      return 200, {"errors": [{"message": "unknown query"}]}
+    with self._lock:
+      return 200, {"data": handler(query, variables)}
+
+  def _getPlan(self, query: str, variables: dict) -> dict:
+    plan = self.plans.get(variables["id"])
+    return {"plan": [plan] if plan is not None else []}
+
+  def _getActivity(self, query: str, variables: dict) -> dict:
+    ids = self._select(variables["plan_id"], self._like_types(variables["plan_id"], variables["type"]))
+    return {"activity_directive": self._project(ids, query)}
+
+  def _getActivities(self, query: str, variables: dict) -> dict:
+    plan_id = variables["plan_id"]
+    if "types" in variables:
+      types = variables["types"]
+    elif "type" in variables:
+      types = self._like_types(plan_id, variables["type"])
+    else:
+      types = [key[1] for key in self._ids if key[0] == plan_id]
+
+    by_offset = "start_offset: asc" in query
+    after = None
+    if "after_id" in variables:
+      after = variables["after_id"]
+      if by_offset:
+        after = (GqlInterface.parse_aerie_offset(variables["after_offset"]).total_seconds(), after)
+
+    ids = self._select(plan_id, types, by_offset, after, variables.get("limit"))
+    return {"activity_directive": self._project(ids, query)}
+
+  def _InsertActivities(self, query: str, variables: dict) -> dict:
+    returning = []
+    for activity in variables["activities"]:
+      directive = {"tags": [], "metadata": {}, **activity, "id": self._next_id}
+      self._next_id += 1
+      self._add(directive)
+      returning.append({"id": directive["id"], "name": directive["name"]})
+    return {"insert_activity_directive": {"returning": returning}}
+
+  def _UpdateActivities(self, query: str, variables: dict) -> dict:
+    results = []
+    for update in variables["updates"]:
+      directive_id = update["where"]["id"]["_eq"]
+      record = self._directives.get(directive_id)
+      affected_rows = 0
+      if record is not None and record[0] == update["where"]["plan_id"]["_eq"]:
+        directive = json.loads(record[3])
+        self._remove(directive_id)
+        directive.update(update["_set"])
+        self._add(directive)
+        affected_rows = 1
+      results.append({"affected_rows": affected_rows})
+    return {"update_activity_directive_many": results}
+
+  def _DeleteActivities(self, query: str, variables: dict) -> dict:
+    affected_rows = 0
+    for directive_id in variables["ids"]:
+      record = self._directives.get(directive_id)
+      if record is not None and record[0] == variables["plan_id"]:
+        self._remove(directive_id)
+        affected_rows += 1
+    return {"delete_activity_directive": {"affected_rows": affected_rows}}
+
+  def _add(self, directive: dict) -> None:
+    key = (directive["plan_id"], directive["type"])
+    offset = GqlInterface.parse_aerie_offset(directive["start_offset"]).total_seconds()
+    self._directives[directive["id"]] = (directive["plan_id"], directive["type"], offset,
+                                         json.dumps(directive, separators=(",", ":")))
+    ids = self._ids.setdefault(key, [])
+    if ids and ids[-1] > directive["id"]:
+      bisect.insort(ids, directive["id"])
+    else:
+      ids.append(directive["id"])
+    self._offsets.pop(key, None)
+
+  def _remove(self, directive_id: int) -> None:
+    plan_id, activity_type, offset, encoded = self._directives.pop(directive_id)
+    ids = self._ids[(plan_id, activity_type)]
+    del ids[bisect.bisect_left(ids, directive_id)]
+    self._offsets.pop((plan_id, activity_type), None)
+
+  def _like_types(self, plan_id: int, pattern: str) -> list:
+    regex = like_pattern(pattern)
+    return [key[1] for key in self._ids if key[0] == plan_id and regex.fullmatch(key[1])]
+
+  def _select(self, plan_id: int, types: list, by_offset: bool = False, after=None, limit: int = None) -> list:
+    """
+    Ids of the directives of a plan with one of types, in id or (start offset, id) order, after the after keyset
+    """
+
+    streams = []
+    for activity_type in types:
+      key = (plan_id, activity_type)
+      if key not in self._ids:
+        continue
+      if by_offset:
+        if key not in self._offsets:
+          self._offsets[key] = sorted((self._directives[directive_id][2], directive_id) for directive_id in self._ids[key])
+        index = self._offsets[key]
+      else:
+        index = self._ids[key]
+      start = bisect.bisect_right(index, after) if after is not None else 0
+      streams.append(map(index.__getitem__, range(start, len(index))))
+
+    selected = []
+    for item in heapq.merge(*streams):
+      if limit is not None and len(selected) >= limit:
+        break
+      selected.append(item[1] if by_offset else item)
+    return selected
+
+  def _project(self, ids: list, query: str) -> list:
+    fields = re.search(r"\{([\w ]+)\} \}$", query).group(1).split()
+    directives = (json.loads(self._directives[directive_id][3]) for directive_id in ids)
+    return [{field: directive[field] for field in fields if field in directive} for directive in directives]
+
+
+class StandInServer(http.server.ThreadingHTTPServer):
+  """
+  Threaded HTTP server of a HasuraStandIn
+  """
+
+  daemon_threads = True
+  stand_in = None
+
+
+class StandInRequestHandler(http.server.BaseHTTPRequestHandler):
+  """
+  Keep-alive handler posting GraphQL requests, gzip compressed or not, to the HasuraStandIn of the server
+  """
+
+  protocol_version = "HTTP/1.1"
+
+  # Delayed acknowledgements of the small responses would otherwise stall every keep-alive request
+  disable_nagle_algorithm = True
+
+  def do_POST(self):
+    body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    if self.headers.get("Content-Encoding") == "gzip":
+      body = gzip.decompress(body)
+
+    status, response = self.server.stand_in.post(body)
+    payload = json.dumps(response, separators=(",", ":")).encode()
+
+    self.send_response(status)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(payload)))
+    self.end_headers()
+    self.wfile.write(payload)
+
+  def log_message(self, format, *args):
+    logging.getLogger(__name__).debug(format, *args)
+
+
+def plan_record(plan_id: int, start_time: datetime.datetime, hours: float) -> dict:
+  """
+  AERIE plan record of a plan starting at start_time and lasting hours, as answered to READ_PLAN_QUERY
+
+  :param plan_id: Plan id
+  :type plan_id: int
+  :param start_time: Timezone aware start of the plan
+  :type start_time: datetime.datetime
+  :param hours: Duration of the plan in hours
+  :type hours: float
+  :return: Plan record
+  :rtype: dict
+  """
+
+  seconds = int(hours * 3600)
+  return {"id": plan_id, "name": "STAND_IN_%s" % plan_id, "model_id": 1, "start_time": start_time.isoformat(),
+          "duration": "%d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)}
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--host', default="127.0.0.1", type=str, help="Address to listen on")
+  parser.add_argument('--port', default=8080, type=int, help="Port to listen on")
+  parser.add_argument('--plan_id', default=1, type=int, help="Id of the plan served")
+  parser.add_argument('--plan_start', default="2020-001T00:00:00", type=str, help="Start of the plan served, YYYY-DOYTHH:MM:SS UTC")
+  parser.add_argument('--plan_duration', default=8760.0, type=float, help="Hours of the plan served")
+  parser.add_argument('--latency', default=0.0, type=float, help="Seconds added to every response")
+  parser.add_argument('--failure_rate', default=0.0, type=float, help="Fraction of requests answered with a 503 status")
+  parser.add_argument('--seed', default=None, type=int, help="Seed of the failure injection")
+  args = parser.parse_args()
+
+  logging.basicConfig(level=logging.INFO)
+
+  plan_start = datetime.datetime.strptime(args.plan_start, "%Y-%jT%H:%M:%S").replace(tzinfo=datetime.timezone.utc)
+  stand_in = HasuraStandIn({args.plan_id: plan_record(args.plan_id, plan_start, args.plan_duration)},
+                           latency=args.latency, failure_rate=args.failure_rate, seed=args.seed)
+  with stand_in.start(args.host, args.port):
+    logging.info("Serving plan %s at %s", args.plan_id, stand_in.url)
+    try:
+      while True:
+        time.sleep(60)
+    except KeyboardInterrupt:
+      pass
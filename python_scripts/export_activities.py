@@ -22,7 +22,11 @@ parser.add_argument('-m', '--mission_name', dest='mission_name', default="", typ
 parser.add_argument('-S', '--spacecraft_name', dest='spacecraft_name', default="", type=str, help="Spacecraft Name for VP and SAF header")
 parser.add_argument('-d', '--dsn_id', dest='dsn_id', default=0, type=int, help="Integer DSN spacecraft number for VP and SAF header")
 parser.add_argument('-a', '--connection_string', default=GqlInterface.DEFAULT_CONNECTION_STRING, help="http://<ip_address>:<port> connection string to graphql database")
-parser.add_argument('-b', '--buffer_length', default=None, dest='buffer', type=int, help="Integer length of the buffer used to parse products, use if parsing large files")
+parser.add_argument('--timeout', default=GqlInterface.DEFAULT_TIMEOUT[1], type=float, help="Seconds to wait for each graphql database response")
+parser.add_argument('--retries', default=GqlInterface.DEFAULT_RETRIES, type=int, help="Number of retries of graphql requests failing to connect or with a server error")
+parser.add_argument('-b', '--buffer_length', default=None, dest='buffer', type=int, help="Integer number of events sorted in memory before they are spilled to disk, use if exporting large plans")
+parser.add_argument('-P', '--page_size', default=None, type=int, help="Integer number of activities fetched per request")
+parser.add_argument('-C', '--concurrent', action='store_true', help="Export the View Period and Station Allocation files concurrently")
 parser.add_argument('-v', '--verbose', action='store_true', help="Increased debug output")
 
 args = parser.parse_args()
@@ -40,7 +44,7 @@ if args.verbose is True:
 logger = logging.getLogger(__name__)
 
 # Setup GQL
-gql = GqlInterface(connection_string=args.connection_string)
+gql = GqlInterface(connection_string=args.connection_string, timeout=(GqlInterface.DEFAULT_TIMEOUT[0], args.timeout), retries=args.retries)
 plan_start, plan_end = gql.get_plan_info_from_id(plan_id)
 
 saf_header = {
@@ -77,4 +81,5 @@ except FileNotFoundError as fnfe:
   logger.fatal(str(fnfe))
   exit(1)
 
-gql.demux_files(saf_encoder, vp_encoder, plan_id)
+demux = gql.demux_files_concurrent if args.concurrent else gql.demux_files
+demux(saf_encoder, vp_encoder, plan_id, page_size=args.page_size, sort_buffer=args.buffer, plan_window=(plan_start, plan_end))
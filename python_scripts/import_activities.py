@@ -1,7 +1,7 @@
 #!env python3
 import argparse
 import logging
-from libaerie.products.product_parser import GqlInterface, DsnStationAllocationFileDecoder, DsnViewPeriodPredLegacyDecoder
+from libaerie.products.product_parser import AdaptiveBatchSizer, GqlInterface, DsnStationAllocationFileDecoder, DsnViewPeriodPredLegacyDecoder
 
 date_format = '%Y-%j/%H:%M:%S'
 parser = argparse.ArgumentParser()
@@ -13,7 +13,21 @@ parser.add_argument('plan_id', type=int, help="plan ID to ingest activity direct
 parser.add_argument('-p', '--vp_file', action='append', dest='vp', default=[], type=str, help="Filepath to a DSN View Period file")
 parser.add_argument('-s', '--sa_file', action='append', dest='sa', default=[], type=str, help="Filepath to a DSN Station Allocation file")
 parser.add_argument('-a', '--connection_string', default=GqlInterface.DEFAULT_CONNECTION_STRING, help="http://<ip_address>:<port> connection string to graphql database")
+parser.add_argument('--timeout', default=GqlInterface.DEFAULT_TIMEOUT[1], type=float, help="Seconds to wait for each graphql database response")
+parser.add_argument('--retries', default=GqlInterface.DEFAULT_RETRIES, type=int, help="Number of retries of graphql requests failing to connect or with a server error, inserts are only retried after a 503")
+parser.add_argument('-z', '--gzip', default=None, dest='gzip', type=int, metavar='BYTES', help="Send request bodies of at least BYTES gzip compressed, smaller bodies are sent uncompressed, the server has to accept compressed requests")
 parser.add_argument('-b', '--buffer_length', default=None, dest='buffer', type=int, help="Integer length of the buffer used to parse products, use if parsing large files")
+parser.add_argument('-A', '--adaptive', action='store_true', dest='adaptive', help="Size the insert batches from their payload bytes and latency instead of -b")
+parser.add_argument('--batch_latency', default=5.0, dest='batch_latency', type=float, help="Seconds per insert above which adaptive batches shrink")
+parser.add_argument('-j', '--jobs', default=1, dest='jobs', type=int, help="Number of processes decoding files concurrently, use if ingesting many files")
+parser.add_argument('-n', '--in_flight', default=1, dest='in_flight', type=int, help="Number of insert requests in flight at once, use with -b for large ingests")
+parser.add_argument('--max_rejected', default=0, dest='max_rejected', type=int, help="Number of misformatted event lines skipped in each file before the ingest fails")
+parser.add_argument('-c', '--cache_dir', default=None, dest='cache_dir', type=str, help="Directory caching decoded files, use if ingesting the same files repeatedly")
+parser.add_argument('-w', '--clip', action='store_true', dest='clip', help="Only ingest events within the plan, skipping the rest of the files")
+parser.add_argument('--project', default=None, dest='project', type=str, help="Only ingest the Station Allocations of this project ID, use with multi-mission files")
+parser.add_argument('--spacecraft', default=None, dest='spacecraft', type=int, help="Only ingest the View Periods of this spacecraft number, use with multi-mission files")
+parser.add_argument('--sync', action='store_true', dest='sync', help="Update the plan to revised files, inserting new and updating changed activities instead of appending all of them")
+parser.add_argument('--delete', action='store_true', dest='delete', help="With --sync, delete the activities no longer in the revised files")
 parser.add_argument('-v', '--verbose', action='store_true', dest='verbose', help="Increased debug output")
 
 args = parser.parse_args()
@@ -34,32 +48,53 @@ decoders = []
 
 for file in args.sa:
     try:
-        decoders.append(DsnStationAllocationFileDecoder(file))
+        decoders.append(DsnStationAllocationFileDecoder(file, cache_dir=args.cache_dir, max_rejected=args.max_rejected))
     except FileNotFoundError as fnfe:
         logger.fatal(str(fnfe))
         exit(1)
 for file in args.vp:
     try:
-        decoders.append(DsnViewPeriodPredLegacyDecoder(file))
+        decoders.append(DsnViewPeriodPredLegacyDecoder(file, cache_dir=args.cache_dir, max_rejected=args.max_rejected))
     except FileNotFoundError as fnfe:
         logger.fatal(str(fnfe))
         exit(1)
 
 # Setup GQL
-gql = GqlInterface(connection_string=args.connection_string)
+gql = GqlInterface(connection_string=args.connection_string, pool_size=max(GqlInterface.DEFAULT_POOL_SIZE, args.in_flight), timeout=(GqlInterface.DEFAULT_TIMEOUT[0], args.timeout), retries=args.retries, compress_threshold=args.gzip)
 
 buffer_len = args.buffer
 activities = []
+filters = {"project": args.project, "spacecraft": args.spacecraft}
 
-for activity in gql.mux_files(decoders, plan_id):
-    activities.append(activity)
+if args.jobs > 1:
+    activity_stream = gql.mux_files_concurrent(decoders, plan_id, processes=args.jobs, clip=args.clip, filters=filters)
+else:
+    activity_stream = gql.mux_files(decoders, plan_id, clip=args.clip, filters=filters)
 
-    # Check if Buffer is filled
-    if buffer_len is not None and len(activities) >= buffer_len:
-        logger.debug("Buffer filled with %s records", len(activities))
-        gql.create_activities(activities)
+sizer = AdaptiveBatchSizer(target_latency=args.batch_latency, serializer=gql.serializer) if args.adaptive else None
 
-        # Remove items from buffer
-        activities.clear()
-
-gql.create_activities(activities)
+if args.sync:
+    if args.delete and any(value is not None for value in filters.values()):
+        logger.fatal("--delete can not be used with --project or --spacecraft")
+        exit(1)
+    counts = gql.sync_activities(activity_stream, plan_id, gql.decoder_activity_types(decoders), delete=args.delete, batch_size=buffer_len or 500)
+    logger.info("Inserted %(inserted)s, updated %(updated)s, deleted %(deleted)s and kept %(unchanged)s activities", counts)
+elif args.in_flight > 1:
+    count = gql.create_activities_concurrent(activity_stream, batch_size=buffer_len or 500, max_in_flight=args.in_flight, sizer=sizer)
+    logger.info("Inserted %s activities", count)
+elif sizer is not None:
+    count = gql.create_activities_adaptive(activity_stream, sizer)
+    logger.info("Inserted %s activities", count)
+else:
+    for activity in activity_stream:
+        activities.append(activity)
+
+        # Check if Buffer is filled
+        if buffer_len is not None and len(activities) >= buffer_len:
+            logger.debug("Buffer filled with %s records", len(activities))
+            gql.create_activities(activities)
+
+            # Remove items from buffer
+            activities.clear()
+
+    gql.create_activities(activities)
@@ -3,13 +3,1062 @@ import datetime
 import os
 import logging
 import requests
+import requests.adapters
+import urllib3.util
+import urllib3.exceptions
 import json
 import io
+import operator
+import array
+import itertools
+import mmap
+import collections
+import concurrent.futures
+import collections.abc
+import multiprocessing
+import time
+import gzip
+import bz2
+import lzma
+import hashlib
+import tempfile
+import asyncio
+import bisect
+import functools
+import threading
+import heapq
+import pickle
+import queue
 
 from typing import Union
 from collections.abc import Iterable
 from abc import abstractmethod
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Leading bytes of the compressed formats the decoders stream from, with the function opening each format
+COMPRESSION_FORMATS = (
+    ("gzip", b"\x1f\x8b", gzip.open),
+    ("bz2", b"BZh", bz2.open),
+    ("xz", b"\xfd7zXZ\x00", lzma.open),
+)
+COMPRESSION_MAGIC_SIZE = max(len(magic) for name, magic, opener in COMPRESSION_FORMATS)
+
+
+def detect_compression(head: bytes) -> tuple:
+    """
+    Detect the compression format of a file from its leading bytes
+
+    :param head: First bytes of the file, at least COMPRESSION_MAGIC_SIZE unless the file is shorter
+    :type head: bytes
+    :return: (name, opener) of the compression format, or None for uncompressed files
+    :rtype: tuple
+    """
+
+    for name, magic, opener in COMPRESSION_FORMATS:
+        if head.startswith(magic):
+            return name, opener
+    return None
+
+
+class FixedWidthRecordParser(object):
+    """
+    Column-offset parser for fixed-width event records. Field positions are computed once from the field widths, each
+    line is then cut with precomputed slice objects. Lines failing the length check fall back to the record regex.
+
+    :ivar keys: Names of the record fields, in column order
+    :vartype keys: tuple
+    :ivar slices: Slice objects locating each field in a record line
+    :vartype slices: tuple
+    :ivar width: Minimum line length, in characters, handled by the slice path
+    :vartype width: int
+    :ivar regex: Compiled record regex used for lines failing the length check
+    :vartype regex: re.Pattern
+    :ivar regex_bytes: Compiled record regex used for bytes lines failing the length check
+    :vartype regex_bytes: re.Pattern
+    """
+
+    def __init__(self, fields: list, regex: str):
+        """
+        Initialize a FixedWidthRecordParser from a record layout.
+
+        :param fields: List of (key, width, gap) tuples, gap is the number of filler characters following the field
+        :type fields: list
+        :param regex: Regex with named groups matching the same layout, used as the fallback path
+        :type regex: str
+        """
+
+        keys = []
+        slices = []
+        offset = 0
+        for key, width, gap in fields:
+            keys.append(key)
+            slices.append(slice(offset, offset + width))
+            offset += width + gap
+
+        self.keys = tuple(keys)
+        self.slices = tuple(slices)
+        self.width = offset
+        self.regex = re.compile(regex)
+        self.regex_bytes = re.compile(regex.encode("ascii"))
+        self._getter = operator.itemgetter(*self.slices)
+
+    def split(self, line: Union[str, bytes]) -> Union[tuple, None]:
+        """
+        Cut a record line into its raw fields, in the order of self.keys
+
+        :param line: Record line, bytes lines give bytes fields
+        :type line: str | bytes
+        :return: tuple of the raw field strings, None if the line does not hold a record
+        :rtype: tuple | None
+        """
+
+        is_bytes = isinstance(line, bytes)
+
+        # Slicing is only equivalent to the regex when the whole record fits on the line
+        if len(line) >= self.width and line.find(b"\n" if is_bytes else "\n", 0, self.width) == -1:
+            return self._getter(line)
+
+        result = (self.regex_bytes if is_bytes else self.regex).search(line)
+        if not result:
+            return None
+        return result.groups()
+
+    def parse(self, line: Union[str, bytes]) -> Union[dict, None]:
+        """
+        Cut a record line into its fields
+
+        :param line: Record line, bytes lines give bytes fields
+        :type line: str | bytes
+        :return: key, value dict of the raw field strings, None if the line does not hold a record
+        :rtype: dict | None
+        """
+
+        fields = self.split(line)
+        if fields is None:
+            return None
+        return dict(zip(self.keys, fields))
+
+
+class DayOfYearEpochCache(object):
+    """
+    Decodes the two digit year / day of year timestamps used by DSN products. The UTC midnight of each "YY DDD" day is
+    computed once with strptime and cached, the time of day is then added to it arithmetically.
+
+    :ivar _days: Cache of UTC midnight datetimes keyed by "YY DDD" day string
+    :vartype _days: dict
+    :cvar DAY_FORMAT: Format of the cached day strings
+    :vartype DAY_FORMAT: str
+    """
+
+    DAY_FORMAT = "%y %j"
+    EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def __init__(self):
+        """
+        Initialize an empty DayOfYearEpochCache.
+        """
+
+        self._days = {}
+        self._days_us = {}
+
+    def midnight(self, day: Union[str, bytes]) -> Union[datetime.datetime, None]:
+        """
+        Get the UTC midnight of a day
+
+        :param day: "YY DDD" day string, e.g. "20 001", bytes fields from binary files are cached as they are
+        :type day: str | bytes
+        :return: Midnight of the day, None if the day string is not a zero padded "YY DDD" value
+        :rtype: datetime.datetime | None
+        """
+
+        try:
+            return self._days[day]
+        except KeyError:
+            pass
+
+        day_str = day
+        if isinstance(day, bytes):
+            if not day.isascii():
+                return None
+            day_str = day.decode("ascii")
+
+        if len(day_str) != 6 or day_str[2] != " " or not (day_str[:2] + day_str[3:]).isdigit():
+            return None
+
+        try:
+            midnight = datetime.datetime.strptime(day_str, self.DAY_FORMAT).replace(tzinfo=datetime.timezone.utc)
+        except ValueError:
+            return None
+
+        self._days[day] = midnight
+        self._days_us[day] = (midnight - self.EPOCH) // datetime.timedelta(microseconds=1)
+        return midnight
+
+    @classmethod
+    def time_of_day(cls, hh: str, mm: str, ss: str = "00") -> Union[int, None]:
+        """
+        Convert time of day fields to seconds past midnight
+
+        :param hh: Two digit hour
+        :type hh: str
+        :param mm: Two digit minute
+        :type mm: str
+        :param ss: Two digit second
+        :type ss: str
+        :return: Seconds past midnight, None if any field is not a zero padded in range value
+        :rtype: int | None
+        """
+
+        hhmmss = hh + mm + ss
+        if len(hhmmss) != 6 or not (hhmmss.isascii() and hhmmss.isdigit()):
+            return None
+
+        hours, minutes, seconds = int(hh), int(mm), int(ss)
+        if hours > 23 or minutes > 59 or seconds > 59:
+            return None
+
+        return hours * 3600 + minutes * 60 + seconds
+
+    def decode(self, day: str, hh: str, mm: str, ss: str = "00") -> Union[datetime.datetime, None]:
+        """
+        Convert day and time of day fields to a UTC datetime
+
+        :param day: "YY DDD" day string, e.g. "20 001"
+        :type day: str
+        :param hh: Two digit hour
+        :type hh: str
+        :param mm: Two digit minute
+        :type mm: str
+        :param ss: Two digit second
+        :type ss: str
+        :return: UTC datetime, None if any field is not a zero padded in range value. Callers fall back to strptime
+            in that case so malformed timestamps raise the same errors as before.
+        :rtype: datetime.datetime | None
+        """
+
+        midnight = self.midnight(day)
+        if midnight is None:
+            return None
+
+        seconds = self.time_of_day(hh, mm, ss)
+        if seconds is None:
+            return None
+
+        return midnight + datetime.timedelta(seconds=seconds)
+
+    def decode_epoch_us(self, day: str, hh: str, mm: str, ss: str = "00") -> Union[int, None]:
+        """
+        Convert day and time of day fields to microseconds since the Unix epoch, without building a datetime
+
+        :param day: "YY DDD" day string, e.g. "20 001"
+        :type day: str
+        :param hh: Two digit hour
+        :type hh: str
+        :param mm: Two digit minute
+        :type mm: str
+        :param ss: Two digit second
+        :type ss: str
+        :return: Microseconds since 1970-01-01T00:00:00Z, None under the same conditions as decode
+        :rtype: int | None
+        """
+
+        if self.midnight(day) is None:
+            return None
+
+        seconds = self.time_of_day(hh, mm, ss)
+        if seconds is None:
+            return None
+
+        return self._days_us[day] + seconds * 1000000
+
+
+class MappedLineReader(object):
+    """
+    Memory-mapped line reader for product files. Lines are returned as bytes slices of the mapping, bypassing Python's
+    text decoding layer; decoders only decode the fields they need as text.
+
+    :ivar name: Filepath to the mapped file
+    :vartype name: str
+    :ivar _file: Private file object backing the mapping
+    :vartype _file: file object
+    :ivar _mm: Private read-only memory map of the file
+    :vartype _mm: mmap.mmap
+    """
+
+    def __init__(self, filename: str):
+        """
+        Initialize a MappedLineReader, mapping the whole file read-only.
+
+        :param filename: Filepath to the file to map, the file must not be empty
+        :type filename: str
+        """
+
+        self.name = filename
+        self._file = open(filename, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __iter__(self):
+        # readline on the map advances the same position as __next__, so header reads and event iteration interleave
+        return iter(self._mm.readline, b"")
+
+    def __next__(self) -> bytes:
+        line = self._mm.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def __len__(self) -> int:
+        return len(self._mm)
+
+    def seek(self, offset: int) -> None:
+        """
+        Move the read position to a byte offset of the file
+
+        :param offset: Byte offset from the start of the file
+        :type offset: int
+        :return: None
+        :rtype: None
+        """
+        self._mm.seek(offset)
+
+    def tell(self) -> int:
+        """
+        Get the current read position
+
+        :return: Byte offset from the start of the file
+        :rtype: int
+        """
+        return self._mm.tell()
+
+    def close(self) -> None:
+        """
+        Release the mapping and close the backing file
+
+        :return: None
+        :rtype: None
+        """
+        self._mm.close()
+        self._file.close()
+
+
+class DecodedRecord(collections.abc.MutableMapping):
+    """
+    Compact record of a decoded product line. Fields are stored in __slots__ and read either as attributes or with the
+    key / value interface of a dict, so code written against the decoders' former dict records keeps working. Only
+    the fields listed in __slots__ can be set.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.__slots__:
+            raise KeyError("%s has no field %s" % (type(self).__name__, key))
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self.__slots__ and hasattr(self, key)
+
+    def __iter__(self):
+        return (key for key in self.__slots__ if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return "%s(%r)" % (type(self).__name__, dict(self))
+
+    def copy(self):
+        """
+        Shallow copy of the record
+
+        :return: New record holding the same field values
+        :rtype: DecodedRecord
+        """
+
+        clone = type(self).__new__(type(self))
+        for key in self:
+            setattr(clone, key, getattr(self, key))
+        return clone
+
+
+class VpEvent(DecodedRecord):
+    """
+    Decoded DSN View Period event. DURATION is unset by decoders, it is filled in when pairing RISE / SET events.
+    """
+
+    __slots__ = ("TIME", "EVENT", "SPACECRAFT_IDENTIFIER", "STATION_IDENTIFIER", "PASS", "AZIMUTH", "ELEVATION",
+                 "AZ_LHA_X", "EL_DEC_Y", "RTLT", "DURATION")
+
+    def __init__(self, TIME, EVENT, SPACECRAFT_IDENTIFIER, STATION_IDENTIFIER, PASS, AZIMUTH, ELEVATION, AZ_LHA_X,
+                 EL_DEC_Y, RTLT):
+        self.TIME = TIME
+        self.EVENT = EVENT
+        self.SPACECRAFT_IDENTIFIER = SPACECRAFT_IDENTIFIER
+        self.STATION_IDENTIFIER = STATION_IDENTIFIER
+        self.PASS = PASS
+        self.AZIMUTH = AZIMUTH
+        self.ELEVATION = ELEVATION
+        self.AZ_LHA_X = AZ_LHA_X
+        self.EL_DEC_Y = EL_DEC_Y
+        self.RTLT = RTLT
+
+
+class SafAllocation(DecodedRecord):
+    """
+    Decoded DSN Station Allocation record
+    """
+
+    __slots__ = ("CHANGE_INDICATOR", "YY", "DOY", "SOA", "BOT", "EOT", "EOA", "ANTENNA_ID", "PROJECT_ID",
+                 "DESCRIPTION", "PASS", "CONFIG_CODE", "SOE_FLAG", "WORK_CODE_CAT", "RELATE")
+
+    def __init__(self, CHANGE_INDICATOR, YY, DOY, SOA, BOT, EOT, EOA, ANTENNA_ID, PROJECT_ID, DESCRIPTION, PASS,
+                 CONFIG_CODE, SOE_FLAG, WORK_CODE_CAT, RELATE):
+        self.CHANGE_INDICATOR = CHANGE_INDICATOR
+        self.YY = YY
+        self.DOY = DOY
+        self.SOA = SOA
+        self.BOT = BOT
+        self.EOT = EOT
+        self.EOA = EOA
+        self.ANTENNA_ID = ANTENNA_ID
+        self.PROJECT_ID = PROJECT_ID
+        self.DESCRIPTION = DESCRIPTION
+        self.PASS = PASS
+        self.CONFIG_CODE = CONFIG_CODE
+        self.SOE_FLAG = SOE_FLAG
+        self.WORK_CODE_CAT = WORK_CODE_CAT
+        self.RELATE = RELATE
+
+
+# Leading bytes of a decode cache sidecar, the trailing byte is the version of the sidecar layout
+DECODE_CACHE_MAGIC = b"AERIEDC\x01"
+
+
+class DecodeCache(object):
+    """
+    Directory of binary sidecars holding decoded files, so a file decoded once is read back without parsing its text
+    again. A sidecar is named by a fingerprint of the decoder class, its DECODER_VERSION and the file contents, any
+    change to either of them misses the cache.
+
+    A sidecar holds the magic bytes, the length of a JSON header, the JSON header and then one 8 byte aligned column
+    per field of the decoder CACHE_COLUMNS. Timestamps and durations are stored as int64 microseconds, integers as
+    int64, floats as float64 and strings as int32 codes into a string table kept in the JSON header. Sidecars are
+    memory-mapped and their records built straight from the mapped columns.
+
+    :ivar directory: Directory holding the sidecars
+    :vartype directory: str
+    :cvar TYPECODES: array typecode of the stored column for every column kind
+    :vartype TYPECODES: dict
+    """
+
+    TYPECODES = {"time": "q", "duration": "q", "int": "q", "float": "d", "str": "i"}
+
+    def __init__(self, directory: str):
+        """
+        Initialize a DecodeCache, creating directory if needed
+
+        :param directory: Directory holding the sidecars
+        :type directory: str
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    @classmethod
+    def fingerprint(cls, decoder_type: type, filename: str) -> str:
+        """
+        Hash the decoder class, its DECODER_VERSION and the contents of filename
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param filename: Filepath to the decoded file
+        :type filename: str
+        :return: Hex digest identifying the decoded contents of the file
+        :rtype: str
+        """
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(("%s:%s\n" % (decoder_type.__name__, decoder_type.DECODER_VERSION)).encode())
+
+        with open(filename, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    def path(self, decoder_type: type, fingerprint: str) -> str:
+        """
+        Get the filepath of the sidecar of a fingerprint
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param fingerprint: Fingerprint of the file from DecodeCache.fingerprint
+        :type fingerprint: str
+        :return: Filepath of the sidecar
+        :rtype: str
+        """
+
+        return os.path.join(self.directory, "%s-%s.dcache" % (decoder_type.__name__, fingerprint))
+
+    @classmethod
+    def encode_header(cls, header_dict: dict) -> list:
+        """
+        Convert a decoded file header to JSON compatible [key, kind, value] entries
+
+        :param header_dict: key / value dict of the file header
+        :type header_dict: dict
+        :return: [key, kind, value] entries, datetimes are stored as ISO 8601 strings
+        :rtype: list
+        """
+
+        return [[key, "datetime", value.isoformat()] if isinstance(value, datetime.datetime) else [key, "value", value]
+                for key, value in header_dict.items()]
+
+    @classmethod
+    def decode_header(cls, entries: list) -> dict:
+        """
+        Convert [key, kind, value] entries of DecodeCache.encode_header back to a file header
+
+        :param entries: [key, kind, value] entries
+        :type entries: list
+        :return: key / value dict of the file header
+        :rtype: dict
+        """
+
+        return {key: datetime.datetime.fromisoformat(value) if kind == "datetime" else value
+                for key, kind, value in entries}
+
+    def load(self, decoder_type: type, fingerprint: str, sorted_range: tuple = None) -> tuple:
+        """
+        Look a fingerprint up in the cache
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param fingerprint: Fingerprint of the file from DecodeCache.fingerprint
+        :type fingerprint: str
+        :param sorted_range: (key, start, end) tuple limiting the records to those with key from start to end, both
+                             included, found by binary search over the key column. key must be a sorted "time" column,
+                             start and end may be None.
+        :type sorted_range: tuple
+        :return: (header_dict, count, records) with records a generator of the cached records, None on a miss
+        :rtype: tuple
+        """
+
+        logger = logging.getLogger(__name__)
+        path = self.path(decoder_type, fingerprint)
+
+        try:
+            fh = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            fh.close()
+            logger.warning("Ignoring unreadable decode cache: %s", path)
+            return None
+
+        try:
+            if mm[:len(DECODE_CACHE_MAGIC)] != DECODE_CACHE_MAGIC:
+                raise ValueError("Bad magic")
+
+            header_start = len(DECODE_CACHE_MAGIC) + 8
+            header_size = int.from_bytes(mm[len(DECODE_CACHE_MAGIC):header_start], "little")
+            header = json.loads(mm[header_start:header_start + header_size])
+            header["data_start"] = -(-(header_start + header_size) // 8) * 8
+
+            if header["fingerprint"] != fingerprint or header["columns"] != [list(c) for c in decoder_type.CACHE_COLUMNS]:
+                raise ValueError("Stale layout")
+        except (ValueError, KeyError) as e:
+            mm.close()
+            fh.close()
+            logger.warning("Ignoring invalid decode cache %s: %s", path, e)
+            return None
+
+        first, last = 0, header["count"]
+        if sorted_range is not None:
+            first, last = self._range(decoder_type, header, mm, *sorted_range)
+
+        logger.info("Reading %s records from decode cache: %s", last - first, path)
+        records = self._records(decoder_type, header, mm, fh, first, last)
+        return self.decode_header(header["header"]), last - first, records
+
+    @classmethod
+    def _range(cls, decoder_type: type, header: dict, mm: mmap.mmap, key: str, start: datetime.datetime,
+               end: datetime.datetime) -> tuple:
+        """
+        Find the records with a sorted time column from start to end by binary search over the mapped column
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param header: JSON header of the sidecar
+        :type header: dict
+        :param mm: Map of the sidecar
+        :type mm: mmap.mmap
+        :param key: Key of the sorted "time" column
+        :type key: str
+        :param start: Time of the first record, None for the first record
+        :type start: datetime.datetime
+        :param end: Time of the last record, None for the last record
+        :type end: datetime.datetime
+        :return: (first, last) indexes of the records, last excluded
+        :rtype: tuple
+        """
+
+        epoch = DayOfYearEpochCache.EPOCH
+        one_us = datetime.timedelta(microseconds=1)
+        count = header["count"]
+        index = [k for k, kind in decoder_type.CACHE_COLUMNS].index(key)
+        offset = header["data_start"] + header["offsets"][index]
+
+        with memoryview(mm) as view, view[offset:offset + count * 8].cast("q") as column:
+            first = bisect.bisect_left(column, (start - epoch) // one_us) if start is not None else 0
+            last = bisect.bisect_right(column, (end - epoch) // one_us) if end is not None else count
+
+        return first, max(first, last)
+
+    @classmethod
+    def _records(cls, decoder_type: type, header: dict, mm: mmap.mmap, fh, first: int, last: int) -> Iterable:
+        """
+        Build the records of a sidecar from its mapped columns, closing the map once they have all been returned
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param header: JSON header of the sidecar
+        :type header: dict
+        :param mm: Map of the sidecar
+        :type mm: mmap.mmap
+        :param fh: Open sidecar file
+        :type fh: file object
+        :param first: Index of the first record
+        :type first: int
+        :param last: Index after the last record
+        :type last: int
+        :return: generator returning records of decoder_type.RECORD_TYPE
+        :rtype: Iterable
+        """
+
+        epoch = DayOfYearEpochCache.EPOCH
+        one_us = datetime.timedelta(microseconds=1)
+        count = header["count"]
+        view = memoryview(mm)
+        views = []
+        columns = []
+
+        try:
+            for (key, kind), offset in zip(decoder_type.CACHE_COLUMNS, header["offsets"]):
+                offset += header["data_start"]
+                typecode = cls.TYPECODES[kind]
+                column = view[offset:offset + count * array.array(typecode).itemsize].cast(typecode)
+                views.append(column)
+                column = column[first:last]
+                views.append(column)
+
+                if kind == "time":
+                    columns.append(map(epoch.__add__, map(one_us.__mul__, column)))
+                elif kind == "duration":
+                    columns.append(map(one_us.__mul__, column))
+                elif kind == "str":
+                    columns.append(map(header["strings"][key].__getitem__, column))
+                else:
+                    columns.append(column)
+
+            record_type = decoder_type.RECORD_TYPE
+            for values in zip(*columns):
+                yield record_type(*values)
+        finally:
+            # Exported buffers must be released before the map can be closed
+            columns = None
+            for column in views:
+                column.release()
+            view.release()
+            mm.close()
+            fh.close()
+
+    def writer(self, decoder_type: type, fingerprint: str) -> "DecodeCacheWriter":
+        """
+        Start a sidecar for a fingerprint, records are appended as they are decoded
+
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param fingerprint: Fingerprint of the file from DecodeCache.fingerprint
+        :type fingerprint: str
+        :return: Writer of the sidecar
+        :rtype: DecodeCacheWriter
+        """
+
+        return DecodeCacheWriter(self, decoder_type, fingerprint)
+
+
+class _StringCodes(dict):
+    """
+    String table of a DecodeCache column, looking a new string up gives it the next code
+    """
+
+    def __missing__(self, key: str) -> int:
+        code = self[key] = len(self)
+        return code
+
+
+class DecodeCacheWriter(object):
+    """
+    Accumulates the columns of a file being decoded and writes them to a DecodeCache sidecar once the whole file has
+    been decoded
+
+    :ivar cache: Cache the sidecar is written to
+    :vartype cache: DecodeCache
+    :ivar decoder_type: Decoder class decoding the file
+    :vartype decoder_type: type
+    :ivar fingerprint: Fingerprint of the decoded file
+    :vartype fingerprint: str
+    :ivar count: Number of records converted to columns
+    :vartype count: int
+    :cvar BATCH_SIZE: Number of records buffered before they are converted to columns
+    :vartype BATCH_SIZE: int
+    """
+
+    BATCH_SIZE = 4096
+
+    def __init__(self, cache: DecodeCache, decoder_type: type, fingerprint: str):
+        """
+        Initialize an empty DecodeCacheWriter
+
+        :param cache: Cache the sidecar is written to
+        :type cache: DecodeCache
+        :param decoder_type: Decoder class decoding the file
+        :type decoder_type: type
+        :param fingerprint: Fingerprint of the decoded file
+        :type fingerprint: str
+        """
+
+        self.cache = cache
+        self.decoder_type = decoder_type
+        self.fingerprint = fingerprint
+        self.count = 0
+        self._getter = operator.attrgetter(*(key for key, kind in decoder_type.CACHE_COLUMNS))
+        self._columns = [array.array(DecodeCache.TYPECODES[kind]) for key, kind in decoder_type.CACHE_COLUMNS]
+        self._strings = {key: _StringCodes() for key, kind in decoder_type.CACHE_COLUMNS if kind == "str"}
+        self._rows = []
+
+    def append(self, record) -> None:
+        """
+        Append a decoded record, records are buffered and converted to columns in batches
+
+        :param record: Record of decoder_type.RECORD_TYPE
+        :type record: DecodedRecord
+        :return: None
+        :rtype: None
+        """
+
+        self._rows.append(self._getter(record))
+        if len(self._rows) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        """
+        Convert the buffered records to columns
+
+        :return: None
+        :rtype: None
+        """
+
+        if not self._rows:
+            return
+
+        epoch = DayOfYearEpochCache.EPOCH
+        one_us = datetime.timedelta(microseconds=1)
+
+        # Each column is converted with a single map so the conversions run without a Python level loop
+        for (key, kind), column, values in zip(self.decoder_type.CACHE_COLUMNS, self._columns, zip(*self._rows)):
+            if kind == "time":
+                column.extend(map(one_us.__rfloordiv__, map(epoch.__rsub__, values)))
+            elif kind == "duration":
+                column.extend(map(one_us.__rfloordiv__, values))
+            elif kind == "str":
+                column.extend(map(self._strings[key].__getitem__, values))
+            else:
+                column.extend(values)
+
+        self.count += len(self._rows)
+        self._rows = []
+
+    def commit(self, header_dict: dict) -> str:
+        """
+        Write the sidecar, it is written to a temporary file first so readers never see a partial sidecar
+
+        :param header_dict: key / value dict of the decoded file header
+        :type header_dict: dict
+        :return: Filepath of the sidecar
+        :rtype: str
+        """
+
+        logger = logging.getLogger(__name__)
+        path = self.cache.path(self.decoder_type, self.fingerprint)
+        self._flush()
+
+        # Column offsets are relative to the first 8 byte boundary after the JSON header
+        header = {
+            "fingerprint": self.fingerprint,
+            "columns": [list(c) for c in self.decoder_type.CACHE_COLUMNS],
+            "count": self.count,
+            "header": DecodeCache.encode_header(header_dict),
+            "strings": {key: list(strings) for key, strings in self._strings.items()},
+            "offsets": []
+        }
+        offset = 0
+        for column in self._columns:
+            header["offsets"].append(offset)
+            offset += -(-len(column) * column.itemsize // 8) * 8
+
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-(len(DECODE_CACHE_MAGIC) + 8 + len(encoded)) % 8)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(DECODE_CACHE_MAGIC)
+                fh.write(len(encoded).to_bytes(8, "little"))
+                fh.write(encoded)
+                for column in self._columns:
+                    data = column.tobytes()
+                    fh.write(data)
+                    fh.write(b"\0" * (-len(data) % 8))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+        logger.info("Wrote %s records to decode cache: %s", self.count, path)
+        return path
+
+
+# Number of lines a decoder counts locally before adding them to its DecoderStats
+STATS_FLUSH_LINES = 1024
+
+
+class DecoderStats(object):
+    """
+    Throughput counters of a Decoder. Counters are updated every STATS_FLUSH_LINES lines while events are decoded and
+    once more when decoding stops, so they can be read while parse() is still running as well as after it finishes.
+    Per-stage timings are only collected by instrumented decoders.
+
+    :ivar lines_read: Number of event lines read
+    :vartype lines_read: int
+    :ivar lines_rejected: Number of misformatted event lines, skipped up to the max_rejected of the decoder
+    :vartype lines_rejected: int
+    :ivar lines_filtered: Number of event lines skipped by the filters or the time window of parse()
+    :vartype lines_filtered: int
+    :ivar records: Number of records produced
+    :vartype records: int
+    :ivar bytes_read: Size of the event lines read, in characters for text files and bytes for binary files
+    :vartype bytes_read: int
+    :ivar parse_seconds: Time spent cutting lines into fields and converting text fields
+    :vartype parse_seconds: float
+    :ivar time_seconds: Time spent converting timestamps
+    :vartype time_seconds: float
+    :ivar numeric_seconds: Time spent converting numeric fields
+    :vartype numeric_seconds: float
+    :ivar report_interval: Seconds between periodic log reports of the counters, None disables them
+    :vartype report_interval: float
+    """
+
+    def __init__(self, report_interval: float = None):
+        """
+        Initialize zeroed DecoderStats.
+
+        :param report_interval: Seconds between periodic log reports of the counters, None disables them
+        :type report_interval: float
+        """
+
+        self.lines_read = 0
+        self.lines_rejected = 0
+        self.lines_filtered = 0
+        self.records = 0
+        self.bytes_read = 0
+        self.parse_seconds = 0.0
+        self.time_seconds = 0.0
+        self.numeric_seconds = 0.0
+        self.report_interval = report_interval
+        self._start = None
+        self._stop = None
+        self._last_report = None
+
+    def start(self) -> None:
+        """
+        Mark the start of decoding, the first call starts the wall clock used for rates
+
+        :return: None
+        :rtype: None
+        """
+
+        if self._start is None:
+            self._start = self._last_report = time.perf_counter()
+        self._stop = None
+
+    def stop(self) -> None:
+        """
+        Mark the end of decoding, freezing the wall clock used for rates
+
+        :return: None
+        :rtype: None
+        """
+
+        self._stop = time.perf_counter()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """
+        Wall time since decoding started, up to its end once stopped
+        """
+
+        if self._start is None:
+            return 0.0
+        return (self._stop or time.perf_counter()) - self._start
+
+    @property
+    def bytes_per_second(self) -> float:
+        """
+        Rate of bytes read over the elapsed wall time
+        """
+
+        elapsed = self.elapsed_seconds
+        return self.bytes_read / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        Rate of records produced over the elapsed wall time
+        """
+
+        elapsed = self.elapsed_seconds
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> dict:
+        """
+        Snapshot of the counters and rates
+
+        :return: key / value dict of every counter and rate
+        :rtype: dict
+        """
+
+        return {
+            "lines_read": self.lines_read,
+            "lines_rejected": self.lines_rejected,
+            "lines_filtered": self.lines_filtered,
+            "records": self.records,
+            "bytes_read": self.bytes_read,
+            "parse_seconds": self.parse_seconds,
+            "time_seconds": self.time_seconds,
+            "numeric_seconds": self.numeric_seconds,
+            "elapsed_seconds": self.elapsed_seconds,
+            "bytes_per_second": self.bytes_per_second,
+            "records_per_second": self.records_per_second
+        }
+
+    def add(self, lines: int, rejected: int, records: int, size: int, parse_seconds: float = 0.0,
+            time_seconds: float = 0.0, numeric_seconds: float = 0.0, filtered: int = 0) -> None:
+        """
+        Add a batch of counts, decoders accumulate counts in locals and add them every STATS_FLUSH_LINES lines
+
+        :param lines: Number of event lines read
+        :type lines: int
+        :param rejected: Number of event lines rejected
+        :type rejected: int
+        :param records: Number of records produced
+        :type records: int
+        :param size: Size of the event lines read
+        :type size: int
+        :param parse_seconds: Time spent cutting lines into fields
+        :type parse_seconds: float
+        :param time_seconds: Time spent converting timestamps
+        :type time_seconds: float
+        :param numeric_seconds: Time spent converting numeric fields
+        :type numeric_seconds: float
+        :param filtered: Number of event lines skipped by filters
+        :type filtered: int
+        :return: None
+        :rtype: None
+        """
+
+        self.lines_read += lines
+        self.lines_rejected += rejected
+        self.lines_filtered += filtered
+        self.records += records
+        self.bytes_read += size
+        self.parse_seconds += parse_seconds
+        self.time_seconds += time_seconds
+        self.numeric_seconds += numeric_seconds
+
+    @staticmethod
+    def stage_clock(instrument: bool):
+        """
+        Clock read by the decode loops around each stage, time.perf_counter for instrumented decoders and a clock
+        always reading 0.0 otherwise, so the loops time their stages without checking whether they are instrumented
+
+        :param instrument: Whether the decoder collects per-stage timings
+        :type instrument: bool
+        :return: Function returning the current time in seconds
+        :rtype: function
+        """
+
+        return time.perf_counter if instrument else float
+
+    def maybe_report(self, name: str) -> None:
+        """
+        Log the counters if report_interval has elapsed since the last report, called periodically by the decoders
+
+        :param name: Name of the decoded file for the log line
+        :type name: str
+        :return: None
+        :rtype: None
+        """
+
+        if self.report_interval is None:
+            return
+
+        now = time.perf_counter()
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            logger = logging.getLogger(__name__)
+            logger.info("Decoding %s: %s", name, self)
+
+    def __str__(self) -> str:
+        return ("%s lines read, %s rejected, %s filtered, %s records, %.0f bytes/s, %.0f records/s, "
+                "parse %.3fs, timestamps %.3fs, numerics %.3fs" % (self.lines_read, self.lines_rejected,
+                                                                    self.lines_filtered, self.records,
+                                                                    self.bytes_per_second, self.records_per_second,
+                                                                    self.parse_seconds, self.time_seconds,
+                                                                    self.numeric_seconds))
+
 
 class Decoder(object):
     """
@@ -21,24 +1070,117 @@ class Decoder(object):
     :vartype header_dict: dict
     :ivar filename: Filepath to the file being decoded
     :vartype header_dict: str
-
+    :ivar use_mmap: Whether the file was requested to be memory-mapped
+    :vartype use_mmap: bool
+    :ivar compression: Name of the compression format the file is streamed from, None for uncompressed files
+    :vartype compression: str
+    :ivar instrument: Whether per-stage timings are collected into stats
+    :vartype instrument: bool
+    :ivar max_rejected: Number of misformatted event lines skipped before decoding fails
+    :vartype max_rejected: int
+    :ivar stats: Throughput counters of the decoding
+    :vartype stats: DecoderStats
+    :ivar cache: Cache of decoded files read by parse() instead of the file when it holds the file, None disables it
+    :vartype cache: DecodeCache
+    :ivar _epoch_cache: Private cache of day midnights used to decode event timestamps
+    :vartype _epoch_cache: DayOfYearEpochCache
+    :ivar _binary: Private flag set when _fh yields bytes lines instead of str lines
+    :vartype _binary: bool
+    :ivar _text: Private function converting a raw field of _fh to str
+    :vartype _text: function
+    :cvar EVENT_RECORD_REGEX: Regex matching an event line, used for lines that fail the fixed-width length check
+    :vartype EVENT_RECORD_REGEX: str
+    :cvar EVENT_RECORD_FIELDS: List of (key, width, gap) tuples describing the fixed-width layout of an event line
+    :vartype EVENT_RECORD_FIELDS: list
+    :cvar RECORD_PARSER: Parser compiled from EVENT_RECORD_FIELDS when the subclass is created
+    :vartype RECORD_PARSER: FixedWidthRecordParser
+    :cvar RECORD_TYPE: Record class returned by parse()
+    :vartype RECORD_TYPE: type
+    :cvar CACHE_COLUMNS: List of (key, kind) tuples of the RECORD_TYPE constructor arguments stored by DecodeCache
+    :vartype CACHE_COLUMNS: list
+    :cvar DECODER_VERSION: Version of the decoded records, bump it whenever parse() returns different records for the
+                           same file so that stale DecodeCache sidecars are missed
+    :vartype DECODER_VERSION: int
+    :cvar FILTERS: Filters accepted by parse(), dict of filter name to (key, convert, match) tuples. convert turns the
+                   raw field of key into its record value, a str names a method of the decoder. match is "in" for a
+                   collection of accepted values, "range" for a (first, last) tuple of accepted values and "eq" for a
+                   single accepted value.
+    :vartype FILTERS: dict
     """
 
-    def __init__(self, filename: Union[str | io.IOBase]):
+    EVENT_RECORD_REGEX = ""
+    EVENT_RECORD_FIELDS = []
+    RECORD_TYPE = None
+    CACHE_COLUMNS = []
+    DECODER_VERSION = 1
+    FILTERS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Compile the record layout once per Decoder class
+        if cls.EVENT_RECORD_FIELDS:
+            cls.RECORD_PARSER = FixedWidthRecordParser(cls.EVENT_RECORD_FIELDS, cls.EVENT_RECORD_REGEX)
+
+    def __init__(self, filename: Union[str | io.IOBase], use_mmap: bool = False, instrument: bool = False, stats_interval: float = None, cache_dir: str = None, max_rejected: int = 0):
         """
         Initialize a Decoder which handles the generic functionality of Decoder classes.
 
-        :param filename: Filepath to View Period file.
+        :param filename: Filepath to View Period file. Binary file objects are decoded from bytes lines. gzip, bz2 and
+                         xz compressed files and binary file objects are decompressed as they are read.
         :type filename: str | io.IOBase
+        :param use_mmap: Memory-map the file at filename and decode it from bytes lines, ignored for file objects.
+                         Compressed files can not be mapped, they are streamed as bytes lines instead.
+        :type use_mmap: bool
+        :param instrument: Collect per-stage timings into self.stats, at the cost of a few clock reads per line
+        :type instrument: bool
+        :param stats_interval: Seconds between periodic log reports of self.stats while parsing, None disables them
+        :type stats_interval: float
+        :param cache_dir: Directory of a DecodeCache, parse() reads files decoded before from the cache and adds files
+                          it decodes to it. Only files on disk are cached.
+        :type cache_dir: str
+        :param max_rejected: Number of misformatted event lines counted in stats and skipped, the next one fails the
+                             decoding with a ValueError
+        :type max_rejected: int
         """
         logger = logging.getLogger(__name__)
+        self.compression = None
 
         if isinstance(filename, io.IOBase):
             self._fh = filename
+
+            # Binary file objects are checked for compression without consuming their first bytes
+            if not isinstance(filename, io.TextIOBase):
+                if hasattr(filename, "peek"):
+                    head = filename.peek(COMPRESSION_MAGIC_SIZE)[:COMPRESSION_MAGIC_SIZE]
+                elif filename.seekable():
+                    position = filename.tell()
+                    head = filename.read(COMPRESSION_MAGIC_SIZE)
+                    filename.seek(position)
+                else:
+                    head = b""
+
+                compression = detect_compression(head)
+                if compression is not None:
+                    self.compression, opener = compression
+                    self._fh = opener(filename, "rb")
         # Check if filepath is valid
         elif os.path.isfile(filename):
             try:
-                self._fh = open(filename, "r")
+                with open(filename, "rb") as fh:
+                    compression = detect_compression(fh.read(COMPRESSION_MAGIC_SIZE))
+
+                # Compressed files are decompressed as a stream, as bytes lines when the file was to be mapped
+                if compression is not None:
+                    self.compression, opener = compression
+                    self._fh = opener(filename, "rb" if use_mmap else "rt")
+                # Empty files can not be mapped, they are read through a regular binary file instead
+                elif use_mmap and os.path.getsize(filename) > 0:
+                    self._fh = MappedLineReader(filename)
+                elif use_mmap:
+                    self._fh = open(filename, "rb")
+                else:
+                    self._fh = open(filename, "r")
             except Exception as e:
                 logger.exception(e)
         else:
@@ -48,26 +1190,208 @@ class Decoder(object):
         try:
             self.filename = self._fh.name
         except AttributeError:
-            self.filename = "Buffered_IO"
+            # Not every decompressing stream knows its file name
+            self.filename = filename if isinstance(filename, str) else "Buffered_IO"
         self.header_dict = None
+        self.use_mmap = use_mmap
+        self.instrument = instrument
+        self.max_rejected = max_rejected
+        self.stats = DecoderStats(stats_interval)
+        self.cache = DecodeCache(cache_dir) if cache_dir is not None and isinstance(filename, str) else None
+        self._fingerprint = None
+        self._epoch_cache = DayOfYearEpochCache()
+        self._binary = not isinstance(self._fh, io.TextIOBase)
+        self._text = bytes.decode if self._binary else str
+
+
+    def reject_line(self, line: Union[str, bytes], rejected: int) -> None:
+        """
+        Handle an event line RECORD_PARSER.split rejected, the line is logged and skipped while no more than
+        max_rejected lines of the file were rejected, past that the misformatted line error of parse_line is raised
+
+        :param line: Misformatted event line
+        :type line: str | bytes
+        :param rejected: Number of lines of the file rejected so far, this one included
+        :type rejected: int
+        :return: None
+        :rtype: None
+        """
+
+        if rejected > self.max_rejected:
+            # Raises the misformatted line error
+            self.parse_line(line)
+
+        logger = logging.getLogger(__name__)
+        logger.warning("Skipping misformatted event line %s of %s: %r", rejected, self.filename, line)
+
+    def compile_filters(self, filters: dict) -> list:
+        """
+        Compile parse() filters into checks of the raw fields returned by RECORD_PARSER.split, the result of a check
+        is kept per raw field value so each distinct value is only converted once
+
+        :param filters: key / value dict of filter name in FILTERS to accepted values, None values are ignored
+        :type filters: dict
+        :return: list of (key, index, test, check) tuples, test takes the record value and check the raw field
+        :rtype: list
+        """
+
+        logger = logging.getLogger(__name__)
+        compiled = []
+
+        def memoized_check(convert, test):
+            # Each filter gets its own memo of raw field value to result
+            memo = {}
+
+            def check(raw):
+                result = memo.get(raw)
+                if result is None:
+                    try:
+                        result = memo[raw] = test(convert(raw))
+                    except ValueError:
+                        # Misformatted fields never match
+                        result = memo[raw] = False
+                return result
+
+            return check
+
+        for name, accepted in filters.items():
+            if accepted is None:
+                continue
+
+            if name not in self.FILTERS:
+                logger.error("Unknown filter '%s' for %s, expected one of %s", name, type(self).__name__, list(self.FILTERS))
+                raise ValueError("Unknown filter: %s" % name)
+
+            key, convert, match = self.FILTERS[name]
+            if isinstance(convert, str):
+                convert = getattr(self, convert)
+
+            if match == "in":
+                test = frozenset(accepted).__contains__
+            elif match == "range":
+                test = lambda value, first=accepted[0], last=accepted[1]: first <= value <= last
+            else:
+                test = lambda value, accepted=accepted: value == accepted
+
+            compiled.append((key, self.RECORD_PARSER.keys.index(key), test, memoized_check(convert, test)))
+
+        return compiled
+
+    @classmethod
+    def filter_records(cls, records: Iterable, filters: list) -> Iterable:
+        """
+        Apply compiled filters to decoded records, used for records that were not decoded from raw lines
+
+        :param records: Records of RECORD_TYPE
+        :type records: Iterable
+        :param filters: Filters from compile_filters
+        :type filters: list
+        :return: generator returning the accepted records
+        :rtype: Iterable
+        """
+
+        tests = [(operator.attrgetter(key), test) for key, index, test, check in filters]
+        for record in records:
+            if all(test(getter(record)) for getter, test in tests):
+                yield record
+
+    def read_cache(self, sorted_range: tuple = None, filters: list = None) -> Iterable:
+        """
+        Read the records of the file from self.cache, header will be placed into self.header_dict
+
+        :param sorted_range: (key, start, end) tuple limiting the records to those with key from start to end, both
+                             included, key must be a "time" column sorted in the file. start and end may be None.
+        :type sorted_range: tuple
+        :param filters: Filters from compile_filters applied to the cached records
+        :type filters: list
+        :return: generator returning the cached records, None when the file is not cached
+        :rtype: Iterable
+        """
+
+        if self.cache is None or self.header_dict is not None:
+            return None
+
+        if self._fingerprint is None:
+            self._fingerprint = DecodeCache.fingerprint(type(self), self.filename)
+
+        cached = self.cache.load(type(self), self._fingerprint, sorted_range)
+        if cached is None:
+            return None
+
+        self.header_dict, count, records = cached
+        if not filters:
+            self.stats.add(0, 0, count, 0)
+            return records
+
+        return self._count_filtered(self.filter_records(records, filters), count)
+
+    def _count_filtered(self, records: Iterable, count: int) -> Iterable:
+        """
+        Count the cached records accepted by filters into self.stats once they have all been returned
+
+        :param records: Filtered cached records
+        :type records: Iterable
+        :param count: Number of cached records before filtering
+        :type count: int
+        :return: generator returning records
+        :rtype: Iterable
+        """
+
+        num_r = 0
+        try:
+            for record in records:
+                num_r += 1
+                yield record
+        finally:
+            self.stats.add(0, 0, num_r, 0, filtered=count - num_r)
+
+    def cache_writer(self) -> DecodeCacheWriter:
+        """
+        Start adding the file to self.cache, read_cache() must have missed before
+
+        :return: Writer the decoded records are appended to, None when caching is disabled
+        :rtype: DecodeCacheWriter
+        """
+
+        if self.cache is None or self._fingerprint is None:
+            return None
+
+        return self.cache.writer(type(self), self._fingerprint)
+
+    def read_header_lines(self, count: int = 11) -> list:
+        """
+        Read the lines of the file header as str, whatever the mode of the underlying file
+
+        :param count: Number of header lines
+        :type count: int
+        :return: Header lines, each ending with a newline
+        :rtype: list
+        """
+
+        lines = [next(self._fh) for _ in range(count)]
+
+        if self._binary:
+            lines = [line.decode("ascii").replace("\r\n", "\n") for line in lines]
+
+        return lines
 
     @abstractmethod
     def parse(self):
         pass
 
     @classmethod
-    def rtlt_to_timedelta(cls, rtlt_dur_str: str) -> datetime.timedelta:
+    def rtlt_to_timedelta(cls, rtlt_dur_str: Union[str, bytes]) -> datetime.timedelta:
       """
       Converts the formatted duration from the Viewperiod RTLT field into a python timedelta
 
-      :param rtlt_dur_str: str containing the duration of rtlt
-      :type rtlt_dur_str: str
+      :param rtlt_dur_str: str containing the duration of rtlt, bytes fields from binary files are accepted
+      :type rtlt_dur_str: str | bytes
       :return: timedelta object of the formatted duration
       :rtype: datetime.timedelta
       """
 
       # Split duration string into hour, minutes, seconds components and type convert them
-      hh, mm, ssz = rtlt_dur_str.split(":", 3)
+      hh, mm, ssz = rtlt_dur_str.split(b":" if isinstance(rtlt_dur_str, bytes) else ":", 3)
       hh, mm, ssz = int(hh), int(mm), float(ssz)
 
       return datetime.timedelta(hours=hh, minutes=mm, seconds=ssz)
@@ -85,24 +1409,80 @@ class DsnViewPeriodPredLegacyDecoder(Decoder):
     :vartype HEADER_TIME_FORMAT: str
     :cvar EVENT_TIME_FORMAT: Format of the datetimes in the events
     :vartype EVENT_TIME_FORMAT: str
+    :cvar COLUMN_TYPES: List of (key, array typecode, NumPy dtype) tuples describing the arrays of parse_columns
+    :vartype COLUMN_TYPES: list
     """
 
     HEADER_TIME_FORMAT = "%Y-%jT%H:%M:%S"
     EVENT_TIME_FORMAT = "%y %j/%H:%M:%S"
 
     EVENT_RECORD_REGEX = "(?P<TIME>.{15}).(?P<EVENT>.{16}).(?P<SPACECRAFT_IDENTIFIER>.{3}).(?P<STATION_IDENTIFIER>.{2}).(?P<PASS>.{4}).(?P<AZIMUTH>.{5}).(?P<ELEVATION>.{5}).(?P<AZ_LHA_X>.{5}).(?P<EL_DEC_Y>.{5}).(?P<RTLT>.{10})"
-
-    def __init__(self, filename: Union[str | io.IOBase]):
+    EVENT_RECORD_FIELDS = [("TIME", 15, 1),
+                           ("EVENT", 16, 1),
+                           ("SPACECRAFT_IDENTIFIER", 3, 1),
+                           ("STATION_IDENTIFIER", 2, 1),
+                           ("PASS", 4, 1),
+                           ("AZIMUTH", 5, 1),
+                           ("ELEVATION", 5, 1),
+                           ("AZ_LHA_X", 5, 1),
+                           ("EL_DEC_Y", 5, 1),
+                           ("RTLT", 10, 0)]
+
+    COLUMN_TYPES = [("TIME", "q", "int64"),
+                    ("EVENT", "h", "int16"),
+                    ("SPACECRAFT_IDENTIFIER", "h", "int16"),
+                    ("STATION_IDENTIFIER", "h", "int16"),
+                    ("PASS", "h", "int16"),
+                    ("AZIMUTH", "f", "float32"),
+                    ("ELEVATION", "f", "float32"),
+                    ("AZ_LHA_X", "f", "float32"),
+                    ("EL_DEC_Y", "f", "float32"),
+                    ("RTLT", "q", "int64")]
+
+    RECORD_TYPE = VpEvent
+    FILTERS = {"stations": ("STATION_IDENTIFIER", int, "in"),
+               "events": ("EVENT", "decode_event_name", "in"),
+               "passes": ("PASS", int, "range"),
+               "spacecraft": ("SPACECRAFT_IDENTIFIER", int, "eq")}
+    CACHE_COLUMNS = [("TIME", "time"),
+                     ("EVENT", "str"),
+                     ("SPACECRAFT_IDENTIFIER", "int"),
+                     ("STATION_IDENTIFIER", "int"),
+                     ("PASS", "int"),
+                     ("AZIMUTH", "float"),
+                     ("ELEVATION", "float"),
+                     ("AZ_LHA_X", "float"),
+                     ("EL_DEC_Y", "float"),
+                     ("RTLT", "duration")]
+
+    def __init__(self, filename: Union[str | io.IOBase], use_mmap: bool = False, instrument: bool = False, stats_interval: float = None, cache_dir: str = None, max_rejected: int = 0):
         """
         Initialize a DsnViewPeriodPredLegacyDecoder which reads information from DSN View Period files.
 
         :param filename: Filepath to View Period file.
         :type filename: str | io.IOBase
+        :param use_mmap: Memory-map the file and decode it from bytes lines
+        :type use_mmap: bool
+        :param instrument: Collect per-stage timings into self.stats
+        :type instrument: bool
+        :param stats_interval: Seconds between periodic log reports of self.stats while parsing
+        :type stats_interval: float
+        :param cache_dir: Directory of a DecodeCache read and filled by parse()
+        :type cache_dir: str
+        :param max_rejected: Number of misformatted event lines skipped before decoding fails
+        :type max_rejected: int
         """
 
         logger = logging.getLogger(__name__)
         logger.info("Opening DSN View Period file for Decoding: %s", filename)
-        super(DsnViewPeriodPredLegacyDecoder, self).__init__(filename)
+        super(DsnViewPeriodPredLegacyDecoder, self).__init__(filename, use_mmap, instrument, stats_interval, cache_dir, max_rejected)
+
+        # EVENT string to categorical code, shared by every parse_columns chunk
+        self._event_codes = {}
+        self._raw_event_codes = {}
+
+        # Raw padded EVENT field to stripped event name, a file only holds a handful of event names
+        self._event_names = {}
 
     @classmethod
     def chop_header_line(cls, line: str) -> tuple:
@@ -165,16 +1545,69 @@ class DsnViewPeriodPredLegacyDecoder(Decoder):
         :rtype: dict
         """
 
-        logger = logging.getLogger(__name__)
-
-        # Parse View Period line using Regex
-        result = re.search(cls.EVENT_RECORD_REGEX, line)
+        # Parse View Period line using the fixed-width column layout
+        result = cls.RECORD_PARSER.parse(line)
 
-        if not result:
+        if result is None:
+            logger = logging.getLogger(__name__)
             logger.error("Got misformatted event line in DSN_VIEWPERIOD: %s", line)
             raise ValueError("Misformatted line")
 
-        return result.groupdict()
+        return result
+
+    def decode_event_time(self, time_str: Union[str, bytes]) -> datetime.datetime:
+        """
+        Converts the TIME field of an event line into a UTC datetime
+
+        :param time_str: TIME field formatted as EVENT_TIME_FORMAT, e.g. "20 001/03:53:52"
+        :type time_str: str | bytes
+        :return: UTC datetime of the event
+        :rtype: datetime.datetime
+        """
+
+        # Fast path through the day cache when the separators are where EVENT_TIME_FORMAT puts them
+        if time_str[6::3] in ("/::", b"/::"):
+            time = self._epoch_cache.decode(time_str[:6], time_str[7:9], time_str[10:12], time_str[13:15])
+            if time is not None:
+                return time
+
+        if isinstance(time_str, bytes):
+            time_str = time_str.decode("ascii")
+
+        return datetime.datetime.strptime(time_str, self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
+
+    def decode_event_name(self, event_field: Union[str, bytes]) -> str:
+        """
+        Converts the padded EVENT field of an event line into the event name
+
+        :param event_field: EVENT field of an event line
+        :type event_field: str | bytes
+        :return: Event name without padding, e.g. "RISE"
+        :rtype: str
+        """
+
+        try:
+            return self._event_names[event_field]
+        except KeyError:
+            event = self._event_names[event_field] = self._text(event_field).strip()
+            return event
+
+    def decode_event_time_us(self, time_str: Union[str, bytes]) -> int:
+        """
+        Converts the TIME field of an event line into microseconds since the Unix epoch
+
+        :param time_str: TIME field formatted as EVENT_TIME_FORMAT, e.g. "20 001/03:53:52"
+        :type time_str: str | bytes
+        :return: Microseconds since 1970-01-01T00:00:00Z
+        :rtype: int
+        """
+
+        if time_str[6::3] in ("/::", b"/::"):
+            time_us = self._epoch_cache.decode_epoch_us(time_str[:6], time_str[7:9], time_str[10:12], time_str[13:15])
+            if time_us is not None:
+                return time_us
+
+        return (self.decode_event_time(time_str) - DayOfYearEpochCache.EPOCH) // datetime.timedelta(microseconds=1)
 
     def read_header(self) -> dict:
         """
@@ -187,47 +1620,478 @@ class DsnViewPeriodPredLegacyDecoder(Decoder):
         if self.header_dict is not None:
             return self.header_dict
 
-        header = self.parse_header([next(self._fh) for _ in range(11)])
+        header = self.parse_header(self.read_header_lines())
         self.header_dict = header
 
         return header
 
-    def parse(self):
+    def seek_time(self, start: datetime.datetime) -> bool:
+        """
+        Move the read position to the first event at or after start, by binary search over the line-aligned byte
+        offsets of the event lines. Event lines must be sorted by TIME, as they are in View Period files. The header is
+        read first if it has not been read yet.
+
+        :param start: Time of the first event to read
+        :type start: datetime.datetime
+        :return: True if the read position was moved, False if the file can not be searched, only uncompressed files
+                 on disk can be
+        :rtype: bool
+        """
+
+        logger = logging.getLogger(__name__)
+
+        self.read_header()
+
+        if self.compression is not None or not os.path.isfile(self.filename):
+            return False
+
+        with open(self.filename, "rb") as fh:
+            for _ in range(11):
+                fh.readline()
+            body_start = fh.tell()
+
+            def time_at(position: int) -> tuple:
+                # Offset and time of the first line starting at or after position, None once past the last event
+                if position > body_start:
+                    fh.seek(position - 1)
+                    fh.readline()
+                else:
+                    fh.seek(body_start)
+                offset = fh.tell()
+                line = fh.readline()
+                try:
+                    return offset, self.decode_event_time(line[:15]) if line.strip() else None
+                except ValueError:
+                    return offset, None
+
+            # Smallest position whose next line is the first event at or after start
+            lo, hi = body_start, os.path.getsize(self.filename)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                offset, event_time = time_at(mid)
+                if event_time is None or event_time >= start:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            offset, event_time = time_at(lo)
+
+        logger.debug("Seeking %s to offset %s for events from %s", self.filename, offset, start.isoformat())
+        self._fh.seek(offset)
+        return True
+
+    def parse(self, start: datetime.datetime = None, end: datetime.datetime = None, stations: Iterable = None,
+              events: Iterable = None, passes: tuple = None, spacecraft: int = None):
         """
         Parse entire DSN View Period file, header will be placed into self.header_dict, uses a pythonic
         generator design pattern.  This function should be called in some iterative process such as a for loop.
 
-        :return: generator returning key / value dicts of events
-        :rtype: dict
+        start and end limit the parse to the events from start to end, both included. Decoding starts at start with
+        seek_time() when the file can be searched and stops at the first event after end.
+
+        The other filters are checked on the raw fields of each event line, lines they reject are skipped before their
+        timestamps and numbers are converted.
+
+        :param start: Time of the first event to return, None to start at the first event of the file
+        :type start: datetime.datetime
+        :param end: Time of the last event to return, None to stop at the last event of the file
+        :type end: datetime.datetime
+        :param stations: Station identifiers of the events to return, None for every station
+        :type stations: Iterable
+        :param events: Event names of the events to return, e.g. ["RISE", "SET"], None for every event
+        :type events: Iterable
+        :param passes: (first, last) pass numbers of the events to return, both included, None for every pass
+        :type passes: tuple
+        :param spacecraft: Spacecraft identifier of the events to return, None for every spacecraft
+        :type spacecraft: int
+        :return: generator returning VpEvent records of events, readable as key / value dicts
+        :rtype: VpEvent
         """
 
         logger = logging.getLogger(__name__)
         logger.info("Parsing DSN View Period File: %s",self.filename)
 
+        filters = self.compile_filters({"stations": stations, "events": events, "passes": passes, "spacecraft": spacecraft})
+
+        # Files decoded before are read back from the decode cache
+        cached = self.read_cache(("TIME", start, end), filters)
+        if cached is not None:
+            yield from cached
+            return
+
+        # Only whole files are cached
+        cache_writer = self.cache_writer() if start is None and end is None and not filters else None
+
         # Parse the Viewperiod header
         self.read_header()
 
         num_r = 0
+        lines = self._fh
+
+        # Events are sorted, lines before start are skipped on their TIME field alone when the file can not be searched
+        if start is not None and not self.seek_time(start):
+            lines = self.skip_events_before(lines, start)
 
         # Parse Viewperiod events
-        for line in self._fh:
-            r = self.parse_line(line)
-
-            r["TIME"] = datetime.datetime.strptime(r["TIME"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
-            r["EVENT"] = r["EVENT"].strip()
-            r["SPACECRAFT_IDENTIFIER"] = int(r["SPACECRAFT_IDENTIFIER"])
-            r["STATION_IDENTIFIER"] = int(r["STATION_IDENTIFIER"])
-            r["PASS"] = int(r["PASS"])
-            r["AZIMUTH"] = float(r["AZIMUTH"])
-            r["ELEVATION"] = float(r["ELEVATION"])
-            r["AZ_LHA_X"] = float(r["AZ_LHA_X"])
-            r["EL_DEC_Y"] = float(r["EL_DEC_Y"])
-            r["RTLT"] = self.rtlt_to_timedelta(r["RTLT"])
-            logger.debug("Parsed DSN Viewperiod event: %s", r)
+        for r in self.parse_events(lines, filters, end):
             num_r+=1
+            if cache_writer is not None:
+                cache_writer.append(r)
             yield r
 
         logger.info("Got %s activites from %s", num_r, self.filename)
+        logger.info("Decoded %s: %s", self.filename, self.stats)
+
+        if cache_writer is not None:
+            cache_writer.commit(self.header_dict)
+
+    def skip_events_before(self, lines: Iterable, start: datetime.datetime):
+        """
+        Skip the event lines before start on their TIME field alone, for files seek_time() can not search. Misformatted
+        lines are rejected as in parse_events, uses a pythonic generator design pattern.
+
+        :param lines: Iterable of event lines, str or bytes
+        :type lines: Iterable
+        :param start: Time of the first event line to return
+        :type start: datetime.datetime
+        :return: generator returning the event lines from the first event at or after start
+        :rtype: str | bytes
+        """
+
+        split = self.RECORD_PARSER.split
+        stats = self.stats
+        lines = iter(lines)
+
+        num_lines = num_rejected = num_bytes = 0
+        try:
+            for line in lines:
+                fields = split(line)
+                if fields is not None and self.decode_event_time(fields[0]) >= start:
+                    yield line
+                    break
+
+                num_lines += 1
+                num_bytes += len(line)
+                if fields is None:
+                    num_rejected += 1
+                    self.reject_line(line, stats.lines_rejected + num_rejected)
+        finally:
+            stats.add(num_lines, num_rejected, 0, num_bytes, filtered=num_lines - num_rejected)
+
+        yield from lines
+
+    def parse_events(self, lines: Iterable, filters: list = None, end: datetime.datetime = None) -> dict:
+        """
+        Convert View Period event lines into VpEvent records, uses a pythonic generator design pattern.
+
+        :param lines: Iterable of event lines, str or bytes
+        :type lines: Iterable
+        :param filters: Filters from compile_filters, lines they reject are skipped before their conversion
+        :type filters: list
+        :param end: Stop at the first event after end, None to convert every line
+        :type end: datetime.datetime
+        :return: generator returning VpEvent records of events
+        :rtype: VpEvent
+        """
+
+        logger = logging.getLogger(__name__)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        split = self.RECORD_PARSER.split
+        stats = self.stats
+        clock = stats.stage_clock(self.instrument)
+
+        checks = [(index, check) for key, index, test, check in filters or ()]
+
+        # Counts are kept in locals and added to stats in batches
+        num_lines = num_rejected = num_filtered = num_bytes = 0
+        parse_s = time_s = numeric_s = 0.0
+
+        stats.start()
+        try:
+            # Fields of binary files are converted straight from bytes
+            for line in lines:
+                num_lines += 1
+                num_bytes += len(line)
+
+                t0 = clock()
+                fields = split(line)
+                if fields is None:
+                    num_rejected += 1
+                    self.reject_line(line, stats.lines_rejected + num_rejected)
+                    continue
+
+                if checks and not all(check(fields[index]) for index, check in checks):
+                    num_filtered += 1
+                    # Events are sorted, a skipped line past end still ends the parse
+                    if end is not None and self.decode_event_time(fields[0]) > end:
+                        break
+                    continue
+
+                time_field, event, spacecraft, station, pass_number, azimuth, elevation, az_lha_x, el_dec_y, rtlt = fields
+                event = self.decode_event_name(event)
+
+                t1 = clock()
+                event_time = self.decode_event_time(time_field)
+                if end is not None and event_time > end:
+                    num_filtered += 1
+                    break
+
+                t2 = clock()
+                r = VpEvent(event_time,
+                            event,
+                            int(spacecraft),
+                            int(station),
+                            int(pass_number),
+                            float(azimuth),
+                            float(elevation),
+                            float(az_lha_x),
+                            float(el_dec_y),
+                            self.rtlt_to_timedelta(rtlt))
+
+                t3 = clock()
+                parse_s += t1 - t0
+                time_s += t2 - t1
+                numeric_s += t3 - t2
+
+                if num_lines >= STATS_FLUSH_LINES:
+                    # Every line up to here produced a record, was filtered or was rejected
+                    stats.add(num_lines, num_rejected, num_lines - num_rejected - num_filtered, num_bytes, parse_s,
+                              time_s, numeric_s, num_filtered)
+                    num_lines = num_rejected = num_filtered = num_bytes = 0
+                    parse_s = time_s = numeric_s = 0.0
+                    stats.maybe_report(self.filename)
+
+                if debug:
+                    logger.debug("Parsed DSN Viewperiod event: %s", r)
+                yield r
+        finally:
+            stats.add(num_lines, num_rejected, num_lines - num_rejected - num_filtered, num_bytes, parse_s, time_s,
+                      numeric_s, num_filtered)
+            stats.stop()
+
+    def body_ranges(self, chunk_bytes: int) -> list:
+        """
+        Split the event lines of the file into byte ranges of about chunk_bytes, each range starting and ending on a
+        line boundary
+
+        :param chunk_bytes: Target size of a range in bytes
+        :type chunk_bytes: int
+        :return: list of (start, end) byte offset tuples covering every event line in file order
+        :rtype: list
+        """
+
+        logger = logging.getLogger(__name__)
+
+        if chunk_bytes < 1:
+            logger.error("Invalid range size %s, expected at least 1 byte", chunk_bytes)
+            raise ValueError("Invalid range size: %s" % chunk_bytes)
+
+        ranges = []
+        with open(self.filename, "rb") as fh:
+            # Skip the 11 line header
+            for _ in range(11):
+                fh.readline()
+
+            start = fh.tell()
+            size = os.fstat(fh.fileno()).st_size
+
+            while start < size:
+                # Move the cut forward to the end of the line it lands in
+                fh.seek(min(start + chunk_bytes, size) - 1)
+                fh.readline()
+                end = fh.tell()
+                ranges.append((start, end))
+                start = end
+
+        return ranges
+
+    def parse_parallel(self, processes: int = None, chunk_bytes: int = 4 * 1024 * 1024):
+        """
+        Parse entire DSN View Period file across a pool of processes, header will be placed into self.header_dict.
+        The event lines are split into byte ranges that are decoded in parallel, events are returned in file order
+        exactly as parse() would return them. Only uncompressed files on disk can be decoded in parallel.
+
+        :param processes: Number of worker processes, defaults to the number of CPUs
+        :type processes: int
+        :param chunk_bytes: Target size in bytes of the range decoded by a single task
+        :type chunk_bytes: int
+        :return: generator returning VpEvent records of events, readable as key / value dicts
+        :rtype: VpEvent
+        """
+
+        logger = logging.getLogger(__name__)
+
+        if not os.path.isfile(self.filename):
+            logger.error("Parallel decoding requires a file on disk, got: %s", self.filename)
+            raise ValueError("Parallel decoding requires a file on disk: %s" % self.filename)
+
+        if self.compression is not None:
+            logger.error("Parallel decoding requires an uncompressed file, got %s file: %s", self.compression, self.filename)
+            raise ValueError("Parallel decoding requires an uncompressed file: %s" % self.filename)
+
+        processes = processes or os.cpu_count() or 1
+        logger.info("Parsing DSN View Period File: %s with %s processes", self.filename, processes)
+
+        self.read_header()
+
+        ranges = iter(self.body_ranges(chunk_bytes))
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+        num_r = 0
+        self.stats.start()
+
+        try:
+            # Keep a bounded number of ranges in flight and hand them back in submission order
+            pending = collections.deque(pool.submit(_parse_vp_byte_range, self.filename, start, end, self.max_rejected)
+                                        for start, end in itertools.islice(ranges, processes * 2))
+            while pending:
+                records, range_bytes, rejected = pending.popleft().result()
+
+                for start, end in itertools.islice(ranges, 1):
+                    pending.append(pool.submit(_parse_vp_byte_range, self.filename, start, end, self.max_rejected))
+
+                # Stage timings are spent in the workers, only the counters are kept here
+                num_r += len(records)
+                self.stats.add(len(records) + rejected, rejected, len(records), range_bytes)
+                if self.stats.lines_rejected > self.max_rejected:
+                    logger.error("Got %s misformatted event lines in %s, at most %s are skipped", self.stats.lines_rejected, self.filename, self.max_rejected)
+                    raise ValueError("Misformatted lines: %s" % self.stats.lines_rejected)
+                self.stats.maybe_report(self.filename)
+                yield from records
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.stats.stop()
+
+        logger.info("Got %s activites from %s", num_r, self.filename)
+        logger.info("Decoded %s: %s", self.filename, self.stats)
+
+    def parse_columns(self, chunk_size: int = None) -> dict:
+        """
+        Decode View Period events into NumPy arrays, one array per field. The whole remainder of the file is decoded
+        unless chunk_size is given, repeated calls then return consecutive chunks until an empty chunk marks the end of
+        the file. Header will be placed into self.header_dict.
+
+        TIME is returned as int64 microseconds since the Unix epoch and RTLT as int64 microseconds. EVENT is returned
+        as int16 codes indexing the "EVENT_CATEGORIES" array, codes stay stable across the chunks of a file.
+
+        :param chunk_size: Maximum number of events to decode, None for all remaining events
+        :type chunk_size: int
+        :return: key, value dict of field name to NumPy array, plus "EVENT_CATEGORIES"
+        :rtype: dict
+        """
+
+        if np is None:
+            raise ImportError("parse_columns requires NumPy, install libaerie with the 'numpy' extra")
+
+        logger = logging.getLogger(__name__)
+
+        self.read_header()
+
+        buffers = {key: array.array(typecode) for key, typecode, dtype in self.COLUMN_TYPES}
+        time_col = buffers["TIME"]
+        event_col = buffers["EVENT"]
+        spacecraft_col = buffers["SPACECRAFT_IDENTIFIER"]
+        station_col = buffers["STATION_IDENTIFIER"]
+        pass_col = buffers["PASS"]
+        azimuth_col = buffers["AZIMUTH"]
+        elevation_col = buffers["ELEVATION"]
+        az_lha_x_col = buffers["AZ_LHA_X"]
+        el_dec_y_col = buffers["EL_DEC_Y"]
+        rtlt_col = buffers["RTLT"]
+        one_us = datetime.timedelta(microseconds=1)
+        raw_event_codes = self._raw_event_codes
+        split = self.RECORD_PARSER.split
+        stats = self.stats
+        clock = stats.stage_clock(self.instrument)
+
+        num_lines = num_rejected = num_bytes = 0
+        parse_s = time_s = numeric_s = 0.0
+
+        stats.start()
+        try:
+            for line in itertools.islice(self._fh, chunk_size):
+                num_lines += 1
+                num_bytes += len(line)
+
+                t0 = clock()
+                fields = split(line)
+                if fields is None:
+                    num_rejected += 1
+                    self.reject_line(line, stats.lines_rejected + num_rejected)
+                    continue
+
+                time_field, event, spacecraft, station, pass_number, azimuth, elevation, az_lha_x, el_dec_y, rtlt = fields
+
+                # Look events up by their raw padded field so known events are never stripped or decoded again
+                code = raw_event_codes.get(event)
+                if code is None:
+                    code = self._event_codes.setdefault(self.decode_event_name(event), len(self._event_codes))
+                    raw_event_codes[event] = code
+                event_col.append(code)
+
+                t1 = clock()
+                time_col.append(self.decode_event_time_us(time_field))
+
+                t2 = clock()
+                spacecraft_col.append(int(spacecraft))
+                station_col.append(int(station))
+                pass_col.append(int(pass_number))
+                azimuth_col.append(float(azimuth))
+                elevation_col.append(float(elevation))
+                az_lha_x_col.append(float(az_lha_x))
+                el_dec_y_col.append(float(el_dec_y))
+                rtlt_col.append(self.rtlt_to_timedelta(rtlt) // one_us)
+
+                t3 = clock()
+                parse_s += t1 - t0
+                time_s += t2 - t1
+                numeric_s += t3 - t2
+        finally:
+            # Columns are returned whole, so the counts are only added once the chunk is decoded
+            stats.add(num_lines, num_rejected, num_lines - num_rejected, num_bytes, parse_s, time_s, numeric_s)
+            stats.stop()
+
+        # Wrap the typed buffers without copying them
+        columns = {key: np.frombuffer(buffers[key], dtype=dtype) for key, typecode, dtype in self.COLUMN_TYPES}
+        columns["EVENT_CATEGORIES"] = np.array(list(self._event_codes), dtype=str)
+
+        logger.debug("Decoded %s events into columns from %s", len(time_col), self.filename)
+
+        return columns
+
+
+def _parse_vp_byte_range(filename: str, start: int, end: int, max_rejected: int = 0) -> list:
+    """
+    Process pool task of DsnViewPeriodPredLegacyDecoder.parse_parallel, decodes the event lines within a byte range
+
+    :param filename: Filepath to View Period file
+    :type filename: str
+    :param start: Byte offset of the first line of the range
+    :type start: int
+    :param end: Byte offset following the last line of the range
+    :type end: int
+    :param max_rejected: Number of misformatted event lines of the file skipped before decoding fails
+    :type max_rejected: int
+    :return: tuple of the VpEvent records in the range, the size of the range in bytes and the number of lines rejected
+    :rtype: tuple
+    """
+
+    global _vp_range_decoder
+
+    with open(filename, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+
+    # The decoder only provides the line conversion and its caches, one is kept for the lifetime of the worker
+    if _vp_range_decoder is None:
+        _vp_range_decoder = DsnViewPeriodPredLegacyDecoder(io.BytesIO())
+    _vp_range_decoder.max_rejected = max_rejected
+
+    # The worker only decodes ranges of one file, its rejected lines so far count towards max_rejected
+    rejected = _vp_range_decoder.stats.lines_rejected
+    records = list(_vp_range_decoder.parse_events(data.splitlines(keepends=True)))
+    return records, len(data), _vp_range_decoder.stats.lines_rejected - rejected
+
+
+_vp_range_decoder = None
 
 
 class DsnStationAllocationFileDecoder(Decoder):
@@ -248,18 +2112,63 @@ class DsnStationAllocationFileDecoder(Decoder):
     EVENT_TIME_FORMAT = "%y %j%H%M"
 
     EVENT_RECORD_REGEX = "(?P<CHANGE_INDICATOR>.)(?P<YY>.{2}).(?P<DOY>.{3}).(?P<SOA>.{4}).(?P<BOT>.{4}).(?P<EOT>.{4}).(?P<EOA>.{4}).(?P<ANTENNA_ID>.{6}).(?P<PROJECT_ID>.{5}).(?P<DESCRIPTION>.{16}).(?P<PASS>.{4}).(?P<CONFIG_CODE>.{6})(?P<SOE_FLAG>.).(?P<WORK_CODE_CAT>.{3}).(?P<RELATE>.)."
-
-    def __init__(self, filename: Union[str | io.IOBase]):
+    EVENT_RECORD_FIELDS = [("CHANGE_INDICATOR", 1, 0),
+                           ("YY", 2, 1),
+                           ("DOY", 3, 1),
+                           ("SOA", 4, 1),
+                           ("BOT", 4, 1),
+                           ("EOT", 4, 1),
+                           ("EOA", 4, 1),
+                           ("ANTENNA_ID", 6, 1),
+                           ("PROJECT_ID", 5, 1),
+                           ("DESCRIPTION", 16, 1),
+                           ("PASS", 4, 1),
+                           ("CONFIG_CODE", 6, 0),
+                           ("SOE_FLAG", 1, 1),
+                           ("WORK_CODE_CAT", 3, 1),
+                           ("RELATE", 1, 1)]
+
+    RECORD_TYPE = SafAllocation
+    FILTERS = {"antennas": ("ANTENNA_ID", str, "in"),
+               "passes": ("PASS", int, "range"),
+               "project": ("PROJECT_ID", str.strip, "eq")}
+    CACHE_COLUMNS = [("CHANGE_INDICATOR", "str"),
+                     ("YY", "str"),
+                     ("DOY", "str"),
+                     ("SOA", "time"),
+                     ("BOT", "time"),
+                     ("EOT", "time"),
+                     ("EOA", "time"),
+                     ("ANTENNA_ID", "str"),
+                     ("PROJECT_ID", "str"),
+                     ("DESCRIPTION", "str"),
+                     ("PASS", "int"),
+                     ("CONFIG_CODE", "str"),
+                     ("SOE_FLAG", "str"),
+                     ("WORK_CODE_CAT", "str"),
+                     ("RELATE", "str")]
+
+    def __init__(self, filename: Union[str | io.IOBase], use_mmap: bool = False, instrument: bool = False, stats_interval: float = None, cache_dir: str = None, max_rejected: int = 0):
         """
         Initialize a DsnStationAllocationFileDecoder which reads information from DSN Station Allocation files.
 
         :param filename: Filepath to Station Allocation file.
         :type filename: str | io.IOBase
+        :param use_mmap: Memory-map the file and decode it from bytes lines
+        :type use_mmap: bool
+        :param instrument: Collect per-stage timings into self.stats
+        :type instrument: bool
+        :param stats_interval: Seconds between periodic log reports of self.stats while parsing
+        :type stats_interval: float
+        :param cache_dir: Directory of a DecodeCache read and filled by parse()
+        :type cache_dir: str
+        :param max_rejected: Number of misformatted event lines skipped before decoding fails
+        :type max_rejected: int
         """
 
         logger = logging.getLogger(__name__)
         logger.info("Opening DSN Station Allocation file for Decoding: %s", filename)
-        super(DsnStationAllocationFileDecoder, self).__init__(filename)
+        super(DsnStationAllocationFileDecoder, self).__init__(filename, use_mmap, instrument, stats_interval, cache_dir, max_rejected)
 
     @classmethod
     def chop_header_line(cls, line: str):
@@ -315,15 +2224,32 @@ class DsnStationAllocationFileDecoder(Decoder):
         :rtype: dict
         """
 
-        logger = logging.getLogger(__name__)
-
-        result = re.search(cls.EVENT_RECORD_REGEX, line)
+        result = cls.RECORD_PARSER.parse(line)
 
-        if not result:
+        if result is None:
+            logger = logging.getLogger(__name__)
             logger.error("Got misformatted event line in DSN Station Allocation File: %s", line)
             raise ValueError("Misformatted line")
 
-        return result.groupdict()
+        return result
+
+    def decode_event_time(self, day: str, hhmm: str) -> datetime.datetime:
+        """
+        Converts a SOA / BOT / EOT / EOA field of an event line into a UTC datetime on the given day
+
+        :param day: "YY DDD" day string built from the YY and DOY fields, e.g. "20 001"
+        :type day: str
+        :param hhmm: Time of day field, e.g. "0200"
+        :type hhmm: str
+        :return: UTC datetime of the time of day
+        :rtype: datetime.datetime
+        """
+
+        time = self._epoch_cache.decode(day, hhmm[:2], hhmm[2:])
+        if time is not None:
+            return time
+
+        return datetime.datetime.strptime(day + hhmm, self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
 
     def read_header(self) -> dict:
         """
@@ -336,55 +2262,147 @@ class DsnStationAllocationFileDecoder(Decoder):
         if self.header_dict is not None:
             return self.header_dict
 
-        header = self.parse_header([next(self._fh) for _ in range(11)])
+        header = self.parse_header(self.read_header_lines())
         self.header_dict = header
 
         return header
 
-    def parse(self):
+    def parse(self, antennas: Iterable = None, passes: tuple = None, project: str = None):
         """
         Parse entire DSN Station Allocation file, header will be placed into self.header_dict, uses a pythonic
         generator design pattern.  This function should be called in some iterative process such as a for loop.
 
-        :return: generator returning key / value dicts of events
-        :rtype: dict
+        The filters are checked on the raw fields of each allocation line, lines they reject are skipped before their
+        timestamps and numbers are converted.
+
+        :param antennas: Antenna IDs of the allocations to return, e.g. ["DSS-14"], None for every antenna
+        :type antennas: Iterable
+        :param passes: (first, last) pass numbers of the allocations to return, both included, None for every pass
+        :type passes: tuple
+        :param project: Project ID of the allocations to return, None for every project
+        :type project: str
+        :return: generator returning SafAllocation records of events, readable as key / value dicts
+        :rtype: SafAllocation
         """
 
         logger = logging.getLogger(__name__)
         logger.info("Parsing DSN Station Allocation File: %s", self.filename)
 
-        self.read_header()
-
-        num_r = 0
-
-        for line in self._fh:
-            r = self.parse_line(line)
-
-            # We need to do a check here, End of Track and End of Activity can roll over to the end of the day
-
-            if r["SOA"] > r["EOT"]:
-                r["EOT"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["EOT"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc) + datetime.timedelta(days=1)
-            else:
-                r["EOT"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["EOT"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
+        filters = self.compile_filters({"antennas": antennas, "passes": passes, "project": project})
+        checks = [(index, check) for key, index, test, check in filters]
 
-            if r["SOA"] > r["EOA"]:
-                r["EOA"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["EOA"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc) + datetime.timedelta(days=1)
-            else:
-                r["EOA"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["EOA"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
+        # Files decoded before are read back from the decode cache
+        cached = self.read_cache(filters=filters)
+        if cached is not None:
+            yield from cached
+            return
 
-            r["SOA"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["SOA"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
-            r["BOT"] = datetime.datetime.strptime(r["YY"] + " " + r["DOY"] + r["BOT"], self.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
+        # Only whole files are cached
+        cache_writer = self.cache_writer() if not filters else None
 
-            r["PROJECT_ID"] = r["PROJECT_ID"].strip()
-            r["DESCRIPTION"] = r["DESCRIPTION"].strip()
-            r["PASS"] = int(r["PASS"])
-            r["CONFIG_CODE"] = r["CONFIG_CODE"].strip()
+        self.read_header()
 
-            logger.debug("Parsed DSN Viewperiod event: %s", r)
-            num_r += 1
-            yield r
+        num_r = 0
+        text = self._text
+        split = self.RECORD_PARSER.split
+        one_day = datetime.timedelta(days=1)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        stats = self.stats
+        clock = stats.stage_clock(self.instrument)
+
+        # Counts are kept in locals and added to stats in batches
+        num_lines = num_rejected = num_filtered = num_bytes = 0
+        parse_s = time_s = numeric_s = 0.0
+
+        stats.start()
+        try:
+            for line in self._fh:
+                num_lines += 1
+                num_bytes += len(line)
+
+                # Every field but PASS is kept as text, so bytes lines are decoded whole
+                t0 = clock()
+                line = text(line)
+                fields = split(line)
+                if fields is None:
+                    num_rejected += 1
+                    self.reject_line(line, stats.lines_rejected + num_rejected)
+                    continue
+
+                if checks and not all(check(fields[index]) for index, check in checks):
+                    num_filtered += 1
+                    continue
+
+                change_indicator, yy, doy, soa, bot, eot, eoa, antenna_id, project_id, description, pass_number, config_code, soe_flag, work_code_cat, relate = fields
+                project_id = project_id.strip()
+                description = description.strip()
+                config_code = config_code.strip()
+
+                # We need to do a check here, End of Track and End of Activity can roll over to the end of the day
+                t1 = clock()
+                day = yy + " " + doy
+
+                if soa > eot:
+                    eot_time = self.decode_event_time(day, eot) + one_day
+                else:
+                    eot_time = self.decode_event_time(day, eot)
+
+                if soa > eoa:
+                    eoa_time = self.decode_event_time(day, eoa) + one_day
+                else:
+                    eoa_time = self.decode_event_time(day, eoa)
+
+                soa_time = self.decode_event_time(day, soa)
+                bot_time = self.decode_event_time(day, bot)
+
+                t2 = clock()
+                pass_number = int(pass_number)
+
+                t3 = clock()
+                parse_s += t1 - t0
+                time_s += t2 - t1
+                numeric_s += t3 - t2
+
+                r = SafAllocation(change_indicator,
+                                  yy,
+                                  doy,
+                                  soa_time,
+                                  bot_time,
+                                  eot_time,
+                                  eoa_time,
+                                  antenna_id,
+                                  project_id,
+                                  description,
+                                  pass_number,
+                                  config_code,
+                                  soe_flag,
+                                  work_code_cat,
+                                  relate)
+
+                if num_lines >= STATS_FLUSH_LINES:
+                    # Every line up to here produced a record, was filtered or was rejected
+                    stats.add(num_lines, num_rejected, num_lines - num_rejected - num_filtered, num_bytes, parse_s,
+                              time_s, numeric_s, num_filtered)
+                    num_lines = num_rejected = num_filtered = num_bytes = 0
+                    parse_s = time_s = numeric_s = 0.0
+                    stats.maybe_report(self.filename)
+
+                if debug:
+                    logger.debug("Parsed DSN Viewperiod event: %s", r)
+                if cache_writer is not None:
+                    cache_writer.append(r)
+                num_r += 1
+                yield r
+        finally:
+            stats.add(num_lines, num_rejected, num_lines - num_rejected - num_filtered, num_bytes, parse_s, time_s,
+                      numeric_s, num_filtered)
+            stats.stop()
 
         logger.info("Got %s activites from %s", num_r, self.filename)
+        logger.info("Decoded %s: %s", self.filename, stats)
+
+        if cache_writer is not None:
+            cache_writer.commit(self.header_dict)
 
 
 class Encoder(object):
@@ -405,14 +2423,86 @@ class Encoder(object):
   :vartype EVENT_KEYS: list
   :cvar SFDU_HEADER: Tuple containing the static content of the top and bottom of the header
   :vartype SFDU_KEYS: tuple
+  :cvar EVENT_UNSEPARATED_KEYS: Keys of EVENT_KEYS not followed by a space in the event line
+  :vartype EVENT_UNSEPARATED_KEYS: tuple
+  :cvar EVENT_LINE_END: Text ending every event line
+  :vartype EVENT_LINE_END: str
+  :cvar EVENT_FORMAT: Format of an event line compiled from EVENT_KEYS when the subclass is created, float fields are
+                      right aligned and every other field left aligned
+  :vartype EVENT_FORMAT: str
+  :cvar WRITE_BATCH_SIZE: Number of event lines written to the file at once
+  :vartype WRITE_BATCH_SIZE: int
+  :cvar EVENT_RANGE_CHECKS: List of (key, predicate, description) tuples of the value ranges checked by check_event
+                            beyond EVENT_KEYS
+  :vartype EVENT_RANGE_CHECKS: list
+  :cvar VALIDATION_LEVELS: Validation levels of cast, "full" checks every event, "sampled" one event in
+                           VALIDATION_SAMPLE_INTERVAL and "off" none, for trusted events
+  :vartype VALIDATION_LEVELS: tuple
+  :cvar VALIDATION_SAMPLE_INTERVAL: Number of events per checked event with "sampled" validation
+  :vartype VALIDATION_SAMPLE_INTERVAL: int
+  :ivar validation: Validation level of cast
+  :vartype validation: str
   """
 
-  HEADER_TIME_FORMAT = ""
-  HEADER_KEYS = []
-  EVENT_KEYS = []
-  SFDU_HEADER = ()
+  HEADER_TIME_FORMAT = ""
+  HEADER_KEYS = []
+  EVENT_KEYS = []
+  SFDU_HEADER = ()
+  EVENT_UNSEPARATED_KEYS = ()
+  EVENT_LINE_END = "\n"
+  EVENT_FORMAT = ""
+  WRITE_BATCH_SIZE = 1024
+  EVENT_RANGE_CHECKS = []
+  VALIDATION_LEVELS = ("full", "sampled", "off")
+  VALIDATION_SAMPLE_INTERVAL = 100
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+
+    # Compile the event line layout, field conversions and checks once per Encoder class
+    if cls.EVENT_KEYS:
+      keys = [key for key, data_type, length in cls.EVENT_KEYS]
+      cls.EVENT_FORMAT = cls.compile_event_format()
+      cls._event_values = operator.itemgetter(*keys)
+      cls._event_converters = [(keys.index(key), convert) for key, convert in cls.event_converters().items()]
+      cls._event_checks = [(key, data_type, length if data_type == str else 10 ** length if data_type == int else None)
+                           for key, data_type, length in cls.EVENT_KEYS]
+      cls._event_range_checks = [(key, keys.index(key), predicate, description)
+                                 for key, predicate, description in cls.EVENT_RANGE_CHECKS]
+
+  @classmethod
+  def event_converters(cls) -> dict:
+    """
+    Functions converting event values to their str field, this function is implemented in subclasses. Fields without a
+    converter are str values written as they are.
+
+    :return: key / value dict of event key to a function taking the event value and returning its str field
+    :rtype: dict
+    """
+
+    return {}
+
+  @classmethod
+  def compile_event_format(cls) -> str:
+    """
+    Compile EVENT_KEYS into a single %-format producing the event line from the str values of the event fields
+
+    :return: Format of an event line, formatted with the tuple of str values in EVENT_KEYS order
+    :rtype: str
+    """
+
+    r = ""
+
+    for key, data_type, length in cls.EVENT_KEYS:
+      # Percent signs are the only characters with a meaning in the layout
+      r += ("%%%ds" if data_type == float else "%%-%ds") % (length,)
+
+      if key not in cls.EVENT_UNSEPARATED_KEYS:
+        r += " "
+
+    return r + cls.EVENT_LINE_END.replace("%", "%%")
 
-  def __init__(self, filename: Union[str | io.IOBase], header_dict:dict=None):
+  def __init__(self, filename: Union[str | io.IOBase], header_dict:dict=None, validation: str = "full"):
     """
     Initialize an Encoder which is meant to read output from the AERIE database and encode it into a report file.
 
@@ -420,10 +2510,16 @@ class Encoder(object):
     :type filename: str | io.IOBase
     :param header_dict: Dictionary of header values
     :type header_dict: dict
+    :param validation: Validation level of the events in cast, one of VALIDATION_LEVELS
+    :type validation: str
     """
 
     logger = logging.getLogger(__name__)
 
+    if validation not in self.VALIDATION_LEVELS:
+      logger.error("Invalid validation level '%s', expected one of %s", validation, self.VALIDATION_LEVELS)
+      raise ValueError("Invalid validation level: %s" % validation)
+
     if isinstance(filename, io.IOBase):
       self._fh = filename
     else:
@@ -438,6 +2534,7 @@ class Encoder(object):
       self.filename = "Buffered_IO"
     self.header_dict = header_dict
     self.header_flag = False
+    self.validation = validation
 
   @classmethod
   def check_header(cls, header_dict: dict) -> bool:
@@ -508,24 +2605,28 @@ class Encoder(object):
     :rtype: bool
     """
 
-    assert(isinstance(event_dict, dict))
-    logger = logging.getLogger(__name__)
+    assert(isinstance(event_dict, collections.abc.Mapping))
 
-    for key, data_type, max_length in cls.EVENT_KEYS:
-      if key not in event_dict:
-        logger.error("Missing event value for '%s' in Station Allocation encoding", key)
-        return False
+    # The checks are compiled from cls.EVENT_KEYS and cls.EVENT_RANGE_CHECKS, the logger is only needed on failures
+    try:
+      values = cls._event_values(event_dict)
+    except KeyError:
+      key = next(key for key, data_type, max_length in cls.EVENT_KEYS if key not in event_dict)
+      logging.getLogger(__name__).error("Missing event value for '%s' in Station Allocation encoding", key)
+      return False
 
-      if not isinstance(event_dict[key], data_type):
-        logger.error("Expected datatype '%s' for event value '%s' in Station Allocation encoding, got '%s'", data_type, key, type(event_dict[key]))
+    for value, (key, data_type, limit) in zip(values, cls._event_checks):
+      if not isinstance(value, data_type):
+        logging.getLogger(__name__).error("Expected datatype '%s' for event value '%s' in Station Allocation encoding, got '%s'", data_type, key, type(value))
         return False
 
-      if data_type == str and len(event_dict[key]) > max_length:
-        logger.error("Event value field '%s' -> '%s' is too long", key, event_dict[key])
+      if limit is not None and (len(value) > limit if data_type == str else value >= limit):
+        logging.getLogger(__name__).error("Event value field '%s' -> '%s' is too long", key, value)
         return False
-      elif data_type == int and event_dict[key] >= 10 ** max_length:
-        val = 10 ** (max_length)
-        logger.error("Event value field '%s' -> '%s' is too long", key, event_dict[key])
+
+    for key, index, predicate, description in cls._event_range_checks:
+      if not predicate(values[index]):
+        logging.getLogger(__name__).error("Event value field '%s' -> %s is not within proper range of %s", key, values[index], description)
         return False
 
     return True
@@ -533,23 +2634,80 @@ class Encoder(object):
   @classmethod
   def cast_event(cls, event_dict: dict) -> str:
     """
-    Construct the event line, return it as a string, this function is implemented in subclasses
+    Check the event and construct the event line, return it as a string
 
     :param event_dict: Contains field information for the report event line
     :type event_dict: dict
-    :return: None
-    :rtype: None
+    :return: Constructed event line ready to be written to the report
+    :rtype: str
     """
 
-    assert(isinstance(event_dict, dict))
+    assert(isinstance(event_dict, collections.abc.Mapping))
 
     if not cls.check_event(event_dict):
       raise ValueError("Malformed event_dict")
 
+    return cls.format_event(event_dict)
+
+  @classmethod
+  def format_event(cls, event_dict: dict) -> str:
+    """
+    Construct the event line without checking the event, return it as a string. event_dict is left untouched so the
+    same events can be encoded again.
+
+    :param event_dict: Contains field information for the report event line
+    :type event_dict: dict
+    :return: Constructed event line ready to be written to the report
+    :rtype: str
+    """
+
+    values = list(cls._event_values(event_dict))
+
+    for index, convert in cls._event_converters:
+      values[index] = convert(values[index])
+
+    # Lay the fields out with the format compiled from cls.EVENT_KEYS
+    return cls.EVENT_FORMAT % tuple(values)
+
+  def cast_events(self, event_dicts: Iterable[dict]) -> Iterable[str]:
+    """
+    Construct the event lines, checking the events according to self.validation
+
+    :param event_dicts: Iterable object providing event_dicts
+    :type event_dicts: Iterable[dict]
+    :return: generator returning the constructed event lines
+    :rtype: Iterable[str]
+    """
+
+    if self.validation == "full":
+      return map(self.cast_event, event_dicts)
+    elif self.validation == "off":
+      return map(self.format_event, event_dicts)
+
+    return self._cast_sampled_events(event_dicts)
+
+  def _cast_sampled_events(self, event_dicts: Iterable[dict]) -> Iterable[str]:
+    """
+    Construct the event lines, checking the first event and then one event in VALIDATION_SAMPLE_INTERVAL
+
+    :param event_dicts: Iterable object providing event_dicts
+    :type event_dicts: Iterable[dict]
+    :return: generator returning the constructed event lines
+    :rtype: Iterable[str]
+    """
+
+    interval = self.VALIDATION_SAMPLE_INTERVAL
+    cast_event = self.cast_event
+    format_event = self.format_event
+
+    for i, event_dict in enumerate(event_dicts):
+      yield cast_event(event_dict) if i % interval == 0 else format_event(event_dict)
+
   def cast(self, event_dicts: Iterable[dict]) -> None:
     """
     Write the report file to the filepath, call class functions to check the validity of information and construct the
-    report.
+    report. Event lines are written in batches of WRITE_BATCH_SIZE lines, an invalid event stops the report before the
+    batch holding it is written.
 
     :param event_dicts: Iterable object providing event_dicts which contain the information that should be written to
     the report.
@@ -566,9 +2724,14 @@ class Encoder(object):
       self._fh.write(self.cast_header(self.header_dict))
       self.header_flag = True
 
-    for event_dict in event_dicts:
-      self._fh.write(self.cast_event(event_dict))
-      num_r += 1
+    lines = self.cast_events(event_dicts)
+    while True:
+      batch = list(itertools.islice(lines, self.WRITE_BATCH_SIZE))
+      if not batch:
+        break
+
+      self._fh.writelines(batch)
+      num_r += len(batch)
 
     logger.info("Encoded %s activities to %s", num_r, self.filename)
 
@@ -621,7 +2784,15 @@ class DsnViewPeriodPredLegacyEncoder(Encoder):
                 ("EL_DEC_Y", float, 5),
                 ("RTLT", datetime.timedelta, 10)]
 
-  def __init__(self, filename: Union[str, io.IOBase], header_dict: dict=None):
+  # No space after RTLT
+  EVENT_UNSEPARATED_KEYS = ("RTLT",)
+  EVENT_RANGE_CHECKS = [("SPACECRAFT_IDENTIFIER", lambda value: 0 <= value < 1000, "0 to 999"),
+                        ("AZIMUTH", lambda value: 0 <= value < 360, "0 to 360"),
+                        ("ELEVATION", lambda value: -90 <= value <= 90, "-90 to 90"),
+                        ("AZ_LHA_X", lambda value: 0 <= value < 360, "0 to 360"),
+                        ("EL_DEC_Y", lambda value: 0 <= value < 360, "0 to 360")]
+
+  def __init__(self, filename: Union[str, io.IOBase], header_dict: dict=None, validation: str = "full"):
     """
     Initialize an DsnViewPeriodPredLegacyEncoder which is meant to read output from the AERIE database and encode it
     into a report file.
@@ -630,92 +2801,43 @@ class DsnViewPeriodPredLegacyEncoder(Encoder):
     :type filename: str
     :param header_dict: Dictionary of header values
     :type header_dict: dict
+    :param validation: Validation level of the events in cast, one of VALIDATION_LEVELS
+    :type validation: str
     """
     logger = logging.getLogger(__name__)
     logger.info("Opening DSN Viewperiod file for Encoding: %s", filename)
-    super(DsnViewPeriodPredLegacyEncoder, self).__init__(filename, header_dict)
+    super(DsnViewPeriodPredLegacyEncoder, self).__init__(filename, header_dict, validation)
 
   @classmethod
-  def check_event(cls, event_dict: dict) -> bool:
-    """
-    Checks the validity of the formatting of a user inputted event dictionary
-
-    :param event_dict: Contains field information for the event
-    :type event_dict: dict
-    :return: True on valid, False on non-valid
-    :rtype: bool
-    """
-
-    if super(DsnViewPeriodPredLegacyEncoder, cls).check_event(event_dict) is False:
-      return False
-
-    logger = logging.getLogger(__name__)
-
-    if not (0 <= event_dict["SPACECRAFT_IDENTIFIER"] < 1000):
-      logger.error("Event value field 'SPACECRAFT_IDENTIFIER' -> %s is not within proper range of 0 to 999", event_dict["SPACECRAFT_IDENTIFIER"])
-      return False
-    elif not (0 <= event_dict["AZIMUTH"] < 360):
-      logger.error("Event value field 'AZIMUTH' -> %s is not within proper range of 0 to 360", event_dict["AZIMUTH"])
-      return False
-    elif not (-90 <= event_dict["ELEVATION"] <= 90):
-      logger.error("Event value field 'ELEVATION' -> %s is not within proper range of -90 to 90", event_dict["ELEVATION"])
-      return False
-    elif not (0 <= event_dict["AZ_LHA_X"] < 360):
-      logger.error("Event value field 'AZ_LHA_X' -> %s is not within proper range of 0 to 360", event_dict["AZ_LHA_X"])
-      return False
-    elif not (0 <= event_dict["EL_DEC_Y"] < 360):
-      logger.error("Event value field 'EL_DEC_Y' -> %s is not within proper range of 0 to 360", event_dict["EL_DEC_Y"])
-      return False
-
-    return True
-
-  def cast_event(self, event_dict: dict) -> str:
+  def event_converters(cls) -> dict:
     """
-    Construct the event line, return it as a string, this function is implemented in subclasses
+    Functions converting event values to their str field
 
-    :param event_dict: Contains field information for the report event line
-    :type event_dict: dict
-    :return: None
-    :rtype: None
+    :return: key / value dict of event key to a function taking the event value and returning its str field
+    :rtype: dict
     """
 
-    super(DsnViewPeriodPredLegacyEncoder, self).cast_event(event_dict)
-
-    translated_event = event_dict
-
-    # Format the fields and type convert all of the fields to str for writing to the report
-    translated_event["TIME"] = translated_event["TIME"].strftime(self.EVENT_TIME_FORMAT)
-    translated_event["SPACECRAFT_IDENTIFIER"] = str(translated_event["SPACECRAFT_IDENTIFIER"]).zfill(3)
-    translated_event["STATION_IDENTIFIER"] = str(translated_event["STATION_IDENTIFIER"]).zfill(2)
-    translated_event["PASS"] = str(translated_event["PASS"]).zfill(4)
-    translated_event["AZIMUTH"] = str(round(translated_event["AZIMUTH"], 1))
-    translated_event["ELEVATION"] = str(round(translated_event["ELEVATION"], 1))
-    translated_event["AZ_LHA_X"] = str(round(translated_event["AZ_LHA_X"], 1))
-    translated_event["EL_DEC_Y"] = str(round(translated_event["EL_DEC_Y"], 1))
-
-    hours, remainder = divmod(translated_event["RTLT"].total_seconds(), 3600)
-    minutes, seconds = divmod(remainder, 60)
-    translated_event["RTLT"] = '{:02}:{:02}:{:04}'.format(int(hours), int(minutes), round(seconds, 1))
-
-    # Use cls.EVENT_KEYS as a blueprint for writing each line
-    r = ""
-    looper = iter(self.EVENT_KEYS)
-
-    for key, data_type, length in looper:
-
-      if key in ("AZIMUTH", "ELEVATION", "AZ_LHA_X", "EL_DEC_Y"):
-        r += translated_event[key].rjust(length)
-      else:
-        r += translated_event[key].ljust(length)
+    def time(value: datetime.datetime) -> str:
+      # Same fields as value.strftime(cls.EVENT_TIME_FORMAT), without parsing the format on every event
+      return "%02d %03d/%02d:%02d:%02d" % (value.year % 100, value.timetuple().tm_yday, value.hour, value.minute, value.second)
 
-      # No space after RTLT
-      if key == "RTLT":
-        continue
+    def angle(value: float) -> str:
+      return str(round(value, 1))
 
-      r += " "
+    def rtlt(value: datetime.timedelta) -> str:
+      hours, remainder = divmod(value.total_seconds(), 3600)
+      minutes, seconds = divmod(remainder, 60)
+      return '{:02}:{:02}:{:04}'.format(int(hours), int(minutes), round(seconds, 1))
 
-    r += "\n"
-    return r
+    return {"TIME": time,
+            "SPACECRAFT_IDENTIFIER": lambda value: str(value).zfill(3),
+            "STATION_IDENTIFIER": lambda value: str(value).zfill(2),
+            "PASS": lambda value: str(value).zfill(4),
+            "AZIMUTH": angle,
+            "ELEVATION": angle,
+            "AZ_LHA_X": angle,
+            "EL_DEC_Y": angle,
+            "RTLT": rtlt}
 
 
 class DsnStationAllocationFileEncoder(Encoder):
@@ -774,7 +2896,11 @@ class DsnStationAllocationFileEncoder(Encoder):
                   ("WORK_CODE_CAT", str, 3),
                   ("RELATE", str, 1)]
 
-    def __init__(self, filename: str, header_dict: dict=None):
+    # No space after the change indicator and CONFIG_CODE, lines are padded after RELATE
+    EVENT_UNSEPARATED_KEYS = ("CHANGE_INDICATOR", "CONFIG_CODE")
+    EVENT_LINE_END = "   \n"
+
+    def __init__(self, filename: str, header_dict: dict=None, validation: str = "full"):
       """
       Initialize an DsnStationAllocationFileEncoder which is meant to read output from the AERIE database and encode it into a report file.
 
@@ -782,49 +2908,465 @@ class DsnStationAllocationFileEncoder(Encoder):
       :type filename: str
       :param header_dict: Dictionary of header values
       :type header_dict: dict
+      :param validation: Validation level of the events in cast, one of VALIDATION_LEVELS
+      :type validation: str
       """
 
       logger = logging.getLogger(__name__)
       logger.info("Opening DSN Station Allocation file for Encoding: %s", filename)
-      super(DsnStationAllocationFileEncoder, self).__init__(filename, header_dict)
+      super(DsnStationAllocationFileEncoder, self).__init__(filename, header_dict, validation)
 
-    def cast_event(self, event_dict: dict) -> str:
+    @classmethod
+    def event_converters(cls) -> dict:
         """
-        Checks the validity of the formatting of a user inputted event dictionary
+        Functions converting event values to their str field
 
-        :param event_dict: Contains field information for the event
-        :type event_dict: dict
-        :return: True on valid, False on non-valid
-        :rtype: bool
+        :return: key / value dict of event key to a function taking the event value and returning its str field
+        :rtype: dict
         """
 
-        super(DsnStationAllocationFileEncoder, self).cast_event(event_dict)
+        def hhmm(value: datetime.datetime) -> str:
+            # Same fields as value.strftime(cls.HHMM_FORMAT), without parsing the format on every event
+            return "%02d%02d" % (value.hour, value.minute)
 
-        translated_event = event_dict
+        return {"SOA": hhmm,
+                "BOT": hhmm,
+                "EOT": hhmm,
+                "EOA": hhmm,
+                "PASS": lambda value: str(value).zfill(4)}
 
-        translated_event["SOA"] = translated_event["SOA"].strftime(self.HHMM_FORMAT)
-        translated_event["BOT"] = translated_event["BOT"].strftime(self.HHMM_FORMAT)
-        translated_event["EOT"] = translated_event["EOT"].strftime(self.HHMM_FORMAT)
-        translated_event["EOA"] = translated_event["EOA"].strftime(self.HHMM_FORMAT)
-        translated_event["PASS"] = str(translated_event["PASS"]).zfill(4)
 
-        r = ""
-        looper = iter(self.EVENT_KEYS)
+class ExternalSorter(object):
+    """
+    Sorts records by a key within a memory budget. Records are buffered up to max_records, each full buffer is sorted
+    and spilled as a run to a temporary file, and iterating merges the runs with the buffer. The sort is stable, records
+    with equal keys keep the order they were added in.
+
+    :ivar key: Function returning the sort key of a record
+    :vartype key: callable
+    :ivar max_records: Number of records held in memory before they are spilled to a run
+    :vartype max_records: int
+    :ivar directory: Directory of the run files, None for the default temporary directory
+    :vartype directory: str
+    :ivar runs: Temporary files of the spilled runs
+    :vartype runs: list
+    :cvar RUN_CHUNK_SIZE: Number of records pickled together in a run file
+    :vartype RUN_CHUNK_SIZE: int
+    """
 
-        # Change indicator
-        key, data_type, length = next(looper)
-        r += translated_event[key].ljust(length)
+    RUN_CHUNK_SIZE = 1024
+
+    def __init__(self, key, max_records: int = 100000, directory: str = None):
+        """
+        Initialize an ExternalSorter
+
+        :param key: Function returning the sort key of a record
+        :type key: callable
+        :param max_records: Number of records held in memory before they are spilled to a run
+        :type max_records: int
+        :param directory: Directory of the run files, None for the default temporary directory
+        :type directory: str
+        """
 
-        for key, data_type, length in looper:
-            r += translated_event[key].ljust(length)
+        logger = logging.getLogger(__name__)
 
-            # No space after CONFIG_CODE
-            if key == "CONFIG_CODE":
-                continue
-            r += " "
+        if max_records < 1:
+            logger.error("Invalid sort buffer size %s", max_records)
+            raise ValueError("Invalid sort buffer size: %s" % max_records)
+
+        self.key = key
+        self.max_records = max_records
+        self.directory = directory
+        self.runs = []
+        self._buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, record) -> None:
+        """
+        Add a record to the sort
+
+        :param record: Record to sort
+        :type record: object
+        :return: None
+        :rtype: None
+        """
+
+        self._buffer.append(record)
+        if len(self._buffer) >= self.max_records:
+            self._spill()
+
+    def extend(self, records: Iterable) -> None:
+        """
+        Add records to the sort
+
+        :param records: Iterable object providing the records to sort
+        :type records: Iterable
+        :return: None
+        :rtype: None
+        """
+
+        for record in records:
+            self.add(record)
+
+    def _spill(self) -> None:
+        """
+        Sort the buffered records and write them to a new run file
+
+        :return: None
+        :rtype: None
+        """
+
+        logger = logging.getLogger(__name__)
+
+        self._buffer.sort(key=self.key)
+        run = tempfile.TemporaryFile(dir=self.directory)
+        for i in range(0, len(self._buffer), self.RUN_CHUNK_SIZE):
+            pickle.dump(self._buffer[i:i + self.RUN_CHUNK_SIZE], run, pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+
+        logger.debug("Spilled sort run %s of %s records", len(self.runs), len(self._buffer))
+        self.runs.append(run)
+        self._buffer = []
+
+    @classmethod
+    def _read_run(cls, run) -> Iterable:
+        """
+        Generator returning the records of a run file
+
+        :param run: Run file written by _spill
+        :type run: io.IOBase
+        :return: generator returning the records of the run
+        :rtype: Iterable
+        """
+
+        while True:
+            try:
+                chunk = pickle.load(run)
+            except EOFError:
+                return
+            yield from chunk
+
+    def __iter__(self) -> Iterable:
+        """
+        Generator returning every record added so far in key order, the sort can only be iterated once
+
+        :return: generator returning the sorted records
+        :rtype: Iterable
+        """
+
+        self._buffer.sort(key=self.key)
+        if not self.runs:
+            yield from self._buffer
+        else:
+            # Runs come first, heapq.merge takes equal keys from the earlier iterables first which keeps the sort stable
+            yield from heapq.merge(*map(self._read_run, self.runs), self._buffer, key=self.key)
+        self.close()
+
+    def close(self) -> None:
+        """
+        Remove the run files and drop the buffered records
+
+        :return: None
+        :rtype: None
+        """
+
+        for run in self.runs:
+            run.close()
+        self.runs = []
+        self._buffer = []
+
+
+class AdaptiveBatchSizer(object):
+    """
+    Sizes the batches of activity inserts by their serialized payload bytes, adapting the target size to the observed
+    insert latency, additive increase / multiplicative decrease. The target grows by increase_bytes after every batch
+    inserted within target_latency while the throughput does not drop, and is cut by decrease_factor after a failed
+    batch or one slower than target_latency.
+
+    The payload size of an activity is estimated from a running average of the size of one activity in SAMPLE_INTERVAL
+    serialized with the serializer of the inserts, so sizing does not serialize every activity twice. Request bodies
+    the GqlInterface compresses are sized before compression.
+
+    :ivar target_bytes: Current target payload size of a batch in bytes
+    :vartype target_bytes: float
+    :ivar min_bytes: Lower bound of target_bytes
+    :vartype min_bytes: int
+    :ivar max_bytes: Upper bound of target_bytes
+    :vartype max_bytes: int
+    :ivar target_latency: Insert latency in seconds above which the target is decreased
+    :vartype target_latency: float
+    :ivar increase_bytes: Bytes added to the target after a batch within target_latency
+    :vartype increase_bytes: int
+    :ivar decrease_factor: Factor applied to the target after a failed or slow batch
+    :vartype decrease_factor: float
+    :ivar serializer: Serializer of the insert requests, measuring the payload size of the activities
+    :vartype serializer: JsonSerializer
+    :ivar bytes_per_activity: Running average of the serialized size of an activity, None before the first activity
+    :vartype bytes_per_activity: float
+    :ivar throughput: Payload bytes per second of the last batch inserted within target_latency
+    :vartype throughput: float
+    :cvar SAMPLE_INTERVAL: Number of activities per activity whose serialized size is measured
+    :vartype SAMPLE_INTERVAL: int
+    :cvar THROUGHPUT_TOLERANCE: Fraction the throughput may drop from the last batch while the target still grows
+    :vartype THROUGHPUT_TOLERANCE: float
+    """
+
+    SAMPLE_INTERVAL = 16
+    THROUGHPUT_TOLERANCE = 0.05
+
+    def __init__(self, initial_bytes: int = 256 * 1024, min_bytes: int = 16 * 1024, max_bytes: int = 16 * 1024 * 1024, target_latency: float = 5.0, increase_bytes: int = 128 * 1024, decrease_factor: float = 0.5, serializer: "JsonSerializer" = None):
+        """
+        Initialize an AdaptiveBatchSizer
+
+        :param initial_bytes: Target payload size of the first batch in bytes
+        :type initial_bytes: int
+        :param min_bytes: Lower bound of the target payload size
+        :type min_bytes: int
+        :param max_bytes: Upper bound of the target payload size
+        :type max_bytes: int
+        :param target_latency: Insert latency in seconds above which the target is decreased
+        :type target_latency: float
+        :param increase_bytes: Bytes added to the target after a batch within target_latency
+        :type increase_bytes: int
+        :param decrease_factor: Factor applied to the target after a failed or slow batch, between 0 and 1
+        :type decrease_factor: float
+        :param serializer: Serializer of the insert requests, the GqlInterface serializer, a JsonSerializer if None
+        :type serializer: JsonSerializer
+        """
+
+        logger = logging.getLogger(__name__)
+
+        if not (0 < min_bytes <= initial_bytes <= max_bytes):
+            logger.error("Invalid batch sizes, expected 0 < min_bytes %s <= initial_bytes %s <= max_bytes %s", min_bytes, initial_bytes, max_bytes)
+            raise ValueError("Invalid batch sizes: %s, %s, %s" % (min_bytes, initial_bytes, max_bytes))
+        if not (0 < decrease_factor < 1):
+            logger.error("Invalid batch decrease factor %s, expected a factor between 0 and 1", decrease_factor)
+            raise ValueError("Invalid batch decrease factor: %s" % decrease_factor)
+
+        self.target_bytes = float(initial_bytes)
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency
+        self.increase_bytes = increase_bytes
+        self.decrease_factor = decrease_factor
+        self.serializer = serializer or JsonSerializer()
+        self.bytes_per_activity = None
+        self.throughput = 0.0
+        self._lock = threading.Lock()
+
+    def batches(self, activities: Iterable[dict]) -> Iterable[list]:
+        """
+        Generator packing activities into batches of about target_bytes. The target is read again for every activity,
+        so feedback recorded while a batch is being inserted applies to the next batch.
+
+        :param activities: Iterable object providing the activities to insert
+        :type activities: Iterable[dict]
+        :return: generator returning lists of activities
+        :rtype: Iterable[list]
+        """
+
+        dumps = self.serializer.dumps
+        batch = []
+        for i, activity in enumerate(activities):
+            if i % self.SAMPLE_INTERVAL == 0:
+                size = len(dumps(activity))
+                self.bytes_per_activity = size if self.bytes_per_activity is None else 0.9 * self.bytes_per_activity + 0.1 * size
+
+            batch.append(activity)
+            if len(batch) * self.bytes_per_activity >= self.target_bytes:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def record(self, count: int, seconds: float, failed: bool = False) -> None:
+        """
+        Adapt the target payload size to the outcome of an insert, safe to call from concurrent inserts
+
+        :param count: Number of activities in the batch
+        :type count: int
+        :param seconds: Latency of the insert in seconds
+        :type seconds: float
+        :param failed: The insert failed
+        :type failed: bool
+        :return: None
+        :rtype: None
+        """
+
+        logger = logging.getLogger(__name__)
+
+        payload_bytes = count * (self.bytes_per_activity or 0)
+        with self._lock:
+            if failed or seconds > self.target_latency:
+                self.target_bytes = max(self.min_bytes, self.target_bytes * self.decrease_factor)
+                logger.debug("Batch of %s bytes %s in %.3f s, decreasing target to %d bytes", int(payload_bytes), "failed" if failed else "slow", seconds, self.target_bytes)
+                return
+
+            throughput = payload_bytes / max(seconds, 1e-6)
+            if throughput >= self.throughput * (1 - self.THROUGHPUT_TOLERANCE):
+                self.target_bytes = min(self.max_bytes, self.target_bytes + self.increase_bytes)
+            self.throughput = throughput
+            logger.debug("Batch of %s bytes in %.3f s, %.0f bytes/s, target %d bytes", int(payload_bytes), seconds, throughput, self.target_bytes)
+
+
+class JsonSerializer(object):
+    """
+    Serializes GraphQL requests and responses with the standard library json module, without whitespace
+
+    :cvar NAME: Name of the serializer
+    :vartype NAME: str
+    """
+
+    NAME = "json"
+
+    def dumps(self, obj) -> bytes:
+        """
+        Serialize an object to JSON
+
+        :param obj: Object to serialize
+        :type obj: object
+        :return: UTF-8 encoded JSON
+        :rtype: bytes
+        """
+
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes):
+        """
+        Deserialize JSON
+
+        :param data: UTF-8 encoded JSON
+        :type data: bytes
+        :return: Deserialized object
+        :rtype: object
+        """
+
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Serializes GraphQL requests and responses with orjson, available if orjson is installed
+    """
+
+    NAME = "orjson"
+
+    def dumps(self, obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
 
-        r += "   \n"
-        return r
+
+def default_serializer() -> JsonSerializer:
+    """
+    Fastest JSON serializer available, orjson if it is installed, otherwise the standard library
+
+    :return: Serializer instance
+    :rtype: JsonSerializer
+    """
+
+    return OrjsonSerializer() if orjson is not None else JsonSerializer()
+
+
+class PlanInfoCache(object):
+    """
+    Thread-safe cache of plan information with a time to live. Concurrent misses of one key wait for a single load
+    rather than each reading the plan, and values loaded while the key was invalidated are not stored. None values, such
+    as a plan that was not found, are not cached.
+
+    :ivar ttl: Seconds a value is served from the cache after it was loaded
+    :vartype ttl: float
+    :ivar hits: Number of values served from the cache
+    :vartype hits: int
+    :ivar misses: Number of values loaded
+    :vartype misses: int
+    """
+
+    def __init__(self, ttl: float = 300.0, clock=time.monotonic):
+        """
+        Initialize a PlanInfoCache
+
+        :param ttl: Seconds a value is served from the cache after it was loaded, 0 to disable caching
+        :type ttl: float
+        :param clock: Function returning the current time in seconds
+        :type clock: callable
+        """
+
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._loading = {}
+        self._generation = 0
+
+    def get(self, key, load):
+        """
+        Return the cached value of a key, loading it with load if it is missing or expired
+
+        :param key: Key of the value
+        :type key: object
+        :param load: Function returning the value of the key
+        :type load: callable
+        :return: Value of the key
+        :rtype: object
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self.hits += 1
+                return entry[1]
+
+            loading = self._loading.get(key)
+            owner = loading is None
+            if owner:
+                loading = self._loading[key] = concurrent.futures.Future()
+                generation = self._generation
+                self.misses += 1
+
+        if not owner:
+            return loading.result()
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            loading.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._loading[key]
+            if value is not None and generation == self._generation:
+                self._entries[key] = (self._clock() + self.ttl, value)
+        loading.set_result(value)
+        return value
+
+    def invalidate(self, key=None) -> None:
+        """
+        Drop a key from the cache, or every key if None
+
+        :param key: Key to drop, None for every key
+        :type key: object
+        :return: None
+        :rtype: None
+        """
+
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
 
 
 class GqlInterface(object):
@@ -835,39 +3377,270 @@ class GqlInterface(object):
 
     :ivar __connection_string: URL to the Hasura database
     :vartype __connection_string:
+    :ivar timeout: (connect, read) timeout in seconds of each request
+    :vartype timeout: tuple
+    :ivar adapter: Connection pool shared by the sessions of every thread using the GqlInterface
+    :vartype adapter: requests.adapters.HTTPAdapter
+    :ivar plan_cache: Cache of the plan information read by get_plan_info_from_id
+    :vartype plan_cache: PlanInfoCache
+    :ivar serializer: JSON serializer of the requests and responses
+    :vartype serializer: JsonSerializer
+    :ivar compress_threshold: Request bodies of at least this many bytes are sent gzip compressed, None to never
+                              compress
+    :vartype compress_threshold: int
     :cvar INSERT_ACTIVITY_QUERY: Template query for inserting activities into AERIE
     :vartype INSERT_ACTIVITY_QUERY: str
+    :cvar UPDATE_ACTIVITY_QUERY: Template query for updating the start offset and arguments of activities in AERIE
+    :vartype UPDATE_ACTIVITY_QUERY: str
+    :cvar DELETE_ACTIVITY_QUERY: Template query for deleting activities of an AERIE plan by id
+    :vartype DELETE_ACTIVITY_QUERY: str
+    :cvar SYNC_KEY_ARGUMENTS: key / value dict of activity type to the arguments identifying an activity across
+                              revisions of a product, see sync_key
+    :vartype SYNC_KEY_ARGUMENTS: dict
+    :cvar AERIE_OFFSET_PATTERN: Pattern of an AERIE start offset or duration, see parse_aerie_offset
+    :vartype AERIE_OFFSET_PATTERN: re.Pattern
     :cvar READ_PLAN_QUERY: Template query for reading plan information from AERIE
     :vartype READ_PLAN_QUERY: str
     :cvar READ_ACTIVITY_QUERY: Template query for reading activies from AERIE plan
     :vartype READ_ACTIVITY_QUERY: str
+    :cvar ACTIVITY_FIELDS: Fields of an activity directive build_activity_query can select
+    :vartype ACTIVITY_FIELDS: tuple
+    :cvar EXPORT_ACTIVITY_FIELDS: Fields of an activity directive read by the demux functions
+    :vartype EXPORT_ACTIVITY_FIELDS: tuple
+    :cvar ACTIVITY_PAGE_ORDERS: key / value dict of the orders of iter_activities to the order_by clause, the keyset
+                                condition continuing after the last activity of a page, and the (variable, field)
+                                pairs of the condition
+    :vartype ACTIVITY_PAGE_ORDERS: dict
+    :cvar DEFAULT_PAGE_SIZE: Default number of activities fetched per page by iter_activities
+    :vartype DEFAULT_PAGE_SIZE: int
+    :cvar DEMUX_PAGE_SIZE: Default number of activities fetched per page by demux_files
+    :vartype DEMUX_PAGE_SIZE: int
+    :cvar DEMUX_SORT_BUFFER: Default number of events demux_files sorts in memory before spilling them to disk
+    :vartype DEMUX_SORT_BUFFER: int
+    :cvar MUX_POLL_INTERVAL: Seconds mux_files_concurrent waits on its queue before checking for failed workers
+    :vartype MUX_POLL_INTERVAL: float
     :cvar DEFAULT_CONNECTION_STRING: Default connection string of Localhost if an alternate is not provided
     :vartype DEFAULT_CONNECTION_STRING: str
+    :cvar DEFAULT_POOL_SIZE: Default number of connections kept open to the Hasura database
+    :vartype DEFAULT_POOL_SIZE: int
+    :cvar DEFAULT_TIMEOUT: Default (connect, read) timeout in seconds of each request
+    :vartype DEFAULT_TIMEOUT: tuple
+    :cvar DEFAULT_RETRIES: Default number of retries of a request failing to connect or with a 5xx status
+    :vartype DEFAULT_RETRIES: int
+    :cvar DEFAULT_BACKOFF_FACTOR: Default backoff factor in seconds between retries, doubling with every retry
+    :vartype DEFAULT_BACKOFF_FACTOR: float
+    :cvar RETRY_STATUS_CODES: HTTP status codes of the query responses retried
+    :vartype RETRY_STATUS_CODES: tuple
+    :cvar MUTATION_RETRY_STATUS_CODES: HTTP status codes of the mutation responses retried, those of requests the
+                                       server refused before handling them
+    :vartype MUTATION_RETRY_STATUS_CODES: tuple
+    :cvar DEFAULT_PLAN_INFO_TTL: Default seconds plan information is cached for
+    :vartype DEFAULT_PLAN_INFO_TTL: float
+    :cvar GZIP_LEVEL: Compression level of gzip compressed request bodies, favoring speed
+    :vartype GZIP_LEVEL: int
     """
 
     INSERT_ACTIVITY_QUERY = 'mutation InsertActivities($activities: [activity_directive_insert_input!]!) {insert_activity_directive(objects: $activities) {returning {id name } } }'
+    UPDATE_ACTIVITY_QUERY = 'mutation UpdateActivities($updates: [activity_directive_updates!]!) {update_activity_directive_many(updates: $updates) {affected_rows} }'
+    DELETE_ACTIVITY_QUERY = 'mutation DeleteActivities($plan_id: Int!, $ids: [Int!]!) {delete_activity_directive(where: {plan_id: {_eq: $plan_id}, id: {_in: $ids}}) {affected_rows} }'
     READ_PLAN_QUERY = 'query getPlan($id: Int) {plan(where: {id: {_eq: $id}}) {id name model_id start_time duration} }'
     READ_ACTIVITY_QUERY = 'query getActivity($type: String, $plan_id: Int) {activity_directive(where: {type: {_like: $type}, plan_id: {_eq: $plan_id}}) {start_offset id tags type name metadata arguments} }'
+    ACTIVITY_FIELDS = ("start_offset", "id", "tags", "type", "name", "metadata", "arguments")
+    EXPORT_ACTIVITY_FIELDS = ("id", "type", "start_offset", "arguments")
+    ACTIVITY_PAGE_ORDERS = {
+        "id": ("{id: asc}", "id: {_gt: $after_id}", (("after_id", "Int", "id"),)),
+        "start_offset": ("[{start_offset: asc}, {id: asc}]", "_or: [{start_offset: {_gt: $after_offset}}, {start_offset: {_eq: $after_offset}, id: {_gt: $after_id}}]",
+                         (("after_offset", "interval", "start_offset"), ("after_id", "Int", "id"))),
+    }
+
+    SYNC_KEY_ARGUMENTS = {
+        "DSN_Track": ("antenna_ID", "pass_number"),
+        "DSN_View_Period_Duration": ("station_identifier", "pass_number"),
+        "DSN_View_Period_Event": ("station_identifier", "pass_number", "viewperiod_event"),
+    }
+    AERIE_OFFSET_PATTERN = re.compile(r"\s*(-?)(?:(\d+) days? )?(\d+):(\d+):(\d+(?:\.\d*)?)\s*")
+
+    DEFAULT_PAGE_SIZE = 5000
+    DEMUX_PAGE_SIZE = DEFAULT_PAGE_SIZE
+    DEMUX_SORT_BUFFER = 100000
+    MUX_POLL_INTERVAL = 1.0
+
+    DEFAULT_CONNECTION_STRING = 'http://localhost:8080/v1/graphql'
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_TIMEOUT = (10.0, 300.0)
+    DEFAULT_RETRIES = 3
+    DEFAULT_BACKOFF_FACTOR = 0.5
+    RETRY_STATUS_CODES = (500, 502, 503, 504)
+    MUTATION_RETRY_STATUS_CODES = (503,)
+    DEFAULT_PLAN_INFO_TTL = 300.0
+    GZIP_LEVEL = 1
+
+    def __init__(self, connection_string: str=DEFAULT_CONNECTION_STRING, pool_size: int = DEFAULT_POOL_SIZE, timeout: Union[float, tuple] = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF_FACTOR, plan_cache: PlanInfoCache = None, serializer: JsonSerializer = None, compress_threshold: int = None):
+        """
+        Initialize an GqlInterface which retreives and inserts information into the AERIE DB.
+
+        Requests reuse keep-alive connections from a pool shared by all threads, each thread sending through its own
+        requests.Session, so one GqlInterface can serve a pool of worker threads. Requests failing to connect are
+        retried with exponential backoff, as are queries answered with one of RETRY_STATUS_CODES and mutations answered
+        with one of MUTATION_RETRY_STATUS_CODES. Requests are never retried after a read timeout, nor mutations after
+        another server error, as Hasura may have applied them already. Those raise instead.
+
+        :param connection_string: Connection string to Hasura GraphQL DB
+        :type connection_string: str
+        :param pool_size: Number of connections kept open to the Hasura database
+        :type pool_size: int
+        :param timeout: Timeout in seconds of each request, or a (connect, read) tuple of timeouts
+        :type timeout: float | tuple
+        :param retries: Number of retries of a failed request, 0 to disable retries
+        :type retries: int
+        :param backoff_factor: Backoff in seconds before the second retry, doubling with every further retry
+        :type backoff_factor: float
+        :param plan_cache: Plan information cache, which may be shared by several GqlInterfaces, a new PlanInfoCache of
+                           DEFAULT_PLAN_INFO_TTL if None
+        :type plan_cache: PlanInfoCache
+        :param serializer: JSON serializer of the requests and responses, default_serializer() if None
+        :type serializer: JsonSerializer
+        :param compress_threshold: Send request bodies of at least this many bytes with gzip Content-Encoding, None to
+                                   never compress. The server, or a proxy in front of it, has to accept compressed
+                                   request bodies.
+        :type compress_threshold: int
+        """
+
+        logger = logging.getLogger(__name__)
+
+        self.__connection_string = connection_string
+        self.timeout = timeout
+
+        # Read errors are raised as they are, a ReadTimeout tells the caller the request may have been applied
+        retry = urllib3.util.Retry(total=retries, connect=retries, read=False, status=retries,
+                                   status_forcelist=self.RETRY_STATUS_CODES, allowed_methods=frozenset(["POST"]),
+                                   backoff_factor=backoff_factor)
+        self.adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.mutation_adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                                                              max_retries=retry.new(status_forcelist=self.MUTATION_RETRY_STATUS_CODES))
+        self._local = threading.local()
+        self.plan_cache = plan_cache if plan_cache is not None else PlanInfoCache(self.DEFAULT_PLAN_INFO_TTL)
+        self.serializer = serializer if serializer is not None else default_serializer()
+        self.compress_threshold = compress_threshold
+
+        logger.info("GraphQL Config: api_conn: %s, pool_size: %s, timeout: %s, retries: %s, serializer: %s, compress_threshold: %s", connection_string, pool_size, timeout, retries, self.serializer.NAME, compress_threshold)
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        requests.Session of the calling thread for queries, sharing the connection pool of the GqlInterface
+
+        :return: Session of the calling thread
+        :rtype: requests.Session
+        """
+
+        return self._thread_session("session", self.adapter)
+
+    @property
+    def mutation_session(self) -> requests.Session:
+        """
+        requests.Session of the calling thread for mutations, sharing the mutation connection pool of the GqlInterface
+
+        :return: Session of the calling thread
+        :rtype: requests.Session
+        """
+
+        return self._thread_session("mutation_session", self.mutation_adapter)
+
+    def _thread_session(self, name: str, adapter: requests.adapters.HTTPAdapter) -> requests.Session:
+        """
+        requests.Session of the calling thread mounting adapter, created on first use
+
+        :param name: Name of the session in the thread local storage
+        :type name: str
+        :param adapter: Adapter of the connection pool
+        :type adapter: requests.adapters.HTTPAdapter
+        :return: Session of the calling thread
+        :rtype: requests.Session
+        """
+
+        session = getattr(self._local, name, None)
+        if session is None:
+            session = requests.Session()
+            session.verify = False
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            setattr(self._local, name, session)
+        return session
+
+    def close(self) -> None:
+        """
+        Close the pooled connections to the Hasura database
+
+        :return: None
+        :rtype: None
+        """
+
+        self.adapter.close()
+        self.mutation_adapter.close()
+
+    def _post(self, query: str, variables: dict) -> dict:
+        """
+        Send a GraphQL query to the Hasura database through the pooled session of the calling thread. A mutation
+        answered with a server error that is not retried raises requests.HTTPError, it may have been applied, as does
+        any request refused with 413 Payload Too Large.
+
+        :param query: GraphQL query or mutation
+        :type query: str
+        :param variables: Variables of the query
+        :type variables: dict
+        :return: Response object from Hasura DB
+        :rtype: dict
+        """
 
-    DEFAULT_CONNECTION_STRING = 'http://localhost:8080/v1/graphql'
+        body = self.serializer.dumps({
+            'query': query,
+            'variables': variables,
+        })
+        headers = {'Content-Type': 'application/json'}
+        if self.compress_threshold is not None and len(body) >= self.compress_threshold:
+            body = gzip.compress(body, compresslevel=self.GZIP_LEVEL)
+            headers['Content-Encoding'] = 'gzip'
+
+        mutation = query.startswith("mutation")
+        session = self.mutation_session if mutation else self.session
+        response = session.post(
+            url=self.__connection_string,
+            data=body,
+            headers=headers,
+            timeout=self.timeout
+        )
+        if response.status_code == 413 or (mutation and response.status_code >= 500):
+            response.raise_for_status()
+        return self.serializer.loads(response.content)
 
-    def __init__(self, connection_string: str=DEFAULT_CONNECTION_STRING):
+    def get_plan_info_from_id(self, plan_id: int) -> tuple[datetime.datetime, datetime.datetime]:
         """
-        Initialize an GqlInterface which retreives and inserts information into the AERIE DB.
+        Retreives the start and end times of an AERIE plan, served from plan_cache while they are fresh
 
-        :param connection_string: Connection string to Hasura GraphQL DB
-        :type connection_string: str
+        :param plan_id: plan_id for the AERIE plan to read
+        :type plan_id: int
+        :return: tuple of the plan start and plan end times in python datetime objects
+        :rtype: tuple
         """
 
-        logger = logging.getLogger(__name__)
+        return self.plan_cache.get((self.__connection_string, plan_id), functools.partial(self.read_plan_info, plan_id))
 
-        self.__connection_string = connection_string
+    def invalidate_plan_info(self, plan_id: int = None) -> None:
+        """
+        Drop the cached information of a plan, for instance after its start time or duration changed
 
-        logger.info("GraphQL Config: api_conn: %s", connection_string)
+        :param plan_id: plan_id for the AERIE plan to drop, every plan if None
+        :type plan_id: int
+        :return: None
+        :rtype: None
+        """
 
-    def get_plan_info_from_id(self, plan_id: int) -> tuple[datetime.datetime, datetime.datetime]:
+        self.plan_cache.invalidate(None if plan_id is None else (self.__connection_string, plan_id))
+
+    def read_plan_info(self, plan_id: int) -> tuple[datetime.datetime, datetime.datetime]:
         """
-        Retreives the start and end times of an AERIE plan
+        Reads the start and end times of an AERIE plan from AERIE DB, bypassing plan_cache
 
         :param plan_id: plan_id for the AERIE plan to read
         :type plan_id: int
@@ -897,7 +3670,7 @@ class GqlInterface(object):
 
         return plan_start, plan_end
 
-    def mux_files(self, decoders: list, plan_id) -> dict:
+    def mux_files(self, decoders: list, plan_id, clip: bool = False, filters: dict = None) -> dict:
         """
         Accepts a list of decoders and retrieves activity information from them. This information is then constructed
         into AERIE activity GQL mutations and returned in pythonic generator fashion.
@@ -906,103 +3679,284 @@ class GqlInterface(object):
         :type decoders: list
         :param plan_id: plan_id for the AERIE plan to insert into
         :type plan_id: int
+        :param clip: Only decode the events within the plan, see mux_decoder
+        :type clip: bool
+        :param filters: parse() filters of the decoders, see mux_decoder
+        :type filters: dict
         :return: None
         :rtype: None
         """
 
         assert(isinstance(decoders, list))
-        logger = logging.getLogger(__name__)
 
         plan_start, plan_end = self.get_plan_info_from_id(plan_id)
 
         for decoder in decoders:
+            yield from self.mux_decoder(decoder, plan_id, plan_start, plan_end, clip, filters)
+
+    def mux_files_concurrent(self, decoders: list, plan_id: int, processes: int = None, queue_size: int = 16, batch_size: int = 500, clip: bool = False, filters: dict = None) -> dict:
+        """
+        Concurrent counterpart of mux_files. Decoders of files on disk are decoded and converted in a pool of
+        processes, one file per task, the converted activities of all files feed a single bounded queue drained by the
+        caller. Activities of different files are interleaved, activities of a single file keep their order.
+        Decoders reading from file objects are muxed in the calling process once the pooled files are done.
+
+        :param decoders: list of Decoder types that will be parsed for information
+        :type decoders: list
+        :param plan_id: plan_id for the AERIE plan to insert into
+        :type plan_id: int
+        :param processes: Number of worker processes, defaults to the number of CPUs
+        :type processes: int
+        :param queue_size: Maximum number of activity batches waiting in the queue
+        :type queue_size: int
+        :param batch_size: Number of activities a worker sends through the queue at once
+        :type batch_size: int
+        :param clip: Only decode the events within the plan, see mux_decoder
+        :type clip: bool
+        :param filters: parse() filters of the decoders, see mux_decoder
+        :type filters: dict
+        :return: generator returning AERIE activity GQL objects
+        :rtype: dict
+        """
 
-            if isinstance(decoder, DsnViewPeriodPredLegacyDecoder):
-                """
-                WRT view_period_duration activities vs view_period_events
+        assert(isinstance(decoders, list))
+        logger = logging.getLogger(__name__)
+
+        plan_start, plan_end = self.get_plan_info_from_id(plan_id)
 
-                The "Event" activities do not contain the duration of the view period, they contain the full information
-                about the change in view state for a particular station / spacecraft combination at a point in time.
-                The "Duration" activities are derived from the "Event" activities. They contain a derived collection
-                of the information that is relevant to the whole window of the view period. We discussed
-                how to capture the actual duration of a view period within Aerie, and we decided to create a new Event
-                type (Duration) and do this work in Python. We chose not to put it in a resource because it would limit
-                the amount of missions that could appear on a plan to ones that were predefined in the model.
-                """
+        pooled = [decoder for decoder in decoders if os.path.isfile(decoder.filename)]
+        local = [decoder for decoder in decoders if not os.path.isfile(decoder.filename)]
 
-                # Contains the start events for each DSN View Period event
-                # When the end event is found, a view_period_duration event will be created
-                dsn_vp_durations = {}
+        for decoder in pooled:
+            if not isinstance(decoder, (DsnViewPeriodPredLegacyDecoder, DsnStationAllocationFileDecoder)):
+                logger.error("Aborting, Got invalid Decoder type: %s", type(decoder).__name__)
+                raise ValueError("Invalid Decoder type: %s", type(decoder).__name__)
 
-                for record in decoder.parse():
-                    if plan_start > record["TIME"] or record["TIME"] > plan_end:
-                        logger.warning("Record %s is out of range for plan id %s, daterange %s to %s", record, plan_id, plan_start.isoformat(), plan_end.isoformat())
+        if pooled:
+            processes = processes or os.cpu_count() or 1
+            logger.info("Decoding %s files with %s processes", len(pooled), processes)
 
-                    event = record["EVENT"]
+            manager = multiprocessing.Manager()
+            activity_queue = manager.Queue(maxsize=queue_size)
+            pool = concurrent.futures.ProcessPoolExecutor(max_workers=min(processes, len(pooled)))
+
+            try:
+                futures = {pool.submit(_mux_decoder_file, type(decoder), decoder.filename, decoder.use_mmap, decoder.cache and decoder.cache.directory, decoder.max_rejected, plan_id, plan_start, plan_end, clip, filters, activity_queue, batch_size): decoder.filename
+                           for decoder in pooled}
+
+                # Each task ends its stream with a (filename, error) tuple, error is None on success
+                remaining = len(pooled)
+                while remaining:
+                    try:
+                        item = activity_queue.get(timeout=self.MUX_POLL_INTERVAL)
+                    except queue.Empty:
+                        # A worker killed or failing outside of its task never sends its tuple
+                        for future, filename in futures.items():
+                            if future.done() and future.exception() is not None:
+                                logger.error("Aborting, worker decoding %s failed: %s", filename, future.exception())
+                                raise future.exception()
+                        continue
+
+                    if isinstance(item, tuple):
+                        filename, error = item
+                        if error is not None:
+                            logger.error("Aborting, failed to decode %s: %s", filename, error)
+                            raise error if isinstance(error, BaseException) else ValueError(error)
+                        remaining -= 1
+                    else:
+                        yield from item
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+                # Shutting the manager down releases workers blocked on a full queue when the caller stops early
+                manager.shutdown()
+                pool.shutdown(wait=True)
+
+        for decoder in local:
+            yield from self.mux_decoder(decoder, plan_id, plan_start, plan_end, clip, filters)
 
-                    # Start of new Viewperiod window, store the start event for the station
-                    if event in ("RISE"):
-                        if record["STATION_IDENTIFIER"] not in dsn_vp_durations:
-                            dsn_vp_durations[record["STATION_IDENTIFIER"]] = record
-                        else:
-                            logger.warning("For Viewperiod %s, Station %s already has a start event", record, record["STATION_IDENTIFIER"])
+    @classmethod
+    def mux_decoder(cls, decoder: Decoder, plan_id: int, plan_start: datetime.datetime, plan_end: datetime.datetime, clip: bool = False, filters: dict = None) -> dict:
+        """
+        Retrieves activity information from a single decoder and constructs it into AERIE activity GQL mutations,
+        returned in pythonic generator fashion.
 
-                    # End of Viewperiod Window, close the event and calculate duration
-                    elif event in ("SET"):
+        Events outside the plan are converted with a warning unless clip is set. With clip, View Period files are only
+        decoded from plan_start to plan_end, seeking straight to plan_start when the file can be searched, and view
+        periods open at either end of the plan are cut at the plan bounds. Station allocations outside the plan are
+        skipped.
 
-                        close_record = None
+        filters holds parse() filters of either decoder, e.g. {"project": "TEST", "spacecraft": 1}, each decoder is
+        given the filters its parse() accepts.
 
-                        # Get the start view_period for the station ID
-                        try:
-                            close_record = dsn_vp_durations.pop(record["STATION_IDENTIFIER"])
-                            end_time = record["TIME"]
-                        except KeyError as ke:
-                            # Handle edge case where a view period has started before the file begins
+        :param decoder: Decoder that will be parsed for information
+        :type decoder: Decoder
+        :param plan_id: plan_id for the AERIE plan to insert into
+        :type plan_id: int
+        :param plan_start: Start time of the plan
+        :type plan_start: datetime.datetime
+        :param plan_end: End time of the plan
+        :type plan_end: datetime.datetime
+        :param clip: Only decode and convert the events within the plan
+        :type clip: bool
+        :param filters: key / value dict of parse() filter names of DsnViewPeriodPredLegacyDecoder and
+                        DsnStationAllocationFileDecoder to accepted values
+        :type filters: dict
+        :return: generator returning AERIE activity GQL objects
+        :rtype: dict
+        """
 
-                            # If a view_period start does not exist use the start time of the file as the duration start
-                            logger.warning("For Viewperiod %s, Station %s does not have a start event", record, record["STATION_IDENTIFIER"])
+        logger = logging.getLogger(__name__)
 
-                            # Clone the current event to use as the base for a start of view_period duration
-                            clone_record = record.copy()
+        filters = filters or {}
+        for name in filters:
+            if name not in DsnViewPeriodPredLegacyDecoder.FILTERS and name not in DsnStationAllocationFileDecoder.FILTERS:
+                logger.error("Aborting, Got unknown filter: %s", name)
+                raise ValueError("Unknown filter: %s" % name)
+        filters = {name: value for name, value in filters.items() if name in decoder.FILTERS}
+
+        if isinstance(decoder, DsnViewPeriodPredLegacyDecoder):
+            """
+            WRT view_period_duration activities vs view_period_events
+
+            The "Event" activities do not contain the duration of the view period, they contain the full information
+            about the change in view state for a particular station / spacecraft combination at a point in time.
+            The "Duration" activities are derived from the "Event" activities. They contain a derived collection
+            of the information that is relevant to the whole window of the view period. We discussed
+            how to capture the actual duration of a view period within Aerie, and we decided to create a new Event
+            type (Duration) and do this work in Python. We chose not to put it in a resource because it would limit
+            the amount of missions that could appear on a plan to ones that were predefined in the model.
+            """
+
+            # Contains the start events for each DSN View Period event
+            # When the end event is found, a view_period_duration event will be created
+            dsn_vp_durations = {}
+
+            for record in decoder.parse(plan_start, plan_end, **filters) if clip else decoder.parse(**filters):
+                if plan_start > record["TIME"] or record["TIME"] > plan_end:
+                    logger.warning("Record %s is out of range for plan id %s, daterange %s to %s", record, plan_id, plan_start.isoformat(), plan_end.isoformat())
+
+                event = record["EVENT"]
+
+                # Start of new Viewperiod window, store the start event for the station
+                if event in ("RISE"):
+                    if record["STATION_IDENTIFIER"] not in dsn_vp_durations:
+                        dsn_vp_durations[record["STATION_IDENTIFIER"]] = record
+                    else:
+                        logger.warning("For Viewperiod %s, Station %s already has a start event", record, record["STATION_IDENTIFIER"])
+
+                # End of Viewperiod Window, close the event and calculate duration
+                elif event in ("SET"):
+
+                    close_record = None
+
+                    # Get the start view_period for the station ID
+                    try:
+                        close_record = dsn_vp_durations.pop(record["STATION_IDENTIFIER"])
+                        end_time = record["TIME"]
+                    except KeyError as ke:
+                        # Handle edge case where a view period has started before the file begins
+
+                        # If a view_period start does not exist use the start time of the file as the duration start
+                        logger.warning("For Viewperiod %s, Station %s does not have a start event", record, record["STATION_IDENTIFIER"])
+
+                        # Clone the current event to use as the base for a start of view_period duration
+                        clone_record = record.copy()
+
+                        # Store the end time of the event and set the event's start time to the file start
+                        end_time = clone_record["TIME"]
+                        clone_record["TIME"] = decoder.header_dict["APPLICABLE_START_TIME"]
+                        if clip:
+                            clone_record["TIME"] = max(clone_record["TIME"], plan_start)
+                        clone_record["DURATION"] = cls.convert_to_aerie_duration(clone_record["TIME"], end_time)
+
+                        yield cls.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, clone_record)
+
+                    if close_record is not None:
+                        close_record["DURATION"] = cls.convert_to_aerie_duration(close_record["TIME"], record["TIME"])
+                        yield cls.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, close_record)
+
+                yield cls.convert_dsn_viewperiod_event_to_gql(plan_id, plan_start, decoder.header_dict, record)
+
+            # Handle edge case where a view period has started and not stopped before the file end
+            for key in dsn_vp_durations:
+
+                # Get the incomplete duration activity to close it out
+                record = dsn_vp_durations[key]
+                logger.warning("For Viewperiod %s, Station %s does not have an end event", record, record["STATION_IDENTIFIER"])
+
+                # Calculate duration of activity by using the end time of the file
+                end_time = decoder.header_dict["APPLICABLE_STOP_TIME"]
+                if clip:
+                    end_time = min(end_time, plan_end)
+                record["DURATION"] = cls.convert_to_aerie_duration(record["TIME"], end_time)
+
+                yield cls.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, record)
+
+        elif isinstance(decoder, DsnStationAllocationFileDecoder):
+            for record in decoder.parse(**filters):
+                if clip and (plan_start > record["SOA"] or record["SOA"] > plan_end):
+                    continue
+                if plan_start > record["SOA"] or record["SOA"] > plan_end:
+                    logger.warning("Record %s is out of range for plan id %s, daterange %s to %s", record, plan_id, plan_start.isoformat(), plan_end.isoformat())
+                yield cls.convert_dsn_stationallocation_to_gql(plan_id, plan_start, decoder.header_dict, record)
 
-                            # Store the end time of the event and set the event's start time to the file start
-                            end_time = clone_record["TIME"]
-                            clone_record["TIME"] = decoder.header_dict["APPLICABLE_START_TIME"]
-                            clone_record["DURATION"] = self.convert_to_aerie_duration(clone_record["TIME"], end_time)
+        else:
+            logger.error("Aborting, Got invalid Decoder type: %s", type(decoder).__name__)
+            raise ValueError("Invalid Decoder type: %s", type(decoder).__name__)
 
-                            yield self.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, clone_record)
+    def demux_files(self, saf_encoder: DsnStationAllocationFileEncoder, vp_encoder: DsnViewPeriodPredLegacyEncoder, plan_id: int, page_size: int = None, sort_buffer: int = None, sort_dir: str = None, plan_window: tuple = None) -> None:
+      """
+      Accepts two Encoders and writes activity information to them from the AERIE DB. The activities of both encoders
+      are fetched together in pages holding only EXPORT_ACTIVITY_FIELDS, one round trip per page, and converted as
+      they arrive. The events of each encoder are put in time order with an ExternalSorter, so memory use is bounded by
+      page_size and sort_buffer rather than by the size of the plan.
 
-                        if close_record is not None:
-                            close_record["DURATION"] = self.convert_to_aerie_duration(close_record["TIME"], record["TIME"])
-                            yield self.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, close_record)
+      :param saf_encoder: list of Decoder types that will be parsed for information
+      :type saf_encoder: DsnStationAllocationFileEncoder
+      :param vp_encoder: plan_id for the AERIE plan to insert into
+      :type vp_encoder: DsnViewPeriodPredLegacyEncoder
+      :param plan_id: plan_id for the AERIE plan to read from
+      :type plan_id: int
+      :param page_size: Number of activities fetched per request, DEMUX_PAGE_SIZE if None
+      :type page_size: int
+      :param sort_buffer: Number of events of each encoder sorted in memory before they are spilled to disk,
+                          DEMUX_SORT_BUFFER if None
+      :type sort_buffer: int
+      :param sort_dir: Directory of the spilled sort runs, None for the default temporary directory
+      :type sort_dir: str
+      :param plan_window: (plan_start, plan_end) of the plan if already known, read from AERIE if None
+      :type plan_window: tuple
+      :return: None
+      :rtype: None
+      """
 
-                    yield self.convert_dsn_viewperiod_event_to_gql(plan_id, plan_start, decoder.header_dict, record)
+      logger = logging.getLogger(__name__)
 
-                # Handle edge case where a view period has started and not stopped before the file end
-                for key in dsn_vp_durations:
+      page_size = page_size or self.DEMUX_PAGE_SIZE
+      sort_buffer = sort_buffer or self.DEMUX_SORT_BUFFER
 
-                    # Get the incomplete duration activity to close it out
-                    record = dsn_vp_durations[key]
-                    logger.warning("For Viewperiod %s, Station %s does not have an end event", record, record["STATION_IDENTIFIER"])
+      plan_start, plan_end = plan_window or self.get_plan_info_from_id(plan_id)
 
-                    # Calculate duration of activity by using the end time of the file
-                    record["DURATION"] = self.convert_to_aerie_duration(record["TIME"], decoder.header_dict["APPLICABLE_STOP_TIME"])
+      encoders = (saf_encoder, vp_encoder)
+      routes = [self.demux_route(encoder, plan_start) for encoder in encoders]
 
-                    yield self.convert_dsn_viewperiod_duration_to_gql(plan_id, plan_start, decoder.header_dict, record)
+      with ExternalSorter(operator.itemgetter(routes[0][1]), sort_buffer, sort_dir) as saf_sorter, \
+           ExternalSorter(operator.itemgetter(routes[1][1]), sort_buffer, sort_dir) as vp_sorter:
+        sorters = {activity_type: (sorter, convert) for (activity_type, time_key, convert), sorter in zip(routes, (saf_sorter, vp_sorter))}
 
-            elif isinstance(decoder, DsnStationAllocationFileDecoder):
-                for record in decoder.parse():
-                    if plan_start > record["SOA"] or record["SOA"] > plan_end:
-                        logger.warning("Record %s is out of range for plan id %s, daterange %s to %s", record, plan_id, plan_start.isoformat(), plan_end.isoformat())
-                    yield self.convert_dsn_stationallocation_to_gql(plan_id, plan_start, decoder.header_dict, record)
+        for activity in self.iter_activities(plan_id, list(sorters), page_size, fields=self.EXPORT_ACTIVITY_FIELDS):
+          sorter, convert = sorters[activity["type"]]
+          sorter.add(convert(activity))
 
-            else:
-                logger.error("Aborting, Got invalid Decoder type: %s", type(decoder).__name__)
-                raise ValueError("Invalid Decoder type: %s", type(decoder).__name__)
+        for encoder, (activity_type, time_key, convert), sorter in zip(encoders, routes, (saf_sorter, vp_sorter)):
+          logger.info("Sorting %s activities with %s spilled runs", activity_type, len(sorter.runs))
+          encoder.cast(sorter)
 
-    def demux_files(self, saf_encoder: DsnStationAllocationFileEncoder, vp_encoder: DsnViewPeriodPredLegacyEncoder, plan_id: int) -> None:
+    def demux_files_concurrent(self, saf_encoder: DsnStationAllocationFileEncoder, vp_encoder: DsnViewPeriodPredLegacyEncoder, plan_id: int, page_size: int = None, sort_buffer: int = None, sort_dir: str = None, plan_window: tuple = None) -> None:
       """
-      Accepts two Encoders and writes activity information to them from the AERIE DB.
+      Concurrent counterpart of demux_files. The plan information is read once, then the Station Allocation and View
+      Period exports each run in their own thread, so the requests of one export overlap with the converting and
+      formatting of the other. Each export still writes its file in time order.
 
       :param saf_encoder: list of Decoder types that will be parsed for information
       :type saf_encoder: DsnStationAllocationFileEncoder
@@ -1010,57 +3964,538 @@ class GqlInterface(object):
       :type vp_encoder: DsnViewPeriodPredLegacyEncoder
       :param plan_id: plan_id for the AERIE plan to read from
       :type plan_id: int
+      :param page_size: Number of activities fetched per request, DEMUX_PAGE_SIZE if None
+      :type page_size: int
+      :param sort_buffer: Number of events each export sorts in memory before they are spilled to disk,
+                          DEMUX_SORT_BUFFER if None
+      :type sort_buffer: int
+      :param sort_dir: Directory of the spilled sort runs, None for the default temporary directory
+      :type sort_dir: str
+      :param plan_window: (plan_start, plan_end) of the plan if already known, read from AERIE if None
+      :type plan_window: tuple
+      :return: None
+      :rtype: None
+      """
+
+      logger = logging.getLogger(__name__)
+
+      plan_start, plan_end = plan_window or self.get_plan_info_from_id(plan_id)
+
+      with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(self.demux_encoder, encoder, plan_id, plan_start, page_size, sort_buffer, sort_dir)
+                   for encoder in (saf_encoder, vp_encoder)]
+
+        # Wait for both exports before reporting, so a failed export does not leave the other one writing its file
+        concurrent.futures.wait(futures)
+
+      for encoder, future in zip((saf_encoder, vp_encoder), futures):
+        if future.exception() is not None:
+          logger.error("Export to %s failed: %s", type(encoder).__name__, future.exception())
+          raise future.exception()
+
+    def demux_encoder(self, encoder: Encoder, plan_id: int, plan_start: datetime.datetime, page_size: int = None, sort_buffer: int = None, sort_dir: str = None) -> None:
+      """
+      Writes the activities of a plan matching the type of an Encoder to it, fetching them in pages holding only
+      EXPORT_ACTIVITY_FIELDS and sorting them in time order within the sort_buffer memory budget
+
+      :param encoder: Encoder to write to
+      :type encoder: Encoder
+      :param plan_id: plan_id for the AERIE plan to read from
+      :type plan_id: int
+      :param plan_start: Start time of the AERIE plan
+      :type plan_start: datetime.datetime
+      :param page_size: Number of activities fetched per request, DEMUX_PAGE_SIZE if None
+      :type page_size: int
+      :param sort_buffer: Number of events sorted in memory before they are spilled to disk, DEMUX_SORT_BUFFER if None
+      :type sort_buffer: int
+      :param sort_dir: Directory of the spilled sort runs, None for the default temporary directory
+      :type sort_dir: str
       :return: None
       :rtype: None
       """
 
       logger = logging.getLogger(__name__)
 
-      plan_start, plan_end = self.get_plan_info_from_id(plan_id)
-      activities = self.read_activities(plan_id, "DSN_Track")
+      page_size = page_size or self.DEMUX_PAGE_SIZE
+      sort_buffer = sort_buffer or self.DEMUX_SORT_BUFFER
+
+      activity_type, time_key, convert = self.demux_route(encoder, plan_start)
+
+      with ExternalSorter(operator.itemgetter(time_key), sort_buffer, sort_dir) as sorter:
+        sorter.extend(map(convert, self.iter_activities(plan_id, [activity_type], page_size, fields=self.EXPORT_ACTIVITY_FIELDS)))
+        logger.info("Sorting %s activities with %s spilled runs", activity_type, len(sorter.runs))
+        encoder.cast(sorter)
+
+    @classmethod
+    def demux_route(cls, encoder: Encoder, plan_start: datetime.datetime) -> tuple:
+      """
+      Activity type, event time key and activity conversion function of an Encoder
+
+      :param encoder: Encoder to write to
+      :type encoder: Encoder
+      :param plan_start: Start time of the AERIE plan
+      :type plan_start: datetime.datetime
+      :return: tuple of the activity type, the time key of the events and the function converting an activity to an
+               event of the encoder
+      :rtype: tuple
+      """
+
+      logger = logging.getLogger(__name__)
+
+      if isinstance(encoder, DsnStationAllocationFileEncoder):
+        return "DSN_Track", "SOA", cls.convert_gql_to_dsn_stationallocation
+      elif isinstance(encoder, DsnViewPeriodPredLegacyEncoder):
+        return "DSN_View_Period_Event", "TIME", functools.partial(cls.convert_gql_to_dsn_viewperiod_event, plan_start)
+
+      logger.error("Aborting, Got invalid Encoder type: %s", type(encoder).__name__)
+      raise ValueError("Invalid Encoder type: %s" % type(encoder).__name__)
+
+    @classmethod
+    def decoder_activity_types(cls, decoders: list) -> list:
+      """
+      Activity types mux_files creates from a list of decoders
+
+      :param decoders: list of Decoder types
+      :type decoders: list
+      :return: list of activity types
+      :rtype: list
+      """
+
+      logger = logging.getLogger(__name__)
+
+      activity_types = []
+      for decoder in decoders:
+        if isinstance(decoder, DsnViewPeriodPredLegacyDecoder):
+          types = ["DSN_View_Period_Event", "DSN_View_Period_Duration"]
+        elif isinstance(decoder, DsnStationAllocationFileDecoder):
+          types = ["DSN_Track"]
+        else:
+          logger.error("Aborting, Got invalid Decoder type: %s", type(decoder).__name__)
+          raise ValueError("Invalid Decoder type: %s" % type(decoder).__name__)
+        activity_types.extend(activity_type for activity_type in types if activity_type not in activity_types)
+      return activity_types
+
+    @classmethod
+    def parse_aerie_offset(cls, offset: str) -> datetime.timedelta:
+      """
+      Parse an AERIE start offset, as written by convert_to_aerie_offset or read back from Hasura, with the sign
+      applying to the whole offset like PostgreSQL intervals
+
+      :param offset: Start offset, [-][D day[s] ]H:M:S[.F]
+      :type offset: str
+      :return: Offset from the plan start
+      :rtype: datetime.timedelta
+      """
+
+      sign, days, hours, minutes, seconds = cls.AERIE_OFFSET_PATTERN.fullmatch(offset).groups()
+      delta = datetime.timedelta(days=int(days or 0), hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+      return -delta if sign else delta
+
+    @classmethod
+    def sync_key(cls, activity: dict) -> tuple:
+      """
+      Identity of an activity across revisions of a product, its type and SYNC_KEY_ARGUMENTS
+
+      :param activity: Activity directive
+      :type activity: dict
+      :return: Identity of the activity
+      :rtype: tuple
+      """
+
+      arguments = activity["arguments"]
+      return (activity["type"],) + tuple(arguments.get(argument) for argument in cls.SYNC_KEY_ARGUMENTS.get(activity["type"], ()))
+
+    @classmethod
+    def sync_canonical(cls, value):
+      """
+      Canonical form of an activity argument, equal for the decoded value and the value Hasura returns after storing
+      it: numbers are floats rounded to the microsecond, offsets and durations seconds rounded to the microsecond
+
+      :param value: Argument value, dicts and lists are canonicalized item by item
+      :type value: object
+      :return: Canonical value
+      :rtype: object
+      """
+
+      if isinstance(value, dict):
+        return {key: cls.sync_canonical(item) for key, item in value.items()}
+      if isinstance(value, list):
+        return [cls.sync_canonical(item) for item in value]
+      if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return round(float(value), 6)
+      if isinstance(value, str) and cls.AERIE_OFFSET_PATTERN.fullmatch(value):
+        return ["offset", round(cls.parse_aerie_offset(value).total_seconds(), 6)]
+      return value
+
+    @classmethod
+    def sync_fingerprint(cls, activity: dict) -> str:
+      """
+      Fingerprint of the content of an activity, its type, start time and arguments, which include its station and
+      pass. Arguments are compared in their sync_canonical form independently of key order, start offsets to the
+      microsecond.
+
+      :param activity: Activity directive
+      :type activity: dict
+      :return: Hex digest of the activity content
+      :rtype: str
+      """
+
+      start = cls.parse_aerie_offset(activity["start_offset"])
+      content = json.dumps([activity["type"], round(start.total_seconds(), 6), cls.sync_canonical(activity["arguments"])], sort_keys=True)
+      return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
+    def sync_files(self, decoders: list, plan_id: int, delete: bool = False, batch_size: int = 500, clip: bool = False, filters: dict = None) -> dict:
+      """
+      Accepts a list of decoders and brings the plan in line with them, see sync_activities
+
+      :param decoders: list of Decoder types that will be parsed for information
+      :type decoders: list
+      :param plan_id: plan_id for the AERIE plan to synchronize
+      :type plan_id: int
+      :param delete: Delete the activities of the decoded types that are no longer in the decoded files
+      :type delete: bool
+      :param batch_size: Number of activities per mutation
+      :type batch_size: int
+      :param clip: Only decode the events within the plan, see mux_decoder
+      :type clip: bool
+      :param filters: parse() filters of the decoders, see mux_decoder, not allowed with delete
+      :type filters: dict
+      :return: key / value dict of the number of activities inserted, updated, deleted and unchanged
+      :rtype: dict
+      """
+
+      logger = logging.getLogger(__name__)
+
+      # Filtered decoding leaves out activities that are still current, deleting them would lose them
+      if delete and filters and any(value is not None for value in filters.values()):
+        logger.error("Deleting vanished activities is not supported with filters %s", filters)
+        raise ValueError("Deleting vanished activities is not supported with filters")
 
-      c = []
-      for dsn_track_activity in activities["data"]["activity_directive"]:
-        c.append(self.convert_gql_to_dsn_stationallocation(dsn_track_activity))
-      c = sorted(c, key=lambda event: event['SOA'])
-      saf_encoder.cast(c)
+      return self.sync_activities(self.mux_files(decoders, plan_id, clip, filters), plan_id, self.decoder_activity_types(decoders), delete, batch_size)
 
-      activities = self.read_activities(plan_id, "DSN_View_Period_Event")
+    def sync_activities(self, activities: Iterable[dict], plan_id: int, activity_types: list, delete: bool = False, batch_size: int = 500) -> dict:
+      """
+      Brings the activities of some types in a plan in line with a revised set of activities, instead of appending a
+      second copy of them. The existing activities of those types are read with their sync_key and sync_fingerprint,
+      then each revised activity is
+
+      - inserted if no existing activity has its sync_key
+      - updated, start offset and arguments, if the existing activity has another sync_fingerprint
+      - left alone otherwise
+
+      Existing activities sharing a sync_key are paired with the revised ones in start offset order. With delete, the
+      existing activities left without a revised activity are deleted. Mutations are sent in batches of batch_size.
+
+      :param activities: Iterable object providing the revised activities, such as mux_files
+      :type activities: Iterable[dict]
+      :param plan_id: plan_id for the AERIE plan to synchronize
+      :type plan_id: int
+      :param activity_types: Activity types synchronized, activities of other types are never updated or deleted
+      :type activity_types: list
+      :param delete: Delete the existing activities of activity_types without a revised activity
+      :type delete: bool
+      :param batch_size: Number of activities per mutation
+      :type batch_size: int
+      :return: key / value dict of the number of activities inserted, updated, deleted and unchanged
+      :rtype: dict
+      """
 
-      c = []
-      for dsn_view_activity in activities["data"]["activity_directive"]:
-        c.append(self.convert_gql_to_dsn_viewperiod_event(plan_start, dsn_view_activity))
-      c = sorted(c, key=lambda event: event['TIME'])
-      vp_encoder.cast(c)
+      logger = logging.getLogger(__name__)
 
-    def create_activities(self, activities: list) -> None:
+      # Existing activities by identity, each a list of (start, id, fingerprint) in start offset order
+      existing = collections.defaultdict(list)
+      for activity in self.iter_activities(plan_id, list(activity_types), fields=self.EXPORT_ACTIVITY_FIELDS):
+        existing[self.sync_key(activity)].append((self.parse_aerie_offset(activity["start_offset"]), activity["id"], self.sync_fingerprint(activity)))
+      for matches in existing.values():
+        matches.sort(reverse=True)
+      logger.info("Synchronizing against %s existing activities of %s", sum(map(len, existing.values())), activity_types)
+
+      counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+      inserts, updates = [], []
+
+      def flush(final: bool = False) -> None:
+        if inserts and (final or len(inserts) >= batch_size):
+          self.create_activities(inserts)
+          counts["inserted"] += len(inserts)
+          inserts.clear()
+        if updates and (final or len(updates) >= batch_size):
+          self.update_activities(updates)
+          counts["updated"] += len(updates)
+          updates.clear()
+
+      for activity in activities:
+        if activity["type"] not in activity_types:
+          logger.error("Activity type %s is not synchronized, expected one of %s", activity["type"], activity_types)
+          raise ValueError("Activity type is not synchronized: %s" % activity["type"])
+
+        matches = existing.get(self.sync_key(activity))
+        if not matches:
+          inserts.append(activity)
+        else:
+          start, activity_id, fingerprint = matches.pop()
+          if fingerprint == self.sync_fingerprint(activity):
+            counts["unchanged"] += 1
+          else:
+            updates.append({
+              "where": {"id": {"_eq": activity_id}, "plan_id": {"_eq": plan_id}},
+              "_set": {"start_offset": activity["start_offset"], "arguments": activity["arguments"]}
+            })
+        flush()
+      flush(final=True)
+
+      vanished = [activity_id for matches in existing.values() for start, activity_id, fingerprint in matches]
+      if delete:
+        for i in range(0, len(vanished), batch_size):
+          self.delete_activities(plan_id, vanished[i:i + batch_size])
+        counts["deleted"] = len(vanished)
+      elif vanished:
+        logger.info("Keeping %s activities no longer in the revised activities", len(vanished))
+
+      logger.info("Synchronized plan %s: %s", plan_id, counts)
+      return counts
+
+    def create_activities(self, activities: list) -> dict:
         """
         Inserts a list of activities into the AERIE DB
 
         :param activities: List of activities to insert into AERIE
         :type activities: list
+        :return: Response object from Hasura DB
+        :rtype: dict
+        """
+
+        assert isinstance(activities, list)
+
+        logger = logging.getLogger(__name__)
+
+        # The dumps of large batches are costly, only build them when they are logged
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Sending activities: %s", json.dumps(activities, indent=2))
+        r = self._post(self.INSERT_ACTIVITY_QUERY, {"activities": activities})
+        if debug:
+            logger.debug("create_activities: %s", json.dumps(r, indent=2))
+
+        if "errors" in r:
+            logger.error("Inserting activities failed: %s", r["errors"])
+            raise ValueError("Inserting activities failed: %s" % r["errors"])
+
+        return r
+
+    def update_activities(self, updates: list) -> dict:
+        """
+        Updates activities in the AERIE DB
+
+        :param updates: List of activity_directive_updates, each a where condition and the _set fields
+        :type updates: list
+        :return: Response object from Hasura DB
+        :rtype: dict
+        """
+
+        assert isinstance(updates, list)
+
+        logger = logging.getLogger(__name__)
+
+        r = self._post(self.UPDATE_ACTIVITY_QUERY, {"updates": updates})
+        if "errors" in r:
+            logger.error("Updating activities failed: %s", r["errors"])
+            raise ValueError("Updating activities failed: %s" % r["errors"])
+
+        return r
+
+    def delete_activities(self, plan_id: int, ids: list) -> dict:
+        """
+        Deletes activities of a plan from the AERIE DB
+
+        :param plan_id: plan_id for the AERIE plan to delete from
+        :type plan_id: int
+        :param ids: List of ids of the activities to delete
+        :type ids: list
+        :return: Response object from Hasura DB
+        :rtype: dict
+        """
+
+        assert isinstance(ids, list)
+
+        logger = logging.getLogger(__name__)
+
+        r = self._post(self.DELETE_ACTIVITY_QUERY, {"plan_id": plan_id, "ids": ids})
+        if "errors" in r:
+            logger.error("Deleting activities failed: %s", r["errors"])
+            raise ValueError("Deleting activities failed: %s" % r["errors"])
+
+        return r
+
+    @staticmethod
+    def is_unapplied(error: requests.exceptions.RequestException) -> bool:
+        """
+        Whether a failed request is known not to have been applied by Hasura: it failed to connect, was refused with
+        503 until the retries of the session gave up, or was refused with 413 Payload Too Large. A read timeout or
+        another server error may follow a committed mutation.
+
+        :param error: Error raised sending the request
+        :type error: requests.exceptions.RequestException
+        :return: True if the request can be sent again without applying it twice
+        :rtype: bool
+        """
+
+        if isinstance(error, (requests.exceptions.ConnectTimeout, requests.exceptions.RetryError)):
+            return True
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code == 413
+        if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+            # A connection dropped after sending the request is raised as a ConnectionError too
+            reason = getattr(error.args[0], "reason", error.args[0])
+            return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+        return False
+
+    def create_activities_sized(self, activities: list, sizer: AdaptiveBatchSizer) -> None:
+        """
+        Inserts a list of activities into the AERIE DB, recording the outcome with an AdaptiveBatchSizer. A batch that
+        was not applied, see is_unapplied, is backed off and sent again in halves, down to single activities. Any other
+        error, such as a read timeout or GraphQL errors, backs off the sizer and is raised, as the batch may have been
+        inserted.
+
+        :param activities: List of activities to insert into AERIE
+        :type activities: list
+        :param sizer: Batch sizer recording the latency of the insert
+        :type sizer: AdaptiveBatchSizer
         :return: None
         :rtype: None
         """
 
-        assert isinstance(activities, list)
+        logger = logging.getLogger(__name__)
+
+        start = time.perf_counter()
+        try:
+            self.create_activities(activities)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            sizer.record(len(activities), time.perf_counter() - start, failed=True)
+            if len(activities) == 1 or not self.is_unapplied(e):
+                raise
+
+            logger.warning("Inserting %s activities failed: %s, sending them again in halves", len(activities), e)
+            half = len(activities) // 2
+            self.create_activities_sized(activities[:half], sizer)
+            self.create_activities_sized(activities[half:], sizer)
+            return
+
+        sizer.record(len(activities), time.perf_counter() - start)
+
+    def create_activities_adaptive(self, activities: Iterable[dict], sizer: AdaptiveBatchSizer = None) -> int:
+        """
+        Inserts a stream of activities into the AERIE DB in batches sized by an AdaptiveBatchSizer
+
+        :param activities: Iterable object providing the activities to insert into AERIE
+        :type activities: Iterable[dict]
+        :param sizer: Batch sizer, a default AdaptiveBatchSizer with the serializer of the GqlInterface if None
+        :type sizer: AdaptiveBatchSizer
+        :return: Number of activities inserted
+        :rtype: int
+        """
+
+        sizer = sizer or AdaptiveBatchSizer(serializer=self.serializer)
+
+        count = 0
+        for batch in sizer.batches(activities):
+            self.create_activities_sized(batch, sizer)
+            count += len(batch)
+        return count
+
+    async def create_activities_async(self, activities: Iterable[dict], batch_size: int = 500, max_in_flight: int = 4, sizer: AdaptiveBatchSizer = None) -> int:
+        """
+        Asynchronous counterpart of create_activities taking a stream of activities, such as mux_files, and inserting
+        them in batches of batch_size with up to max_in_flight insert mutations in flight at once. The mutations are sent
+        from a pool of threads sharing the pooled connections of the GqlInterface.
+
+        The next batch is only packed once a mutation slot is free, so decoding runs at most max_in_flight batches
+        ahead of the database, and it is packed on a thread of the pool so decoding does not block the event loop.
+        After a failed batch no further batches are packed or sent. The batches in flight are awaited and the failures
+        are logged in batch order, the error of the earliest failed batch is raised. An error packing a batch is raised
+        once the batches in flight are awaited.
+
+        :param activities: Iterable object providing the activities to insert into AERIE
+        :type activities: Iterable[dict]
+        :param batch_size: Number of activities per insert mutation
+        :type batch_size: int
+        :param max_in_flight: Number of insert mutations in flight at once
+        :type max_in_flight: int
+        :param sizer: Batch sizer replacing batch_size, see create_activities_sized
+        :type sizer: AdaptiveBatchSizer
+        :return: Number of activities inserted
+        :rtype: int
+        """
 
         logger = logging.getLogger(__name__)
 
-        logger.debug("Sending activities: %s", json.dumps(activities, indent=2))
-        response = requests.post(
-            url=self.__connection_string,
-            json={
-                'query': self.INSERT_ACTIVITY_QUERY,
-                'variables': {"activities": activities},
-            },
-            verify=False
-        )
-        logger.debug("create_activities: %s", json.dumps(response.json(), indent=2))
+        if sizer is None:
+            activities = iter(activities)
+            next_batch = lambda: list(itertools.islice(activities, batch_size))
+            insert = self.create_activities
+        else:
+            batches = sizer.batches(activities)
+            next_batch = lambda: next(batches, [])
+            insert = functools.partial(self.create_activities_sized, sizer=sizer)
+
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_in_flight)
+        failures = {}
+        tasks = []
+        count = 0
+
+        async def send(index: int, batch: list) -> None:
+            try:
+                await loop.run_in_executor(executor, insert, batch)
+            except Exception as e:
+                failures[index] = e
+            finally:
+                slots.release()
+
+        # A batch being packed holds a slot, so the pool never runs more than max_in_flight packs and sends at once
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            try:
+                for index in itertools.count():
+                    await slots.acquire()
+                    if failures:
+                        break
+                    batch = await loop.run_in_executor(executor, next_batch)
+                    if not batch:
+                        break
+
+                    logger.debug("Sending batch %s of %s activities", index, len(batch))
+                    tasks.append(asyncio.create_task(send(index, batch)))
+                    count += len(batch)
+            finally:
+                await asyncio.gather(*tasks)
+                for index in sorted(failures):
+                    logger.error("Batch %s failed: %s", index, failures[index])
+
+        if failures:
+            raise failures[min(failures)]
+
+        return count
+
+    def create_activities_concurrent(self, activities: Iterable[dict], batch_size: int = 500, max_in_flight: int = 4, sizer: AdaptiveBatchSizer = None) -> int:
+        """
+        Inserts a stream of activities into the AERIE DB with create_activities_async, for callers without an event loop
+
+        :param activities: Iterable object providing the activities to insert into AERIE
+        :type activities: Iterable[dict]
+        :param batch_size: Number of activities per insert mutation
+        :type batch_size: int
+        :param max_in_flight: Number of insert mutations in flight at once
+        :type max_in_flight: int
+        :param sizer: Batch sizer replacing batch_size, see create_activities_sized
+        :type sizer: AdaptiveBatchSizer
+        :return: Number of activities inserted
+        :rtype: int
+        """
+
+        return asyncio.run(self.create_activities_async(activities, batch_size, max_in_flight, sizer))
 
     def read_activities(self, plan_id: int, activity_type: str=None) -> dict:
       """
-      Read activities of a certain type from AERIE DB
+      Read activities of a certain type from AERIE DB in a single response, use iter_activities for large plans
 
       :param plan_id: plan_id for the AERIE plan to read activities from
       :type plan_id: int
@@ -1076,21 +4511,126 @@ class GqlInterface(object):
       logger = logging.getLogger(__name__)
       logger.debug("Reading activities for: plan_id %s, activity_type %s", plan_id, activity_type)
 
-      response = requests.post(
-        url=self.__connection_string,
-        json={
-          'query': self.READ_ACTIVITY_QUERY,
-          'variables': {
-            'plan_id': plan_id,
-            'type': activity_type
-          },
-        },
-        verify=False
-      )
-      r = response.json()
-      logger.debug("read_activities: %s", json.dumps(r, indent=2))
+      r = self._post(self.READ_ACTIVITY_QUERY, {
+        'plan_id': plan_id,
+        'type': activity_type
+      })
+      if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("read_activities: %s", json.dumps(r, indent=2))
       return r
 
+    @classmethod
+    def build_activity_query(cls, plan_id: int, activity_types: Union[str, list] = None, fields: Iterable[str] = ACTIVITY_FIELDS, order_by: str = None, limit: int = None, after: dict = None) -> tuple:
+      """
+      Build a query reading the activity directives of a plan, returning the query with its variables. Hasura rejects
+      variables a query does not declare, so only the variables in use are declared.
+
+      :param plan_id: plan_id for the AERIE plan to read activities from
+      :type plan_id: int
+      :param activity_types: List of activity types matched with _in, a single type pattern matched with _like, or None
+                             for every type
+      :type activity_types: str | list
+      :param fields: Fields of the activity directives to select, a subset of ACTIVITY_FIELDS
+      :type fields: Iterable[str]
+      :param order_by: Order of the activities, one of ACTIVITY_PAGE_ORDERS, unordered if None
+      :type order_by: str
+      :param limit: Maximum number of activities to read, every activity if None
+      :type limit: int
+      :param after: Last activity of the previous page, continues after it in order_by order
+      :type after: dict
+      :return: tuple of the query and its variables
+      :rtype: tuple
+      """
+
+      logger = logging.getLogger(__name__)
+
+      fields = list(fields)
+      unknown = set(fields) - set(cls.ACTIVITY_FIELDS)
+      if unknown:
+        logger.error("Invalid activity fields %s, expected fields of %s", sorted(unknown), cls.ACTIVITY_FIELDS)
+        raise ValueError("Invalid activity fields: %s" % sorted(unknown))
+      if order_by is not None and order_by not in cls.ACTIVITY_PAGE_ORDERS:
+        logger.error("Invalid activity order '%s', expected one of %s", order_by, list(cls.ACTIVITY_PAGE_ORDERS))
+        raise ValueError("Invalid activity order: %s" % order_by)
+
+      declarations = ["$plan_id: Int"]
+      conditions = ["plan_id: {_eq: $plan_id}"]
+      arguments = []
+      variables = {"plan_id": plan_id}
+
+      if isinstance(activity_types, str):
+        declarations.append("$type: String")
+        conditions.append("type: {_like: $type}")
+        variables["type"] = activity_types
+      elif activity_types is not None:
+        declarations.append("$types: [String!]")
+        conditions.append("type: {_in: $types}")
+        variables["types"] = list(activity_types)
+
+      if order_by is not None:
+        order_clause, cursor_clause, cursor_fields = cls.ACTIVITY_PAGE_ORDERS[order_by]
+        arguments.append("order_by: " + order_clause)
+
+        # The keyset of the order is selected, the next page continues from it
+        fields.extend(field for variable, data_type, field in cursor_fields if field not in fields)
+        if after is not None:
+          for variable, data_type, field in cursor_fields:
+            declarations.append("$%s: %s" % (variable, data_type))
+            variables[variable] = after[field]
+          conditions.append(cursor_clause)
+
+      if limit is not None:
+        declarations.append("$limit: Int")
+        arguments.append("limit: $limit")
+        variables["limit"] = limit
+
+      query = 'query getActivities(%s) {activity_directive(where: {%s}%s) {%s} }' % (
+        ", ".join(declarations), ", ".join(conditions), "".join(", " + argument for argument in arguments), " ".join(fields))
+      return query, variables
+
+    def iter_activities(self, plan_id: int, activity_types: Union[str, list] = None, page_size: int = DEFAULT_PAGE_SIZE, order_by: str = "id", fields: Iterable[str] = ACTIVITY_FIELDS) -> Iterable[dict]:
+      """
+      Read activities of certain types from AERIE DB a page at a time with keyset pagination, each page continuing
+      after the last activity of the previous one, so only one page is held at once however large the plan is
+
+      :param plan_id: plan_id for the AERIE plan to read activities from
+      :type plan_id: int
+      :param activity_types: List of activity types, a single activity type pattern, or None for every type
+      :type activity_types: str | list
+      :param page_size: Number of activities fetched per request
+      :type page_size: int
+      :param order_by: Order of the activities, "id" or "start_offset" with ties in id order
+      :type order_by: str
+      :param fields: Fields of the activity directives to read, the fields of order_by are always read
+      :type fields: Iterable[str]
+      :return: generator returning the activity directives
+      :rtype: Iterable[dict]
+      """
+
+      assert isinstance(plan_id, (type(None), int))
+
+      logger = logging.getLogger(__name__)
+
+      if page_size < 1:
+        logger.error("Invalid page size %s", page_size)
+        raise ValueError("Invalid page size: %s" % page_size)
+
+      after = None
+      while True:
+        query, variables = self.build_activity_query(plan_id, activity_types, fields, order_by, page_size, after)
+        logger.debug("Reading activities for: plan_id %s, activity_types %s, after %s", plan_id, activity_types, after and after["id"])
+        r = self._post(query, variables)
+        if "errors" in r:
+          logger.error("Reading activities failed: %s", r["errors"])
+          raise ValueError("Reading activities failed: %s" % r["errors"])
+
+        page = r["data"]["activity_directive"]
+        yield from page
+
+        if len(page) < page_size:
+          return
+        after = page[-1]
+
     def read_plan(self, id: int):
       """
       Read plan metadata from AERIE for a plan id
@@ -1105,19 +4645,11 @@ class GqlInterface(object):
       logger = logging.getLogger(__name__)
 
       logger.debug("Reading plans for: id %s", id)
-      response = requests.post(
-        url=self.__connection_string,
-        json={
-          'query': self.READ_PLAN_QUERY,
-          'variables': {
-            'id': id
-          },
-        },
-        verify=False
-      )
-
-      r = response.json()
-      logger.debug("read_plan: %s", json.dumps(r, indent=2))
+      r = self._post(self.READ_PLAN_QUERY, {
+        'id': id
+      })
+      if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("read_plan: %s", json.dumps(r, indent=2))
       return r
 
     @classmethod
@@ -1406,3 +4938,60 @@ class GqlInterface(object):
         "EL_DEC_Y": el_dec_y,
         "RTLT": rtlt
       }
+
+
+def _mux_decoder_file(decoder_type: type, filename: str, use_mmap: bool, cache_dir: str, max_rejected: int, plan_id: int, plan_start: datetime.datetime, plan_end: datetime.datetime, clip: bool, filters: dict, queue, batch_size: int) -> None:
+    """
+    Process pool task of GqlInterface.mux_files_concurrent, decodes and converts one file into batches of activities
+    put on the shared queue, followed by a (filename, error) tuple. An error that can not be pickled is sent as its
+    string.
+
+    :param decoder_type: Decoder class for the file
+    :type decoder_type: type
+    :param filename: Filepath to the file to decode
+    :type filename: str
+    :param use_mmap: Memory-map the file
+    :type use_mmap: bool
+    :param cache_dir: Directory of the DecodeCache of the decoder, None if it has none
+    :type cache_dir: str
+    :param max_rejected: Number of misformatted event lines the decoder skips
+    :type max_rejected: int
+    :param plan_id: plan_id for the AERIE plan to insert into
+    :type plan_id: int
+    :param plan_start: Start time of the plan
+    :type plan_start: datetime.datetime
+    :param plan_end: End time of the plan
+    :type plan_end: datetime.datetime
+    :param clip: Only decode the events within the plan
+    :type clip: bool
+    :param filters: parse() filters of the decoders
+    :type filters: dict
+    :param queue: Bounded queue shared with the consuming process
+    :type queue: multiprocessing.Queue
+    :param batch_size: Number of activities per batch put on the queue
+    :type batch_size: int
+    :return: None
+    :rtype: None
+    """
+
+    error = None
+
+    try:
+        decoder = decoder_type(filename, use_mmap, cache_dir=cache_dir, max_rejected=max_rejected)
+        batch = []
+
+        for activity in GqlInterface.mux_decoder(decoder, plan_id, plan_start, plan_end, clip, filters):
+            batch.append(activity)
+            if len(batch) >= batch_size:
+                queue.put(batch)
+                batch = []
+
+        if batch:
+            queue.put(batch)
+    except Exception as e:
+        error = e
+
+    try:
+        queue.put((filename, error))
+    except Exception:
+        queue.put((filename, "%s: %s" % (type(error).__name__, error)))
@@ -7,4 +7,7 @@ setup(
         'requests',
         'importlib-metadata; python_version == "3.8"',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
 )
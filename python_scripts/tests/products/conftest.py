@@ -1,6 +1,9 @@
 """
 conftest.py
 """
+import re
+import gzip
+import json as _json
 import pytest
 
 @pytest.fixture
@@ -229,3 +232,110 @@ CCSD3RE00000$$MARK$$NJPL3IF0M00200000001
 \n 20 042 0000 0200 0400 0600 DSS-03 TEST  TKG PASS         0042 XXXX    XXX      \
 \n"""
     return content
+
+
+def offset_seconds(start_offset):
+    hours, minutes, seconds = start_offset.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class FakeResponse(object):
+    """
+    Stand-in for requests.Response carrying a Hasura JSON body
+    """
+
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError("%s Error" % self.status_code, response=self)
+
+    @property
+    def content(self):
+        return _json.dumps(self.body).encode()
+
+
+class FakeHasura(object):
+    """
+    Stand-in for the Hasura GraphQL endpoint answering the GqlInterface queries from a list of activity directives
+    """
+
+    def __init__(self):
+        self.directives = []
+        self.requests = []
+        self.errors = None
+        self.plans = {}
+
+    def post(self, url=None, json=None, data=None, headers=None, **kwargs):
+        if data is not None:
+            if (headers or {}).get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            json = _json.loads(data)
+        self.requests.append(json)
+        query, variables = json["query"], json["variables"]
+        if self.errors:
+            return FakeResponse({"errors": self.errors})
+
+        # Like Hasura, reject variables the query does not declare and declared variables that are missing
+        if set(re.findall(r"\$(\w+):", query)) != set(variables):
+            return FakeResponse({"errors": [{"message": "unexpected variables %s" % sorted(variables)}]})
+
+        if query.startswith("query getActivities"):
+            if "start_offset: asc" in query:
+                key = lambda directive: (offset_seconds(directive["start_offset"]), directive["id"])
+            else:
+                key = lambda directive: directive["id"]
+
+            page = sorted((directive for directive in self.directives
+                           if ("types" not in variables or directive["type"] in variables["types"])
+                           and ("type" not in variables or directive["type"] == variables["type"])), key=key)
+            if "after_id" in variables:
+                after = key({"id": variables["after_id"], "start_offset": variables.get("after_offset")})
+                page = [directive for directive in page if key(directive) > after]
+            page = page[:variables.get("limit")]
+
+            # Only the selected fields are returned
+            fields = re.search(r"\{([\w ]+)\} \}$", query).group(1).split()
+            return FakeResponse({"data": {"activity_directive": [{field: directive[field] for field in fields if field in directive} for directive in page]}})
+        elif query.startswith("query getActivity"):
+            return FakeResponse({"data": {"activity_directive": [directive for directive in self.directives
+                                                                 if directive["type"] == variables["type"]]}})
+        elif query.startswith("query getPlan"):
+            return FakeResponse({"data": {"plan": [self.plans[variables["id"]]] if variables["id"] in self.plans else []}})
+        elif query.startswith("mutation UpdateActivities"):
+            affected_rows = 0
+            for update in variables["updates"]:
+                for directive in self.directives:
+                    if directive["id"] == update["where"]["id"]["_eq"] and directive["plan_id"] == update["where"]["plan_id"]["_eq"]:
+                        directive.update(update["_set"])
+                        affected_rows += 1
+            return FakeResponse({"data": {"update_activity_directive_many": [{"affected_rows": affected_rows}]}})
+        elif query.startswith("mutation DeleteActivities"):
+            kept = [directive for directive in self.directives
+                    if not (directive["plan_id"] == variables["plan_id"] and directive["id"] in variables["ids"])]
+            affected_rows = len(self.directives) - len(kept)
+            self.directives[:] = kept
+            return FakeResponse({"data": {"delete_activity_directive": {"affected_rows": affected_rows}}})
+        elif query.startswith("mutation InsertActivities"):
+            first_id = max((directive["id"] for directive in self.directives), default=0) + 1
+            for i, activity in enumerate(variables["activities"]):
+                self.directives.append(dict(activity, id=first_id + i))
+            return FakeResponse({"data": {"insert_activity_directive": {"returning": [{"id": first_id + i, "name": activity["name"]} for i, activity in enumerate(variables["activities"])]}}})
+
+        return FakeResponse({"errors": [{"message": "unknown query"}]})
+
+
+@pytest.fixture
+def hasura(monkeypatch):
+    import requests
+
+    server = FakeHasura()
+    monkeypatch.setattr(requests.Session, "post", lambda session, *args, **kwargs: server.post(*args, **kwargs))
+    return server
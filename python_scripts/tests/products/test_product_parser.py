@@ -1,9 +1,18 @@
 import io
+import gzip
+import bz2
+import lzma
+import datetime
+import re
+import json
+import pickle
 import sys
 import os
+import pytest
+import requests
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir)))
-from libaerie.products.product_parser import DsnViewPeriodPredLegacyDecoder, DsnStationAllocationFileDecoder, DsnViewPeriodPredLegacyEncoder,DsnStationAllocationFileEncoder, GqlInterface
+from libaerie.products.product_parser import AdaptiveBatchSizer, DecodeCache, ExternalSorter, DsnViewPeriodPredLegacyDecoder, DsnStationAllocationFileDecoder, DsnViewPeriodPredLegacyEncoder,DsnStationAllocationFileEncoder, GqlInterface, JsonSerializer, OrjsonSerializer, PlanInfoCache, VpEvent, SafAllocation
 
 
 def test_saf_decoder_encoder(saf_content):
@@ -42,3 +51,1036 @@ def test_vp_decoder_encoder(vp_content):
         assert(vp_out.getvalue() == vp_content)
     finally:
         close()
+
+
+def test_fixed_width_parse_line_matches_regex(vp_content, saf_content):
+
+    for decoder, content in ((DsnViewPeriodPredLegacyDecoder, vp_content), (DsnStationAllocationFileDecoder, saf_content)):
+        for line in content.splitlines(keepends=True)[11:]:
+            expected = re.search(decoder.EVENT_RECORD_REGEX, line).groupdict()
+            assert(decoder.parse_line(line) == expected)
+
+
+def test_fixed_width_parse_line_short_line(vp_content):
+
+    line = vp_content.splitlines()[11]
+
+    # Lines shorter than the record width go through the regex fallback and are rejected there
+    with pytest.raises(ValueError):
+        DsnViewPeriodPredLegacyDecoder.parse_line(line[:40])
+
+
+def test_vp_event_time_matches_strptime(vp_content):
+
+    vp_file = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+
+    for time_str in ("20 001/00:00:00", "99 365/23:59:59", "68 366/12:30:05", "69 001/00:00:01"):
+        expected = datetime.datetime.strptime(time_str, vp_file.EVENT_TIME_FORMAT).replace(tzinfo=datetime.timezone.utc)
+        assert(vp_file.decode_event_time(time_str) == expected)
+
+    # Malformed timestamps still raise from strptime
+    for time_str in ("20 000/00:00:00", "20 001/24:00:00", "20 001 00:00:00"):
+        with pytest.raises(ValueError):
+            vp_file.decode_event_time(time_str)
+
+
+def test_saf_end_of_track_rollover(saf_content):
+
+    line = " 20 366 2300 2330 0030 0100 DSS-01 TEST  TKG PASS         0001 XXXX    XXX      \n"
+    saf_file = DsnStationAllocationFileDecoder(io.StringIO(saf_content.split("\n 20 001")[0] + "\n" + line))
+
+    record = next(saf_file.parse())
+
+    assert(record["SOA"] == datetime.datetime(2020, 12, 31, 23, 0, tzinfo=datetime.timezone.utc))
+    assert(record["BOT"] == datetime.datetime(2020, 12, 31, 23, 30, tzinfo=datetime.timezone.utc))
+    assert(record["EOT"] == datetime.datetime(2021, 1, 1, 0, 30, tzinfo=datetime.timezone.utc))
+    assert(record["EOA"] == datetime.datetime(2021, 1, 1, 1, 0, tzinfo=datetime.timezone.utc))
+
+
+def test_vp_parse_columns_matches_parse(vp_content):
+
+    np = pytest.importorskip("numpy")
+
+    records = list(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse())
+    columns = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse_columns()
+
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    assert(columns["TIME"].dtype == np.int64 and columns["AZIMUTH"].dtype == np.float32)
+    assert(list(columns["TIME"]) == [(r["TIME"] - epoch) // datetime.timedelta(microseconds=1) for r in records])
+    assert(list(columns["EVENT_CATEGORIES"][columns["EVENT"]]) == [r["EVENT"] for r in records])
+    assert(list(columns["STATION_IDENTIFIER"]) == [r["STATION_IDENTIFIER"] for r in records])
+    assert(list(columns["RTLT"]) == [r["RTLT"] // datetime.timedelta(microseconds=1) for r in records])
+
+
+def test_vp_parse_columns_chunks(vp_content):
+
+    pytest.importorskip("numpy")
+
+    vp_file = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+    whole = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse_columns()
+
+    chunks = []
+    while True:
+        chunk = vp_file.parse_columns(chunk_size=50)
+        if len(chunk["TIME"]) == 0:
+            break
+        chunks.append(chunk)
+
+    assert([len(c["TIME"]) for c in chunks] == [50, 50, 50, 6])
+    assert([e for c in chunks for e in c["EVENT_CATEGORIES"][c["EVENT"]]] == list(whole["EVENT_CATEGORIES"][whole["EVENT"]]))
+
+
+def test_mmap_decoders_match_text_decoders(tmp_path, vp_content, saf_content):
+
+    for decoder, content in ((DsnViewPeriodPredLegacyDecoder, vp_content), (DsnStationAllocationFileDecoder, saf_content)):
+        path = tmp_path / "product"
+        path.write_text(content)
+
+        text_file = decoder(str(path))
+        mapped_file = decoder(str(path), use_mmap=True)
+
+        assert(list(mapped_file.parse()) == list(text_file.parse()))
+        assert(mapped_file.header_dict == text_file.header_dict)
+
+
+def test_binary_file_object_decoder(vp_content):
+
+    vp_file = DsnViewPeriodPredLegacyDecoder(io.BytesIO(vp_content.encode("ascii")))
+
+    assert(list(vp_file.parse()) == list(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse()))
+
+
+def test_vp_parse_parallel_matches_parse(tmp_path, vp_content):
+
+    path = tmp_path / "TEST.VP"
+    path.write_text(vp_content)
+
+    vp_file = DsnViewPeriodPredLegacyDecoder(str(path))
+    ranges = vp_file.body_ranges(1000)
+
+    # Ranges cover the event lines back to back and every cut lands on a line boundary
+    assert(all(a[1] == b[0] for a, b in zip(ranges, ranges[1:])))
+    assert(all(vp_content.encode()[end - 1:end] == b"\n" for start, end in ranges))
+
+    records = list(vp_file.parse_parallel(processes=2, chunk_bytes=1000))
+
+    assert(records == list(DsnViewPeriodPredLegacyDecoder(str(path)).parse()))
+    assert(vp_file.header_dict["MISSION_NAME"] == "TEST")
+
+    # The stage clock stops when the consumer closes the generator early
+    vp_file = DsnViewPeriodPredLegacyDecoder(str(path))
+    parsed = vp_file.parse_parallel(processes=1, chunk_bytes=1000)
+    next(parsed)
+    parsed.close()
+    elapsed = vp_file.stats.elapsed_seconds
+    assert(vp_file.stats.elapsed_seconds == elapsed)
+
+    # Ranges of less than a byte would never advance through the file
+    for chunk_bytes in (0, -1):
+        with pytest.raises(ValueError):
+            vp_file.body_ranges(chunk_bytes)
+        with pytest.raises(ValueError):
+            list(vp_file.parse_parallel(processes=1, chunk_bytes=chunk_bytes))
+
+
+def test_mux_files_concurrent_matches_mux_files(tmp_path, monkeypatch, vp_content, saf_content):
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 2, 12, tzinfo=datetime.timezone.utc))
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_window)
+
+    (tmp_path / "TEST.VP").write_text(vp_content)
+    (tmp_path / "TEST.SAF").write_text(saf_content)
+
+    def decoders():
+        return [DsnViewPeriodPredLegacyDecoder(str(tmp_path / "TEST.VP")),
+                DsnStationAllocationFileDecoder(str(tmp_path / "TEST.SAF")),
+                DsnStationAllocationFileDecoder(io.StringIO(saf_content))]
+
+    gql = GqlInterface()
+    expected = list(gql.mux_files(decoders(), 1))
+    activities = list(gql.mux_files_concurrent(decoders(), 1, processes=2, batch_size=7))
+
+    key = lambda activity: json.dumps(activity, sort_keys=True)
+    assert(sorted(activities, key=key) == sorted(expected, key=key))
+
+
+def _killed_mux_worker(*args):
+    # Exits like an OOM-killed worker, without ending its stream
+    os._exit(1)
+
+
+class _UnpicklableDecoder(object):
+
+    def __init__(self, *args, **kwargs):
+        raise ValueError("Corrupt product", lambda: None)
+
+
+def test_mux_files_concurrent_failed_workers(tmp_path, monkeypatch, vp_content):
+    import queue
+    import concurrent.futures.process
+    from libaerie.products import product_parser
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 2, 12, tzinfo=datetime.timezone.utc))
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_window)
+    monkeypatch.setattr(GqlInterface, "MUX_POLL_INTERVAL", 0.1)
+    (tmp_path / "TEST.VP").write_text(vp_content)
+
+    # The worker never sends its (filename, error) tuple, the broken pool is raised instead of waiting forever
+    with monkeypatch.context() as m:
+        m.setattr(product_parser, "_mux_decoder_file", _killed_mux_worker)
+        with pytest.raises(concurrent.futures.process.BrokenProcessPool):
+            list(GqlInterface().mux_files_concurrent([DsnViewPeriodPredLegacyDecoder(str(tmp_path / "TEST.VP"))], 1, processes=1))
+
+    # An error that can not be pickled is sent as its string
+    class PicklingQueue(queue.Queue):
+        def put(self, item, *args, **kwargs):
+            super().put(pickle.loads(pickle.dumps(item)), *args, **kwargs)
+
+    results = PicklingQueue()
+    product_parser._mux_decoder_file(_UnpicklableDecoder, "TEST.VP", False, None, 0, 1, *plan_window, False, None, results, 10)
+    filename, error = results.get_nowait()
+    assert(filename == "TEST.VP" and isinstance(error, str) and "Corrupt product" in error)
+
+
+def test_decoded_records_behave_like_dicts(vp_content, saf_content):
+
+    vp_event = next(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse())
+    saf_allocation = next(DsnStationAllocationFileDecoder(io.StringIO(saf_content)).parse())
+
+    assert(isinstance(vp_event, VpEvent) and isinstance(saf_allocation, SafAllocation))
+    assert(not hasattr(vp_event, "__dict__"))
+    assert(vp_event["EVENT"] == vp_event.EVENT == "RISE")
+    assert(saf_allocation["ANTENNA_ID"] == "DSS-01" and saf_allocation["PASS"] == 1)
+
+    # DURATION is only present once set, like the key mux_files adds to the former dict records
+    assert("DURATION" not in vp_event and len(vp_event) == 10)
+    clone = vp_event.copy()
+    clone["DURATION"] = 5
+    assert(clone["DURATION"] == 5 and "DURATION" not in vp_event)
+    assert(dict(clone) == dict(vp_event, DURATION=5))
+
+    with pytest.raises(KeyError):
+        vp_event["NOT_A_FIELD"] = 1
+
+    assert(pickle.loads(pickle.dumps(clone)) == clone)
+
+
+def test_decoder_stats(vp_content, saf_content):
+
+    vp_lines = [line for line in vp_content.splitlines() if line[:2] == "20"]
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content), instrument=True)
+    events = decoder.parse()
+
+    # Counters can be read while the file is still being parsed
+    next(events)
+    assert(decoder.stats.records <= 1)
+
+    assert(len(list(events)) + 1 == len(vp_lines))
+    stats = decoder.stats.as_dict()
+    assert(stats["lines_read"] == stats["records"] == len(vp_lines) and stats["lines_rejected"] == 0)
+    assert(stats["bytes_read"] == sum(len(line) + 1 for line in vp_lines))
+    assert(stats["time_seconds"] > 0 and stats["records_per_second"] > 0)
+
+    # Uninstrumented decoders still count, but do not time the stages
+    decoder = DsnStationAllocationFileDecoder(io.StringIO(saf_content))
+    records = list(decoder.parse())
+    assert(decoder.stats.records == decoder.stats.lines_read == len(records))
+    assert(decoder.stats.parse_seconds == decoder.stats.time_seconds == 0)
+
+
+def test_decoder_stats_rejected_line(vp_content):
+
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content + "20 001/10:44:49 TRX OFF\n"))
+
+    with pytest.raises(ValueError):
+        list(decoder.parse())
+    assert(decoder.stats.lines_rejected == 1)
+    assert(decoder.stats.records == decoder.stats.lines_read - 1)
+
+
+def test_decoder_skips_rejected_lines(tmp_path, vp_content, saf_content):
+
+    bad_line = "20 001/10:44:49 TRX OFF\n"
+    header, body = vp_content[:vp_content.index("\n20 ") + 1], vp_content[vp_content.index("\n20 ") + 1:]
+    damaged = header + bad_line + body + bad_line
+    expected = list(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse())
+
+    # Up to max_rejected misformatted lines are counted and skipped, one more fails the decoding
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(damaged), max_rejected=2)
+    assert(list(decoder.parse()) == expected)
+    assert(decoder.stats.lines_rejected == 2 and decoder.stats.records == decoder.stats.lines_read - 2 == len(expected))
+    with pytest.raises(ValueError):
+        list(DsnViewPeriodPredLegacyDecoder(io.StringIO(damaged), max_rejected=1).parse())
+
+    path = tmp_path / "TEST.VP"
+    path.write_text(damaged)
+    decoder = DsnViewPeriodPredLegacyDecoder(str(path), max_rejected=2)
+    assert(list(decoder.parse_parallel(processes=2, chunk_bytes=1000)) == expected)
+    assert(decoder.stats.lines_rejected == 2)
+    with pytest.raises(ValueError):
+        list(DsnViewPeriodPredLegacyDecoder(str(path), max_rejected=1).parse_parallel(processes=2, chunk_bytes=1000))
+
+    # Lines skipped before start are rejected the same way when the file can not be searched
+    start = expected[len(expected) // 2]["TIME"]
+    truncated = header + "20 0\n" + bad_line + body
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(truncated), max_rejected=2)
+    assert(list(decoder.parse(start=start)) == [r for r in expected if r["TIME"] >= start])
+    assert(decoder.stats.lines_rejected == 2)
+    with pytest.raises(ValueError):
+        list(DsnViewPeriodPredLegacyDecoder(io.StringIO(truncated), max_rejected=1).parse(start=start))
+
+    saf_header, saf_body = saf_content[:saf_content.index("\n ") + 1], saf_content[saf_content.index("\n ") + 1:]
+    decoder = DsnStationAllocationFileDecoder(io.StringIO(saf_header + " 20 039 0000\n" + saf_body), max_rejected=1)
+    assert(list(decoder.parse()) == list(DsnStationAllocationFileDecoder(io.StringIO(saf_content)).parse()))
+    assert(decoder.stats.lines_rejected == 1)
+
+
+@pytest.mark.parametrize("compress", [gzip.compress, bz2.compress, lzma.compress])
+def test_compressed_decoders_match_text_decoders(tmp_path, vp_content, saf_content, compress):
+
+    for decoder_type, content in ((DsnViewPeriodPredLegacyDecoder, vp_content),
+                                  (DsnStationAllocationFileDecoder, saf_content)):
+        path = tmp_path / "product"
+        path.write_bytes(compress(content.encode()))
+        text_decoder = decoder_type(io.StringIO(content))
+        expected = list(text_decoder.parse())
+
+        for use_mmap in (False, True):
+            decoder = decoder_type(str(path), use_mmap=use_mmap)
+            assert(decoder.compression is not None and decoder.filename == str(path))
+            assert(list(decoder.parse()) == expected)
+            assert(decoder.header_dict == text_decoder.header_dict)
+
+        decoder = decoder_type(io.BytesIO(compress(content.encode())))
+        assert(list(decoder.parse()) == expected)
+
+
+def test_compressed_vp_parse_parallel_rejected(tmp_path, vp_content):
+
+    path = tmp_path / "product.VP.gz"
+    path.write_bytes(gzip.compress(vp_content.encode()))
+
+    with pytest.raises(ValueError):
+        list(DsnViewPeriodPredLegacyDecoder(str(path)).parse_parallel(processes=1))
+
+
+def test_decode_cache_matches_parse(tmp_path, monkeypatch, vp_content, saf_content):
+
+    cache_dir = str(tmp_path / "cache")
+
+    for decoder_type, content in ((DsnViewPeriodPredLegacyDecoder, vp_content),
+                                  (DsnStationAllocationFileDecoder, saf_content)):
+        path = tmp_path / decoder_type.__name__
+        path.write_text(content)
+        expected_decoder = decoder_type(io.StringIO(content))
+        expected = list(expected_decoder.parse())
+
+        # The first decode fills the cache, the next ones read it instead of the file
+        assert(list(decoder_type(str(path), cache_dir=cache_dir).parse()) == expected)
+        sidecars = os.listdir(cache_dir)
+
+        decoder = decoder_type(str(path), cache_dir=cache_dir)
+        monkeypatch.setattr(decoder, "read_header", None)
+        assert(list(decoder.parse()) == expected)
+        assert(decoder.header_dict == expected_decoder.header_dict)
+        assert(decoder.stats.records == len(expected) and decoder.stats.lines_read == 0)
+
+        # Abandoning the cached records releases the sidecar map
+        records = decoder_type(str(path), cache_dir=cache_dir).parse()
+        next(records)
+        records.close()
+
+        # Changed contents or decoder versions miss the cache
+        path.write_text(content.replace("001/00:00:00", "001/00:00:01").replace("0000 0200", "0001 0200"))
+        assert(list(decoder_type(str(path), cache_dir=cache_dir).parse()) != expected)
+        monkeypatch.setattr(decoder_type, "DECODER_VERSION", decoder_type.DECODER_VERSION + 1)
+        assert(DecodeCache.fingerprint(decoder_type, str(path)) not in " ".join(os.listdir(cache_dir)))
+        assert(len(os.listdir(cache_dir)) == len(sidecars) + 1)
+
+
+def test_vp_parse_time_window(tmp_path, vp_content):
+
+    path = tmp_path / "TEST.VP"
+    path.write_text(vp_content)
+    events = list(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse())
+    times = sorted(set(event["TIME"] for event in events))
+
+    windows = [(times[5], times[-5]), (times[0], times[0]), (None, times[3]), (times[-3], None),
+               (times[0] - datetime.timedelta(days=1), times[-1] + datetime.timedelta(days=1)),
+               (times[-1] + datetime.timedelta(seconds=1), None)]
+
+    for start, end in windows:
+        expected = [event for event in events if (start is None or event["TIME"] >= start) and (end is None or event["TIME"] <= end)]
+
+        for decoder in (DsnViewPeriodPredLegacyDecoder(str(path)),
+                        DsnViewPeriodPredLegacyDecoder(str(path), use_mmap=True),
+                        DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))):
+            assert(list(decoder.parse(start, end)) == expected)
+
+        # Searchable files only decode the events of the window
+        decoder = DsnViewPeriodPredLegacyDecoder(str(path))
+        list(decoder.parse(start, end))
+        assert(decoder.stats.lines_read <= len(expected) + 1)
+
+        # Cached files are searched on their TIME column
+        cache_dir = str(tmp_path / "cache")
+        list(DsnViewPeriodPredLegacyDecoder(str(path), cache_dir=cache_dir).parse())
+        decoder = DsnViewPeriodPredLegacyDecoder(str(path), cache_dir=cache_dir)
+        assert(list(decoder.parse(start, end)) == expected)
+        assert(decoder.stats.records == len(expected))
+
+
+def test_mux_files_clip(monkeypatch, vp_content, saf_content):
+
+    plan_window = (datetime.datetime(2020, 1, 1, 4, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 1, 1, 11, 30, tzinfo=datetime.timezone.utc))
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_window)
+
+    gql = GqlInterface()
+    activities = list(gql.mux_files([DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))], 1, clip=True))
+
+    # View periods open at the plan bounds are cut at the plan bounds
+    assert(activities and all(not activity["start_offset"].startswith("-") for activity in activities))
+    unclipped = list(gql.mux_files([DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))], 1))
+    assert(len(activities) < len(unclipped))
+
+
+def test_parse_filters(tmp_path, monkeypatch, vp_content, saf_content):
+
+    vp_events = list(DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)).parse())
+    saf_allocations = list(DsnStationAllocationFileDecoder(io.StringIO(saf_content)).parse())
+
+    (tmp_path / "TEST.VP").write_text(vp_content)
+    (tmp_path / "TEST.SAF").write_text(saf_content)
+    cache_dir = str(tmp_path / "cache")
+    list(DsnViewPeriodPredLegacyDecoder(str(tmp_path / "TEST.VP"), cache_dir=cache_dir).parse())
+    list(DsnStationAllocationFileDecoder(str(tmp_path / "TEST.SAF"), cache_dir=cache_dir).parse())
+
+    vp_cases = [({"stations": [2, 4]}, lambda e: e["STATION_IDENTIFIER"] in (2, 4)),
+                ({"events": ["RISE", "SET"]}, lambda e: e["EVENT"] in ("RISE", "SET")),
+                ({"passes": (1, 1), "spacecraft": 1}, lambda e: e["PASS"] == 1),
+                ({"spacecraft": 2}, lambda e: False)]
+    for filters, accept in vp_cases:
+        expected = [event for event in vp_events if accept(event)]
+        decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+        assert(list(decoder.parse(**filters)) == expected)
+        assert(decoder.stats.lines_filtered == len(vp_events) - len(expected))
+        assert(list(DsnViewPeriodPredLegacyDecoder(str(tmp_path / "TEST.VP"), cache_dir=cache_dir).parse(**filters)) == expected)
+
+    saf_cases = [({"project": "TEST"}, lambda a: a["PROJECT_ID"] == "TEST"),
+                 ({"antennas": ["DSS-01"]}, lambda a: a["ANTENNA_ID"] == "DSS-01"),
+                 ({"passes": (2, 3)}, lambda a: 2 <= a["PASS"] <= 3)]
+    for filters, accept in saf_cases:
+        expected = [allocation for allocation in saf_allocations if accept(allocation)]
+        assert(list(DsnStationAllocationFileDecoder(io.StringIO(saf_content)).parse(**filters)) == expected)
+        assert(list(DsnStationAllocationFileDecoder(str(tmp_path / "TEST.SAF"), cache_dir=cache_dir).parse(**filters)) == expected)
+
+    # Filtered lines never reach the timestamp conversion
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+    decoded = []
+    monkeypatch.setattr(decoder, "decode_event_time", lambda time_str: decoded.append(time_str) or vp_events[0]["TIME"])
+    assert(len(list(decoder.parse(stations=[2]))) == len(decoded) < len(vp_events))
+
+    # mux_decoder hands each decoder the filters it accepts and rejects unknown ones
+    plan_window = (vp_events[0]["TIME"], vp_events[-1]["TIME"])
+    activities = list(GqlInterface.mux_decoder(DsnStationAllocationFileDecoder(io.StringIO(saf_content)), 1, *plan_window, filters={"project": "NONE", "spacecraft": 1}))
+    assert(activities == [])
+    with pytest.raises(ValueError):
+        list(GqlInterface.mux_decoder(DsnStationAllocationFileDecoder(io.StringIO(saf_content)), 1, *plan_window, filters={"bogus": 1}))
+
+
+def test_encoder_batched_writes(monkeypatch, vp_content, saf_content):
+
+    for decoder_type, encoder_type, content in ((DsnViewPeriodPredLegacyDecoder, DsnViewPeriodPredLegacyEncoder, vp_content),
+                                                (DsnStationAllocationFileDecoder, DsnStationAllocationFileEncoder, saf_content)):
+        # Batches that do not divide the number of events still write every line once
+        monkeypatch.setattr(encoder_type, "WRITE_BATCH_SIZE", 7)
+
+        decoder = decoder_type(io.StringIO(content))
+        out = io.StringIO()
+        out.close = lambda: None
+
+        encoder_type(out, decoder.read_header()).cast(dict(record) for record in decoder.parse())
+        assert(out.getvalue() == content)
+
+
+@pytest.mark.parametrize("validation", ["full", "sampled", "off"])
+def test_encoder_validation_levels(validation, vp_content, saf_content):
+
+    for decoder_type, encoder_type, content in ((DsnViewPeriodPredLegacyDecoder, DsnViewPeriodPredLegacyEncoder, vp_content),
+                                                (DsnStationAllocationFileDecoder, DsnStationAllocationFileEncoder, saf_content)):
+        decoder = decoder_type(io.StringIO(content))
+        header = decoder.read_header()
+        events = [dict(record) for record in decoder.parse()]
+        originals = [dict(event) for event in events]
+
+        # Encoding leaves the events untouched, so they can be encoded again
+        for _ in range(2):
+            out = io.StringIO()
+            out.close = lambda: None
+            encoder_type(out, header, validation=validation).cast(events)
+            assert(out.getvalue() == content)
+            assert(events == originals)
+
+
+def test_encoder_validation_malformed_event(vp_content):
+
+    decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+    header = decoder.read_header()
+    events = [dict(record) for record in decoder.parse()]
+    events[0]["ELEVATION"] = 91.0
+
+    assert(not DsnViewPeriodPredLegacyEncoder.check_event(events[0]))
+    with pytest.raises(ValueError):
+        DsnViewPeriodPredLegacyEncoder(io.StringIO(), header).cast(events)
+    with pytest.raises(ValueError):
+        DsnViewPeriodPredLegacyEncoder(io.StringIO(), header, validation="sampled").cast(events)
+    with pytest.raises(ValueError):
+        DsnViewPeriodPredLegacyEncoder(io.StringIO(), header, validation="none")
+
+
+def test_external_sorter_spills_runs(tmp_path):
+
+    records = [((i * 7919) % 101, i) for i in range(1000)]
+
+    with ExternalSorter(lambda record: record[0], max_records=64, directory=str(tmp_path)) as sorter:
+        sorter.extend(records)
+        assert(len(sorter.runs) == 1000 // 64)
+
+        # Stable like sorted(), equal keys keep their insertion order
+        assert(list(sorter) == sorted(records, key=lambda record: record[0]))
+        assert(sorter.runs == [])
+
+    with pytest.raises(ValueError):
+        ExternalSorter(lambda record: record, max_records=0)
+
+
+def test_demux_files_streaming(monkeypatch, hasura, vp_content, saf_content):
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 2, 12, tzinfo=datetime.timezone.utc))
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_window)
+
+    gql = GqlInterface()
+    vp_decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+    saf_decoder = DsnStationAllocationFileDecoder(io.StringIO(saf_content))
+    activities = list(gql.mux_files([vp_decoder, saf_decoder], 1))
+
+    # Directive ids run against time order, so the export has to sort
+    for i, activity in enumerate(reversed(activities)):
+        hasura.directives.append(dict(activity, id=i + 1))
+
+    def encode(saf_events, vp_events):
+        saf_out, vp_out = io.StringIO(), io.StringIO()
+        saf_out.close = vp_out.close = lambda: None
+        DsnStationAllocationFileEncoder(saf_out, saf_decoder.header_dict).cast(saf_events)
+        DsnViewPeriodPredLegacyEncoder(vp_out, vp_decoder.header_dict).cast(vp_events)
+        return saf_out.getvalue(), vp_out.getvalue()
+
+    def export(**kwargs):
+        saf_out, vp_out = io.StringIO(), io.StringIO()
+        saf_out.close = vp_out.close = lambda: None
+        gql.demux_files(DsnStationAllocationFileEncoder(saf_out, saf_decoder.header_dict),
+                        DsnViewPeriodPredLegacyEncoder(vp_out, vp_decoder.header_dict), 1, **kwargs)
+        return saf_out.getvalue(), vp_out.getvalue()
+
+    # Reference export built without demux_files, every directive converted and put in time order by sorted(),
+    # directives of the same time keeping their id order
+    directives = sorted(hasura.directives, key=lambda directive: directive["id"])
+    expected = encode(sorted((GqlInterface.convert_gql_to_dsn_stationallocation(directive) for directive in directives
+                              if directive["type"] == "DSN_Track"), key=lambda event: event["SOA"]),
+                      sorted((GqlInterface.convert_gql_to_dsn_viewperiod_event(plan_window[0], directive) for directive in directives
+                              if directive["type"] == "DSN_View_Period_Event"), key=lambda event: event["TIME"]))
+
+    # The event lines are those of the decoded files
+    for content, exported in zip((saf_content, vp_content), expected):
+        assert(sorted(exported.splitlines()[11:]) == sorted(content.splitlines()[11:]))
+
+    # Both files are exported from one round trip carrying only the fields the encoders read
+    assert(export(page_size=len(activities) + 1, sort_buffer=len(activities)) == expected)
+    assert(len(hasura.requests) == 1)
+    assert(hasura.requests[0]["variables"]["types"] == ["DSN_Track", "DSN_View_Period_Event"])
+    assert("metadata" not in hasura.requests[0]["query"])
+
+    del hasura.requests[:]
+    assert(export(page_size=5, sort_buffer=3) == expected)
+    assert(len(hasura.requests) > 2)
+
+
+def test_demux_files_concurrent_matches_demux_files(monkeypatch, hasura, vp_content, saf_content):
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 2, 12, tzinfo=datetime.timezone.utc))
+    plan_reads = []
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_reads.append(plan_id) or plan_window)
+
+    gql = GqlInterface()
+    vp_decoder = DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content))
+    saf_decoder = DsnStationAllocationFileDecoder(io.StringIO(saf_content))
+    for i, activity in enumerate(gql.mux_files([vp_decoder, saf_decoder], 1)):
+        hasura.directives.append(dict(activity, id=i + 1))
+
+    def export(demux, **kwargs):
+        saf_out, vp_out = io.StringIO(), io.StringIO()
+        saf_out.close = vp_out.close = lambda: None
+        demux(DsnStationAllocationFileEncoder(saf_out, saf_decoder.header_dict),
+              DsnViewPeriodPredLegacyEncoder(vp_out, vp_decoder.header_dict), 1, page_size=4, **kwargs)
+        return saf_out.getvalue(), vp_out.getvalue()
+
+    del plan_reads[:]
+    assert(export(gql.demux_files_concurrent) == export(gql.demux_files))
+    assert(plan_reads == [1, 1])
+
+    # A known plan window is not read again
+    export(gql.demux_files_concurrent, plan_window=plan_window)
+    assert(plan_reads == [1, 1])
+
+    # A failed export is raised once both exports finished
+    hasura.directives.append({"id": len(hasura.directives) + 1, "type": "DSN_Track", "start_offset": "00:00:00", "arguments": {}})
+    with pytest.raises(KeyError):
+        export(gql.demux_files_concurrent)
+
+
+def test_gql_interface_pooled_session_retries():
+
+    import http.server
+    import threading
+
+    import time
+
+    statuses = [503, 502, 200]
+    delays = []
+    received = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            received.append((self.client_address, json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            status = statuses.pop(0) if statuses else 200
+            if delays:
+                time.sleep(delays.pop(0))
+            body = json.dumps({"data": {"plan": []}}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    # The query and mutation pools keep a connection each, so the server handles them on their own threads
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    gql = GqlInterface("http://127.0.0.1:%s/v1/graphql" % server.server_port, timeout=5, retries=2, backoff_factor=0)
+    try:
+
+        # 5xx responses are retried
+        assert(gql.read_plan(1) == {"data": {"plan": []}})
+        assert(len(received) == 3)
+        assert(received[0][1]["variables"] == {"id": 1})
+
+        # Keep-alive, the next request reuses the pooled connection
+        gql.read_plan(2)
+        assert(received[-1][0] == received[-2][0])
+
+        # Every thread has its own session on the shared pool
+        sessions = []
+        worker = threading.Thread(target=lambda: sessions.append(gql.session))
+        worker.start()
+        worker.join()
+        assert(sessions[0] is not gql.session)
+        assert(sessions[0].get_adapter(gql.DEFAULT_CONNECTION_STRING) is gql.session.get_adapter(gql.DEFAULT_CONNECTION_STRING))
+
+        # Retries give up after the retry budget
+        statuses.extend([503] * 3)
+        with pytest.raises(requests.exceptions.RetryError):
+            gql.read_plan(3)
+
+        # Mutations are only retried after a 503, Hasura may have applied them after another server error
+        del received[:]
+        statuses.extend([503, 200])
+        assert(gql._post("mutation DeleteActivities", {}) == {"data": {"plan": []}})
+        assert(len(received) == 2)
+        statuses.append(500)
+        with pytest.raises(requests.exceptions.HTTPError):
+            gql._post("mutation DeleteActivities", {})
+        assert(len(received) == 3)
+        assert(gql.mutation_session is not gql.session)
+
+        # Nor is any request retried after a read timeout
+        gql.timeout = (5, 0.2)
+        delays.append(1.0)
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            gql._post("mutation DeleteActivities", {})
+        assert(len(received) == 4)
+        delays.append(1.0)
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            gql.read_plan(4)
+        assert(len(received) == 5)
+    finally:
+        gql.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_create_activities_concurrent(monkeypatch, hasura):
+
+    import threading
+    import time
+
+    gql = GqlInterface()
+    activities = [{"name": "activity %s" % i, "type": "DSN_Track"} for i in range(103)]
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+    create_activities = GqlInterface.create_activities
+
+    def slow_create_activities(self, batch):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.01)
+        try:
+            return create_activities(self, batch)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    monkeypatch.setattr(GqlInterface, "create_activities", slow_create_activities)
+    assert(gql.create_activities_concurrent(iter(activities), batch_size=10, max_in_flight=3) == 103)
+    assert(sorted(directive["name"] for directive in hasura.directives) == sorted(activity["name"] for activity in activities))
+    assert(peak[0] <= 3)
+
+    # The earliest failed batch is raised, even when a later batch fails first
+    def failing_create_activities(self, batch):
+        index = int(batch[0]["name"].split()[1]) // 10
+        time.sleep(0.05 if index == 1 else 0)
+        if index in (1, 2):
+            raise ValueError("batch %s" % index)
+
+    monkeypatch.setattr(GqlInterface, "create_activities", failing_create_activities)
+    with pytest.raises(ValueError, match="batch 1"):
+        gql.create_activities_concurrent(iter(activities), batch_size=10, max_in_flight=3)
+
+    # No batch is packed after a failure, so no activity is consumed and dropped
+    def failing_first_create_activities(self, batch):
+        sent.extend(batch)
+        if batch[0]["name"] == "activity 0":
+            raise ValueError("batch 0")
+        time.sleep(0.05)
+
+    consumed, sent = [], []
+    monkeypatch.setattr(GqlInterface, "create_activities", failing_first_create_activities)
+    with pytest.raises(ValueError, match="batch 0"):
+        gql.create_activities_concurrent((consumed.append(activity) or activity for activity in activities), batch_size=10, max_in_flight=2)
+    assert(len(consumed) < len(activities))
+    assert(sorted(activity["name"] for activity in consumed) == sorted(activity["name"] for activity in sent))
+
+    # An error decoding the activities is raised once the batches in flight are inserted, off the event loop thread
+    loop_threads = set()
+
+    def failing_decode():
+        loop_threads.add(threading.get_ident())
+        yield from activities[:25]
+        raise ValueError("decoding failed")
+
+    del hasura.directives[:]
+    monkeypatch.setattr(GqlInterface, "create_activities", slow_create_activities)
+    with pytest.raises(ValueError, match="decoding failed"):
+        gql.create_activities_concurrent(failing_decode(), batch_size=10, max_in_flight=3)
+    assert(len(hasura.directives) == 20)
+    assert(threading.get_ident() not in loop_threads)
+
+    # GraphQL errors of an insert are raised
+    hasura.errors = [{"message": "Check constraint violation"}]
+    monkeypatch.setattr(GqlInterface, "create_activities", create_activities)
+    with pytest.raises(ValueError, match="Check constraint"):
+        gql.create_activities(activities[:1])
+
+
+def test_adaptive_batch_sizer():
+
+    activities = [{"name": "activity %04d" % i, "arguments": {"pass_number": "%04d" % i}} for i in range(1000)]
+    activity_bytes = len(JsonSerializer().dumps(activities[0]))
+    sizer = AdaptiveBatchSizer(initial_bytes=10 * activity_bytes, min_bytes=2 * activity_bytes, max_bytes=40 * activity_bytes,
+                               target_latency=1.0, increase_bytes=5 * activity_bytes)
+
+    sizes = []
+    for batch in sizer.batches(activities):
+        sizes.append(len(batch))
+        # Fast batches grow additively up to max_bytes, slow batches halve the target down to min_bytes
+        sizer.record(len(batch), 2.0 if len(sizes) in (10, 11, 12) else 0.001 * len(batch))
+
+    assert(sum(sizes) == len(activities))
+    assert(sizes[:3] == [10, 15, 20])
+    assert(max(sizes) == 40)
+    assert(sizes[10:14] == [20, 10, 5, 10])
+
+    sizer.record(10, 0.1, failed=True)
+    assert(sizer.target_bytes == max(sizer.min_bytes, sizer.target_bytes))
+
+    with pytest.raises(ValueError):
+        AdaptiveBatchSizer(initial_bytes=10, min_bytes=100)
+
+    # Payloads are measured with the serializer of the inserts
+    class PaddedSerializer(JsonSerializer):
+        def dumps(self, obj):
+            return super().dumps(obj) * 2
+
+    sizer = AdaptiveBatchSizer(initial_bytes=10 * activity_bytes, min_bytes=activity_bytes, serializer=PaddedSerializer())
+    assert(len(next(sizer.batches(activities))) == 5)
+
+
+def test_create_activities_adaptive_splits_failed_batches(monkeypatch, hasura):
+
+    from conftest import FakeResponse
+
+    gql = GqlInterface()
+    activities = [{"name": "activity %s" % i, "type": "DSN_Track"} for i in range(50)]
+    post = hasura.post
+
+    def post_refusing_large(url=None, data=None, headers=None, **kwargs):
+        body = json.loads(gzip.decompress(data) if (headers or {}).get("Content-Encoding") == "gzip" else data)
+        if len(body["variables"].get("activities", [])) > 8:
+            return FakeResponse({"error": "payload too large"}, 413)
+        return post(url, data=data, headers=headers, **kwargs)
+
+    # Batches refused with 413 Payload Too Large were not inserted, they are sent again in halves
+    monkeypatch.setattr(hasura, "post", post_refusing_large)
+    sizer = AdaptiveBatchSizer(initial_bytes=10 ** 6, min_bytes=1, max_bytes=10 ** 6)
+    assert(gql.create_activities_adaptive(activities, sizer) == 50)
+    assert(sorted(directive["name"] for directive in hasura.directives) == sorted(activity["name"] for activity in activities))
+    assert(sizer.target_bytes < 10 ** 6)
+
+    # As are batches failing to connect
+    del hasura.directives[:]
+    refused = [2]
+
+    def post_refusing_connections(*args, **kwargs):
+        if refused[0]:
+            refused[0] -= 1
+            raise requests.exceptions.ConnectTimeout("connect timed out")
+        return post(*args, **kwargs)
+
+    monkeypatch.setattr(hasura, "post", post_refusing_connections)
+    assert(gql.create_activities_adaptive(activities, AdaptiveBatchSizer(initial_bytes=10 ** 6)) == 50)
+    assert(len(hasura.directives) == 50)
+
+    # Batches sized by a sizer also insert every activity with several inserts in flight
+    del hasura.directives[:]
+    assert(gql.create_activities_concurrent(activities, max_in_flight=3, sizer=AdaptiveBatchSizer(initial_bytes=1024, min_bytes=512)) == 50)
+    assert(len(hasura.directives) == 50)
+
+
+def test_create_activities_adaptive_committed_then_timed_out(monkeypatch, hasura):
+
+    gql = GqlInterface()
+    activities = [{"name": "activity %s" % i, "type": "DSN_Track"} for i in range(20)]
+    post = hasura.post
+
+    def post_committing_then_timing_out(*args, **kwargs):
+        post(*args, **kwargs)
+        raise requests.exceptions.ReadTimeout("read timed out")
+
+    # The batch was committed before the response timed out, so it is raised rather than sent again
+    monkeypatch.setattr(hasura, "post", post_committing_then_timing_out)
+    sizer = AdaptiveBatchSizer(initial_bytes=10 ** 6, min_bytes=1, max_bytes=10 ** 6)
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        gql.create_activities_adaptive(activities, sizer)
+    assert(sorted(directive["name"] for directive in hasura.directives) == sorted(activity["name"] for activity in activities))
+    assert(sizer.target_bytes < 10 ** 6)
+
+    # GraphQL errors back off the sizer too
+    monkeypatch.setattr(hasura, "post", post)
+    hasura.errors = [{"message": "Check constraint violation"}]
+    target_bytes = sizer.target_bytes
+    with pytest.raises(ValueError, match="Check constraint"):
+        gql.create_activities_adaptive(activities, sizer)
+    assert(len(hasura.requests) == 2)
+    assert(sizer.target_bytes < target_bytes)
+
+
+def test_iter_activities_keyset_pagination(hasura):
+
+    # Pairs of activities share a start offset, so pages split between equal offsets
+    offsets = ["%d:0:0.0" % (hours // 2) for hours in range(23)]
+    for i, start_offset in enumerate(reversed(offsets)):
+        hasura.directives.append({"id": i + 1, "type": "DSN_Track" if i % 5 else "DSN_View_Period_Event", "start_offset": start_offset, "arguments": {}})
+
+    gql = GqlInterface()
+
+    activities = list(gql.iter_activities(1, page_size=4))
+    assert([activity["id"] for activity in activities] == list(range(1, 24)))
+    assert(len(hasura.requests) == 6)
+
+    activities = list(gql.iter_activities(1, page_size=3, order_by="start_offset"))
+    expected = sorted(hasura.directives, key=lambda directive: (int(directive["start_offset"].split(":")[0]), directive["id"]))
+    assert(activities == expected)
+
+    activities = list(gql.iter_activities(1, "DSN_Track", page_size=2, order_by="start_offset"))
+    assert(activities == [directive for directive in expected if directive["type"] == "DSN_Track"])
+
+    # A plan that is a whole number of pages ends with an empty page
+    assert(len(list(gql.iter_activities(1, page_size=23))) == 23)
+
+    with pytest.raises(ValueError):
+        list(gql.iter_activities(1, order_by="name"))
+    with pytest.raises(ValueError):
+        list(gql.iter_activities(1, page_size=0))
+
+
+def test_build_activity_query():
+
+    query, variables = GqlInterface.build_activity_query(1, ["DSN_Track", "DSN_View_Period_Event"], ["arguments"], "start_offset", 10)
+    assert(variables == {"plan_id": 1, "types": ["DSN_Track", "DSN_View_Period_Event"], "limit": 10})
+    assert("type: {_in: $types}" in query)
+    assert(query.endswith("{arguments start_offset id} }"))
+
+    query, variables = GqlInterface.build_activity_query(1, "DSN_%", order_by="id", after={"id": 7, "start_offset": "1:0:0"})
+    assert(variables == {"plan_id": 1, "type": "DSN_%", "after_id": 7})
+    assert("type: {_like: $type}" in query and "$after_id: Int" in query)
+
+    query, variables = GqlInterface.build_activity_query(1)
+    assert(variables == {"plan_id": 1})
+    assert(query.endswith("{%s} }" % " ".join(GqlInterface.ACTIVITY_FIELDS)))
+
+    with pytest.raises(ValueError):
+        GqlInterface.build_activity_query(1, fields=["arguments", "plan { id }"])
+    with pytest.raises(ValueError):
+        GqlInterface.build_activity_query(1, order_by="name")
+
+
+def test_plan_info_cache(hasura):
+
+    import threading
+
+    hasura.plans[1] = {"id": 1, "name": "TEST", "model_id": 1, "start_time": "2020-01-01T00:00:00+00:00", "duration": "24:00:00"}
+    now = [0.0]
+    cache = PlanInfoCache(ttl=60, clock=lambda: now[0])
+    gql, other = GqlInterface(plan_cache=cache), GqlInterface(plan_cache=cache)
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 1, 2, tzinfo=datetime.timezone.utc))
+    assert(gql.get_plan_info_from_id(1) == plan_window)
+    assert(other.get_plan_info_from_id(1) == plan_window)
+    assert(len(hasura.requests) == 1)
+
+    # Expired and invalidated plans are read again
+    now[0] = 61
+    hasura.plans[1]["duration"] = "48:00:00"
+    assert(gql.get_plan_info_from_id(1)[1] == plan_window[1] + datetime.timedelta(days=1))
+    hasura.plans[1]["duration"] = "24:00:00"
+    gql.invalidate_plan_info(1)
+    assert(gql.get_plan_info_from_id(1) == plan_window)
+    assert(len(hasura.requests) == 3)
+
+    # Missing plans are not cached
+    assert(gql.get_plan_info_from_id(2) is None)
+    assert(gql.get_plan_info_from_id(2) is None)
+    assert(len(hasura.requests) == 5)
+
+    # Concurrent misses share one load
+    loads = []
+    release = threading.Event()
+    results = []
+    def load():
+        loads.append(1)
+        release.wait()
+        return "plan"
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key", load))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert(results == ["plan"] * 4 and len(loads) == 1)
+
+
+def test_sync_files(monkeypatch, hasura, vp_content, saf_content):
+
+    plan_window = (datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc), datetime.datetime(2020, 2, 12, tzinfo=datetime.timezone.utc))
+    monkeypatch.setattr(GqlInterface, "get_plan_info_from_id", lambda self, plan_id: plan_window)
+
+    def decoders(saf_content):
+        return [DsnViewPeriodPredLegacyDecoder(io.StringIO(vp_content)), DsnStationAllocationFileDecoder(io.StringIO(saf_content))]
+
+    def state(directives):
+        return sorted(GqlInterface.sync_fingerprint(directive) for directive in directives)
+
+    gql = GqlInterface()
+    counts = gql.sync_files(decoders(saf_content), 1, batch_size=7)
+    assert(counts["inserted"] == len(hasura.directives) and counts["updated"] == counts["deleted"] == 0)
+
+    # Syncing the same files again changes nothing
+    counts = gql.sync_files(decoders(saf_content), 1, batch_size=7)
+    assert(counts["inserted"] == counts["updated"] == counts["deleted"] == 0)
+
+    # Nor does it once Hasura normalized the stored values, integral floats and intervals
+    def normalized(value):
+        if isinstance(value, dict):
+            return {key: normalized(item) for key, item in value.items()}
+        return int(value) if isinstance(value, float) and value.is_integer() else value
+
+    for directive in hasura.directives:
+        offset = GqlInterface.parse_aerie_offset(directive["start_offset"])
+        hours, seconds = divmod(offset.seconds, 3600)
+        directive["start_offset"] = "%s days %02d:%02d:%02d.%06d" % (offset.days, hours, seconds // 60, seconds % 60, offset.microseconds)
+        directive["arguments"] = normalized(directive["arguments"])
+    counts = gql.sync_files(decoders(saf_content), 1, batch_size=7)
+    assert(counts["inserted"] == counts["updated"] == counts["deleted"] == 0)
+
+    # A revision moving one track, dropping one and adding one
+    lines = saf_content.split("\n")
+    tracks = [i for i, line in enumerate(lines) if "DSS-" in line]
+    lines[tracks[0]] = lines[tracks[0]].replace("0000 0200 0400 0600", "0100 0200 0400 0600", 1)
+    lines[tracks[-1]] = lines[tracks[-1]].replace("TKG PASS         0042", "TKG PASS         0043")
+    revised = "\n".join(lines[:tracks[1]] + lines[tracks[1] + 1:])
+
+    requests_before = len(hasura.requests)
+    counts = gql.sync_files(decoders(revised), 1, delete=True, batch_size=7)
+    assert((counts["inserted"], counts["updated"], counts["deleted"]) == (1, 1, 2))
+    assert(len(hasura.requests) - requests_before == 4)
+    assert(state(hasura.directives) == state(gql.mux_files(decoders(revised), 1)))
+
+    with pytest.raises(ValueError):
+        gql.sync_files(decoders(revised), 1, delete=True, filters={"project": "TEST"})
+
+
+def test_gql_interface_serializer_and_compression(monkeypatch, hasura):
+
+    import logging
+
+    sent = []
+    post = requests.Session.post
+    monkeypatch.setattr(requests.Session, "post", lambda session, *args, **kwargs: sent.append(kwargs) or post(session, *args, **kwargs))
+
+    activities = [{"name": "activity %s" % i, "type": "DSN_Track", "arguments": {"antenna_ID": "DSS-14"}} for i in range(100)]
+    gql = GqlInterface(serializer=JsonSerializer(), compress_threshold=1000)
+
+    # Large mutation bodies are compressed, small queries are not
+    gql.create_activities(activities)
+    gql.read_plan(1)
+    assert(sent[0]["headers"]["Content-Encoding"] == "gzip")
+    assert("Content-Encoding" not in sent[1]["headers"])
+    assert(sent[1]["data"] == b'{"query":"%s","variables":{"id":1}}' % GqlInterface.READ_PLAN_QUERY.encode())
+    assert([directive["name"] for directive in hasura.directives] == [activity["name"] for activity in activities])
+
+    # The indented debug dumps are only built with debug logging
+    dumps = []
+    json_dumps = json.dumps
+    monkeypatch.setattr(json, "dumps", lambda obj, **kwargs: dumps.append(kwargs.get("indent")) or json_dumps(obj, **kwargs))
+    logger = logging.getLogger("libaerie.products.product_parser")
+    level = logger.level
+    try:
+        logger.setLevel(logging.INFO)
+        gql.create_activities(activities)
+        assert(2 not in dumps)
+        logger.setLevel(logging.DEBUG)
+        gql.create_activities(activities)
+        assert(dumps.count(2) == 2)
+    finally:
+        logger.setLevel(level)
+
+    from libaerie.products import product_parser
+    if product_parser.orjson is not None:
+        assert(OrjsonSerializer().loads(OrjsonSerializer().dumps(activities)) == activities)